@@ -0,0 +1,244 @@
+"""Benchmark: every build stage on synthetic survey exports of increasing size.
+
+Run from the repository root:
+
+    python benchmarks/bench_build.py [--rows 1000 10000 100000 1000000]
+        [--repeat 1] [--check] [--update-thresholds] [--report PATH]
+
+For each size a synthetic Qualtrics export (see synthetic_survey.py) is
+written to a temporary directory. The build's stages then run one after the
+other in a fresh process, so memory figures belong to that size alone:
+
+    load_data        parse and clean the CSV (cold: no frame cache)
+    aggregates       fold the responses into SurveyAggregates
+    get_charts_data  build every chart node
+    analyze_text     every analyzed text field, plus the distinctive terms
+    serialize        fig_to_json of every figure built so far
+    freeze           render and write every page from the warm analyzer
+
+followed by a cold full build (generate_static_site --force) in another
+fresh process. Each stage reports its time and how far RSS rose above
+where the stage started. With --repeat N every size is measured N times
+and each figure keeps its best run.
+
+Thresholds live in build_thresholds.json next to this script, as seconds
+and MB per stage and size. With --check the script exits 1 when any stage
+exceeds its threshold. Stages and sizes without one are only reported.
+Thresholds depend on the machine: refresh them on the CI runner with
+--update-thresholds, which stores the measured values times --headroom
+(but at least MIN_THRESHOLDS). Stage times vary by a third between runs
+and small stages' RSS by allocator noise, so keep the default headroom
+and refresh with a few --repeat runs.
+"""
+import io
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import contextlib
+import multiprocessing
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import simple_static_generator as generator
+from synthetic_survey import SyntheticSurvey
+
+THRESHOLDS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'build_thresholds.json')
+# Lowest threshold --update-thresholds stores, so near-zero stages don't fail on
+# scheduling or allocator noise (a stage's RSS rise can swing by tens of MB)
+MIN_THRESHOLDS = {'seconds': 2.0, 'rss_mb': 64.0}
+
+
+def bench_dataset(csv_path):
+    return {'name': 'bench', 'label': 'Benchmark', 'data': csv_path, 'output': ''}
+
+
+def proc_status_mb(field):
+    """A memory field of /proc/self/status (VmRSS, VmHWM) in MB, or None off Linux"""
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith(field + ':'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+def reset_peak_rss():
+    """Restart VmHWM from the current RSS (Linux 4.0+); False where unsupported"""
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+    except OSError:
+        return False
+    return True
+
+
+class StageTimer:
+    """Times stages and records how far each raised RSS above where it started.
+
+    On Linux the peak is read from VmHWM, reset before every stage. Elsewhere
+    it falls back to getrusage's lifetime peak, which only shows stages that
+    set a new high.
+    """
+
+    def __init__(self):
+        self.results = {}
+        self.peak = 0.0
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        if reset_peak_rss():
+            start_rss = proc_status_mb('VmRSS')
+            read_peak = lambda: proc_status_mb('VmHWM')
+        else:
+            start_rss = generator.peak_rss_mb() or 0.0
+            read_peak = lambda: generator.peak_rss_mb() or 0.0
+        start = time.perf_counter()
+        yield
+        elapsed = time.perf_counter() - start
+        peak = read_peak()
+        self.peak = max(self.peak, peak)
+        self.results[name] = {'seconds': elapsed, 'rss_mb': max(0.0, peak - start_rss)}
+
+
+def run_stages(csv_path, workdir):
+    """Run the build's stages one by one in workdir; meant for a fresh process"""
+    os.chdir(workdir)
+    timer = StageTimer()
+    with contextlib.redirect_stdout(io.StringIO()):
+        with timer.stage('load_data'):
+            analyzer = generator.get_analyzer(csv_path)
+        with timer.stage('aggregates'):
+            analyzer.aggregates(rebuild=True)
+        with timer.stage('get_charts_data'):
+            charts = analyzer.get_charts_data()
+        with timer.stage('analyze_text'):
+            fields = sorted({field for inputs in generator.PAGE_INPUTS.values() for field in inputs['text']})
+            texts = [analyzer.analyze_text(field) for field in fields]
+            analyzer.distinctive_terms()
+        with timer.stage('serialize'):
+            figures = [value for value in charts.values() if isinstance(value, generator.go.Figure)]
+            figures += [value for text in texts if text for value in text.values()
+                        if isinstance(value, generator.go.Figure)]
+            for fig in figures:
+                generator.fig_to_json(fig)
+        with timer.stage('freeze'):
+            generator.use_datasets([bench_dataset(csv_path)])
+            generator.build_dataset(bench_dataset(csv_path), force=True)
+    timer.results['peak_rss_mb'] = timer.peak
+    return timer.results
+
+
+def run_full_build(csv_path, workdir):
+    """A cold full build in workdir; meant for a fresh process"""
+    os.chdir(workdir)
+    timer = StageTimer()
+    with contextlib.redirect_stdout(io.StringIO()):
+        with timer.stage('full_build'):
+            generator.generate_static_site(force=True, datasets=[bench_dataset(csv_path)])
+    return timer.results
+
+
+def in_fresh_process(func, *args):
+    """Call func in a newly spawned interpreter, so its peak RSS starts from scratch"""
+    context = multiprocessing.get_context('spawn')
+    with context.Pool(1) as pool:
+        return pool.apply(func, args)
+
+
+def measure_size(survey, rows, rng, repeat):
+    """Stage figures for one export size, each the best of repeat runs"""
+    best = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, f'survey_{rows}.csv')
+        survey.write(csv_path, rows, rng)
+        for _ in range(repeat):
+            stages = in_fresh_process(run_stages, csv_path, tempfile.mkdtemp(dir=tmp))
+            stages.update(in_fresh_process(run_full_build, csv_path, tempfile.mkdtemp(dir=tmp)))
+            for name, measured in stages.items():
+                if name not in best:
+                    best[name] = measured
+                elif name == 'peak_rss_mb':
+                    best[name] = min(best[name], measured)
+                else:
+                    best[name] = {key: min(value, best[name][key]) for key, value in measured.items()}
+    return best
+
+
+def load_thresholds(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except OSError:
+        return {}
+
+
+def exceeded(measured, threshold):
+    """Which of a stage's figures are over its threshold"""
+    return [key for key in ('seconds', 'rss_mb')
+            if threshold and key in threshold and measured[key] > threshold[key]]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[1000, 10000, 100000, 1000000])
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--repeat', type=int, default=1, help='runs per size; each figure keeps its best')
+    parser.add_argument('--thresholds', default=THRESHOLDS_PATH)
+    parser.add_argument('--check', action='store_true',
+                        help='exit 1 if any stage exceeds its threshold')
+    parser.add_argument('--update-thresholds', action='store_true',
+                        help='store the measured values times --headroom as the thresholds')
+    parser.add_argument('--headroom', type=float, default=3.0)
+    parser.add_argument('--report', metavar='PATH', help='also write the measurements as JSON')
+    args = parser.parse_args()
+    if args.repeat < 1:
+        parser.error('--repeat must be at least 1')
+
+    survey = SyntheticSurvey()
+    rng = np.random.default_rng(args.seed)
+    thresholds = load_thresholds(args.thresholds)
+    results = {}
+    failures = []
+    print(f"{'rows':>8} {'stage':>16} {'time (s)':>10} {'RSS +MB':>9} {'limit (s)':>10} {'limit MB':>9}")
+    for rows in args.rows:
+        stages = measure_size(survey, rows, rng, args.repeat)
+        peak = stages.pop('peak_rss_mb')
+        results[str(rows)] = {'stages': stages, 'peak_rss_mb': peak}
+        limits = thresholds.get(str(rows), {})
+        for name, measured in stages.items():
+            limit = limits.get(name, {})
+            over = exceeded(measured, limit)
+            failures += [f'{rows} rows: {name} {key} {measured[key]:.2f} > {limit[key]:.2f}' for key in over]
+            print(f"{rows:>8} {name:>16} {measured['seconds']:>10.2f} {measured['rss_mb']:>9.1f} "
+                  f"{limit.get('seconds', float('nan')):>10.2f} {limit.get('rss_mb', float('nan')):>9.1f}"
+                  f"{'  OVER' if over else ''}")
+        print(f"{rows:>8} {'peak RSS':>16} {'':>10} {peak or 0:>9.1f}")
+
+    if args.report:
+        with open(args.report, 'w') as f:
+            json.dump(results, f, indent=2)
+    if args.update_thresholds:
+        for rows, result in results.items():
+            thresholds[rows] = {
+                name: {key: round(max(value * args.headroom, MIN_THRESHOLDS[key]), 3)
+                       for key, value in measured.items()}
+                for name, measured in result['stages'].items()
+            }
+        with open(args.thresholds, 'w') as f:
+            json.dump(thresholds, f, indent=2, sort_keys=True)
+            f.write('\n')
+        print(f'Thresholds for {", ".join(results)} rows written to {args.thresholds}')
+    if args.check and failures:
+        print('Stages over their thresholds:', *failures, sep='\n  ', file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
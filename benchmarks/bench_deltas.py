@@ -0,0 +1,126 @@
+"""Benchmark: incremental aggregate deltas vs re-aggregating the whole export.
+
+Run from the repository root:
+
+    python benchmarks/bench_deltas.py [--rows 10000] [--delta 10]
+
+A synthetic export (see synthetic_survey.py) is aggregated once to seed the
+persisted state, then rewritten by each scenario: --delta responses
+appended, changed, removed or inserted mid-file, every response shuffled,
+or nothing changed at all. SurveyAnalyzer.aggregates() folds in the
+difference. The script fails unless every scenario gives exactly the value
+counts, crosstab cube, stats, text analysis, distinctive terms, enrichment
+labels and filter bundle of aggregates(rebuild=True) on the same export,
+and otherwise reports the time of each delta next to the rebuild.
+"""
+import io
+import os
+import sys
+import time
+import argparse
+import tempfile
+import contextlib
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import simple_static_generator as generator
+from synthetic_survey import SyntheticSurvey
+from bench_stream import enrichment_mismatches
+
+
+def scenarios(frame, extra, delta, rng):
+    """Each scenario's name and rewritten responses"""
+    rows = rng.choice(len(frame), size=delta, replace=False)
+    changed = frame.copy()
+    # Other responses' answers under the same ResponseIds
+    answers = [col for col in frame.columns if col != 'ResponseId']
+    changed.loc[rows, answers] = frame.loc[rng.choice(len(frame), size=delta), answers].to_numpy()
+    middle = len(frame) // 2
+    return [
+        ('unchanged', frame),
+        ('append', pd.concat([frame, extra], ignore_index=True)),
+        ('change', changed),
+        ('remove', frame.drop(index=rows).reset_index(drop=True)),
+        ('insert', pd.concat([frame.iloc[:middle], extra, frame.iloc[middle:]], ignore_index=True)),
+        ('reorder', frame.sample(frac=1, random_state=rng.integers(1 << 31)).reset_index(drop=True))
+    ]
+
+
+def write_export(header, frame, csv_path):
+    """Write responses under the export's header rows"""
+    with open(csv_path, 'w', encoding='utf-8', newline='') as f:
+        f.writelines(header)
+        frame.to_csv(f, header=False, index=False)
+
+
+def aggregate(csv_path, rebuild=False):
+    """Load the export and bring its aggregates up to date, quietly; return them and the seconds taken"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        analyzer = generator.SurveyAnalyzer(csv_path)
+        start = time.perf_counter()
+        aggregates = analyzer.aggregates(rebuild=rebuild)
+    return aggregates, time.perf_counter() - start
+
+
+def mismatches(delta, full):
+    """What the delta-folded aggregates get wrong compared with a full rebuild"""
+    problems = []
+    for col in dict.fromkeys(list(full.counts) + list(delta.counts)):
+        expected, actual = full.value_counts(col), delta.value_counts(col)
+        if list(expected.index) != list(actual.index) or expected.tolist() != actual.tolist():
+            problems.append(f'value counts of {col}')
+    cube, folded = full.crosstab_cube(), delta.crosstab_cube()
+    if (cube.questions != folded.questions or cube.responses != folded.responses
+            or cube.categories != folded.categories
+            or any(not np.array_equal(cube.counts[d], folded.counts[d]) for d in cube.counts)):
+        problems.append('crosstab cube')
+    if delta.stats() != full.stats():
+        problems.append(f'stats {delta.stats()} != {full.stats()}')
+    for field in generator.ANALYZED_TEXT_COLUMNS:
+        if delta.text_analysis(field) != full.text_analysis(field):
+            problems.append(f'text analysis of {field}')
+    if delta.distinctive_terms() != full.distinctive_terms():
+        problems.append('distinctive terms')
+    for field in generator.ENRICHED_TEXT_FIELDS:
+        problems.extend(f'{view} of {field}' for view in enrichment_mismatches(
+            delta.enrichment_analytics(field), full.enrichment_analytics(field)))
+    if delta.filter_bundle() != full.filter_bundle():
+        problems.append('filter bundle')
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=10000)
+    parser.add_argument('--delta', type=int, default=10)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    survey = SyntheticSurvey()
+    frame = survey.chunk(args.rows, rng)
+    extra = survey.chunk(args.delta, rng)
+    print(f"{'scenario':>10} {'delta (s)':>10} {'rebuild (s)':>12}")
+    with tempfile.TemporaryDirectory() as tmp:
+        generator.FRAME_CACHE_DIR = os.path.join(tmp, 'frames')
+        generator.AGGREGATE_STATE_DIR = os.path.join(tmp, 'aggregates')
+        csv_path = os.path.join(tmp, 'survey.csv')
+        for name, rewritten in scenarios(frame, extra, args.delta, rng):
+            # Every scenario starts from the state of the original export
+            write_export(survey.header, frame, csv_path)
+            aggregate(csv_path, rebuild=True)
+            write_export(survey.header, rewritten, csv_path)
+            delta, delta_time = aggregate(csv_path)
+            full, full_time = aggregate(csv_path, rebuild=True)
+            problems = mismatches(delta, full)
+            if problems:
+                print(f'{name}: delta results differ from a rebuild: {problems}', file=sys.stderr)
+                return 1
+            print(f"{name:>10} {delta_time:>10.3f} {full_time:>12.3f}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,93 @@
+"""Micro-benchmark: shared fig_to_json vs the old dumps/loads/decode/dumps path.
+
+Run from the repository root:
+
+    python benchmarks/bench_fig_to_json.py [--repeat N]
+
+Every dashboard figure is serialized with both implementations; the script
+fails if any output differs and otherwise prints per-call timings.
+"""
+import os
+import sys
+import json
+import time
+import base64
+import argparse
+
+import numpy as np
+import plotly
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import simple_static_generator as generator
+
+
+def legacy_fig_to_json(fig):
+    """The per-route serializer the dashboard used before fig_to_json was shared"""
+    def decode_binary_arrays(obj):
+        if isinstance(obj, dict):
+            if 'dtype' in obj and 'bdata' in obj:
+                binary_data = base64.b64decode(obj['bdata'])
+                dtype = np.dtype(obj['dtype'])
+                array = np.frombuffer(binary_data, dtype=dtype)
+                return array.tolist()
+            else:
+                return {k: decode_binary_arrays(v) for k, v in obj.items()}
+        elif isinstance(obj, list):
+            return [decode_binary_arrays(item) for item in obj]
+        return obj
+    fig_json_str = json.dumps(fig, cls=plotly.utils.PlotlyJSONEncoder)
+    fig_dict = json.loads(fig_json_str)
+    fig_dict = decode_binary_arrays(fig_dict)
+    return json.dumps(fig_dict)
+
+
+def collect_figures(analyzer):
+    """Every figure the dashboard pages serialize"""
+    figures = {}
+    for name, value in analyzer.get_charts_data().items():
+        if isinstance(value, plotly.graph_objects.Figure):
+            figures[name] = value
+    for page in generator.PAGE_INPUTS.values():
+        for field in page['text']:
+            analysis = analyzer.analyze_text(field)
+            if not analysis:
+                continue
+            for key in ('word_freq_fig', 'theme_fig'):
+                if analysis[key] is not None:
+                    figures[f'{field}:{key}'] = analysis[key]
+    return figures
+
+
+def time_calls(func, figures, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for fig in figures:
+            func(fig)
+    return (time.perf_counter() - start) / (repeat * len(figures))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=50, help='passes over all figures')
+    args = parser.parse_args()
+
+    figures = collect_figures(generator.get_analyzer())
+    for name, fig in figures.items():
+        if legacy_fig_to_json(fig) != generator.fig_to_json(fig):
+            print(f"Output mismatch for {name}")
+            return 1
+    print(f"{len(figures)} figures serialize byte-identically")
+
+    figs = list(figures.values())
+    legacy = time_calls(legacy_fig_to_json, figs, args.repeat)
+    shared = time_calls(generator.fig_to_json, figs, args.repeat)
+    compact = time_calls(lambda fig: generator.fig_to_json(fig, compact=True), figs, args.repeat)
+    backend = 'orjson' if generator.orjson is not None else 'json'
+    print(f"legacy dumps/loads/decode/dumps: {legacy * 1000:8.3f} ms/figure")
+    print(f"fig_to_json:                     {shared * 1000:8.3f} ms/figure ({legacy / shared:.1f}x)")
+    print(f"fig_to_json(compact, {backend}):{' ' * (10 - len(backend))}{compact * 1000:8.3f} ms/figure ({legacy / compact:.1f}x)")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,87 @@
+"""Benchmark: JSON size of every dashboard figure before and after minimization.
+
+Run from the repository root:
+
+    python benchmarks/bench_figures.py [--data data/survey_data.csv] [--report PATH]
+
+Every figure the pages publish (the chart nodes and the per-field text
+analysis charts) is built from the export and serialized two ways:
+
+    inline     fig_to_json(fig, compact=True), Plotly's template included
+    minimized  the chart file chart_asset() publishes (minimize_figure())
+
+The table lists each figure's size both ways and the reduction, and the
+totals count the shared SITE_THEME file once. Caches are written to a
+temporary directory, not the repository's .build-cache.
+"""
+import io
+import os
+import sys
+import json
+import argparse
+import tempfile
+import contextlib
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import simple_static_generator as generator
+
+
+def dashboard_figures(csv_path):
+    """Every figure the pages publish, by name"""
+    analyzer = generator.get_analyzer(csv_path)
+    figures = {name: value for name, value in analyzer.get_charts_data().items()
+               if isinstance(value, generator.go.Figure)}
+    fields = sorted({field for inputs in generator.PAGE_INPUTS.values() for field in inputs['text']})
+    for field in fields:
+        analysis = analyzer.analyze_text(field) or {}
+        for key, value in analysis.items():
+            if isinstance(value, generator.go.Figure):
+                figures[f'{field}.{key}'] = value
+    return figures
+
+
+def figure_sizes(fig):
+    """Bytes of a figure inlined with its template, and as a minimized chart file"""
+    inline = generator.fig_to_json(fig, compact=True)
+    spec = generator.minimize_figure(generator.fig_to_dict(fig))
+    spec['template'] = 'x' * 20 + '.json'
+    minimized = generator.dumps_figure(spec, compact=True)
+    return len(inline.encode('utf-8')), len(minimized.encode('utf-8'))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--data', default=generator.DATA_PATH)
+    parser.add_argument('--report', metavar='PATH', help='also write the sizes as JSON')
+    args = parser.parse_args()
+
+    csv_path = os.path.abspath(args.data)
+    workdir = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                figures = dashboard_figures(csv_path)
+        finally:
+            os.chdir(workdir)
+
+    theme = len(generator.dumps_figure(generator.SITE_THEME, compact=True).encode('utf-8'))
+    sizes = {name: figure_sizes(fig) for name, fig in figures.items()}
+    print(f"{'figure':>32} {'inline (B)':>11} {'minimized (B)':>14} {'saved':>7}")
+    for name, (inline, minimized) in sizes.items():
+        print(f"{name:>32} {inline:>11} {minimized:>14} {1 - minimized / inline:>7.1%}")
+    total_inline = sum(inline for inline, _ in sizes.values())
+    total_minimized = sum(minimized for _, minimized in sizes.values()) + theme
+    print(f"{'site theme (shared)':>32} {'':>11} {theme:>14}")
+    print(f"{'total':>32} {total_inline:>11} {total_minimized:>14} {1 - total_minimized / total_inline:>7.1%}")
+
+    if args.report:
+        with open(args.report, 'w') as f:
+            json.dump({'figures': {name: {'inline': inline, 'minimized': minimized}
+                                   for name, (inline, minimized) in sizes.items()},
+                       'site_theme': theme}, f, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
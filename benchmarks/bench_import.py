@@ -0,0 +1,96 @@
+"""Benchmark: cold import and --help time of the generator against a budget.
+
+Run from the repository root:
+
+    python benchmarks/bench_import.py [--repeat 5] [--budget 0.5] [--check]
+
+Each measurement runs in a fresh interpreter, like a CI cold start: once for
+`import simple_static_generator` and once for `simple_static_generator.py
+--help`, keeping the best of --repeat runs. The import is then repeated under
+`python -X importtime` to list the slowest modules it pulls in, and checked
+for heavy dependencies (pandas, Plotly, Flask, ...) that should only load
+once a build needs them. With --check the script exits 1 when either time is
+over --budget seconds or a heavy module is imported eagerly.
+"""
+import os
+import sys
+import time
+import argparse
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+GENERATOR = os.path.join(ROOT, 'simple_static_generator.py')
+# Modules that must not load until a build uses them
+HEAVY_MODULES = ['numpy', 'pandas', 'plotly', 'flask', 'flask_frozen', 'jinja2', 'pyarrow', 'nltk']
+
+
+def best_time(command, repeat):
+    """Fastest wall time of command over repeat fresh runs"""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run(command, cwd=ROOT, check=True, stdout=subprocess.DEVNULL)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def import_profile(top=10):
+    """The slowest modules of the import by cumulative time, from -X importtime"""
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import simple_static_generator'],
+                            cwd=ROOT, check=True, capture_output=True, text=True)
+    modules = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        modules.append((int(cumulative) / 1e6, name.strip()))
+    return sorted(modules, reverse=True)[:top]
+
+
+def eager_modules():
+    """Heavy modules loaded by a plain import of the generator"""
+    code = ('import sys, simple_static_generator; '
+            f'print(" ".join(m for m in {HEAVY_MODULES!r} if m in sys.modules))')
+    result = subprocess.run([sys.executable, '-c', code], cwd=ROOT, check=True,
+                            capture_output=True, text=True)
+    return result.stdout.split()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--budget', type=float, default=0.5, help='seconds allowed for each cold start')
+    parser.add_argument('--check', action='store_true',
+                        help='exit 1 if over budget or a heavy module is imported eagerly')
+    args = parser.parse_args()
+
+    baseline = best_time([sys.executable, '-c', 'pass'], args.repeat)
+    timings = {
+        'import': best_time([sys.executable, '-c', 'import simple_static_generator'], args.repeat),
+        '--help': best_time([sys.executable, GENERATOR, '--help'], args.repeat),
+    }
+    print(f"{'start':>8} {'time (s)':>10} {'budget (s)':>11}")
+    print(f"{'python':>8} {baseline:>10.3f} {'':>11}")
+    failures = []
+    for name, seconds in timings.items():
+        over = seconds > args.budget
+        if over:
+            failures.append(f'{name} {seconds:.3f}s > {args.budget:.3f}s')
+        print(f"{name:>8} {seconds:>10.3f} {args.budget:>11.3f}{'  OVER' if over else ''}")
+
+    print('\nSlowest imports (cumulative s):')
+    for seconds, name in import_profile():
+        print(f'  {seconds:8.3f}  {name}')
+
+    eager = eager_modules()
+    if eager:
+        failures.append(f'imported eagerly: {", ".join(eager)}')
+    print(f"\nHeavy modules imported eagerly: {', '.join(eager) or 'none'}")
+    if args.check and failures:
+        print('Cold start over budget:', *failures, sep='\n  ', file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,103 @@
+"""Benchmark: schema-projected CSV loading vs the original full-frame load.
+
+Run from the repository root:
+
+    python benchmarks/bench_load.py [--rows 20000 100000]
+
+The survey rows in data/survey_data.csv are repeated to build larger exports
+(keeping the question text and ImportId rows). Each export is loaded the old
+way (every column as text, then cleaned) and with SurveyAnalyzer's schema
+loader restricted to the dashboard's columns. Load time, peak traced memory
+and the resulting frame size are reported. Peak memory is what tracemalloc
+sees (Python and numpy allocations), so it excludes the C parser's buffers.
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+import warnings
+import tracemalloc
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import simple_static_generator as generator
+
+
+def legacy_load(csv_path):
+    """The original load_data(): every column, object dtype, cleaned afterwards"""
+    with warnings.catch_warnings():
+        # Mixed-type columns warn on large exports; the old loader ignored that too
+        warnings.simplefilter('ignore', pd.errors.DtypeWarning)
+        df = pd.read_csv(csv_path, skiprows=[1])
+    if 'Finished' in df.columns:
+        df['completed_survey'] = df['Finished'] == 'True'
+    if 'Q1' in df.columns:
+        df = df[~df['Q1'].str.contains('ImportId', na=False)].copy()
+    if 'Q2' in df.columns:
+        df['Gender'] = df['Q2'].apply(
+            lambda x: 'Woman' if isinstance(x, str) and 'Woman' in x else
+                     ('Man' if isinstance(x, str) and 'Man' in x else
+                     ('Non-binary' if isinstance(x, str) and 'Non-binary' in x else
+                     ('Gender Diverse' if isinstance(x, str) and 'Gender Diverse' in x else x)))
+        )
+    if 'Duration (in seconds)' in df.columns:
+        df['Duration (in seconds)'] = pd.to_numeric(df['Duration (in seconds)'], errors='coerce')
+    return df
+
+
+def schema_load(csv_path):
+    """SurveyAnalyzer's parser, restricted to the dashboard's declared columns"""
+    analyzer = generator.SurveyAnalyzer.__new__(generator.SurveyAnalyzer)
+    analyzer.csv_path = csv_path
+    analyzer.columns = generator.dashboard_columns()
+    return analyzer._parse_csv()
+
+
+def write_export(source_path, rows, target_path):
+    """Repeat the survey's response rows until the export has `rows` responses"""
+    with open(source_path, encoding='utf-8') as f:
+        header = [f.readline() for _ in range(3)]
+    responses = pd.read_csv(source_path, skiprows=[1, 2], dtype=str, keep_default_na=False)
+    repeats = -(-rows // len(responses))
+    big = pd.concat([responses] * repeats, ignore_index=True).head(rows)
+    with open(target_path, 'w', encoding='utf-8', newline='') as f:
+        f.writelines(header)
+        big.to_csv(f, header=False, index=False)
+
+
+def measure(load, csv_path):
+    """Time one load, then repeat it under tracemalloc for the peak allocation"""
+    start = time.perf_counter()
+    df = load(csv_path)
+    elapsed = time.perf_counter() - start
+    frame = df.memory_usage(deep=True).sum()
+    del df
+
+    tracemalloc.start()
+    load(csv_path)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak, frame
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[20000, 100000])
+    args = parser.parse_args()
+
+    mb = 1024 * 1024
+    print(f"{'rows':>8} {'loader':>8} {'time (s)':>10} {'peak (MB)':>10} {'frame (MB)':>11}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for rows in args.rows:
+            csv_path = os.path.join(tmp, f'survey_{rows}.csv')
+            write_export(generator.DATA_PATH, rows, csv_path)
+            for name, load in (('legacy', legacy_load), ('schema', schema_load)):
+                elapsed, peak, frame = measure(load, csv_path)
+                print(f"{rows:>8} {name:>8} {elapsed:>10.2f} {peak / mb:>10.1f} {frame / mb:>11.1f}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
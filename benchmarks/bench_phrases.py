@@ -0,0 +1,112 @@
+"""Benchmark: bounded-memory phrase counting vs an exact Counter of every n-gram.
+
+Run from the repository root:
+
+    python benchmarks/bench_phrases.py [--rows 10000 100000 1000000] [--capacity N]
+
+Synthetic responses draw words from a Zipf-distributed vocabulary with a few
+planted phrases ("social media", "group project", ...). Both counters see the
+same tokenized responses; the script reports time and peak traced memory for
+each and how many of the exact top 15 phrases count_phrases() also ranks in
+its top 15.
+"""
+import os
+import sys
+import time
+import argparse
+import tracemalloc
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import simple_static_generator as generator
+
+PLANTED = ['social media', 'group project', 'mental health', 'male students', 'feel unsafe']
+
+
+def synthetic_responses(rows, rng, vocabulary_size=17576):
+    """Responses of 5-40 Zipf-distributed words, a third of them with a planted phrase"""
+    # Letters only: the tokenizer strips digits
+    letters = 'abcdefghijklmnopqrstuvwxyz'
+    vocabulary = np.array(['word' + letters[i // 676] + letters[i // 26 % 26] + letters[i % 26]
+                           for i in range(vocabulary_size)], dtype=object)
+    lengths = rng.integers(5, 41, size=rows)
+    ranks = np.minimum(rng.zipf(1.3, size=int(lengths.sum())), vocabulary_size) - 1
+    words = vocabulary[ranks]
+    bounds = np.concatenate([[0], np.cumsum(lengths)])
+    planted = rng.choice(PLANTED, size=rows)
+    plant = rng.random(rows) < 1 / 3
+    return pd.Series([
+        ' '.join(words[a:b]) + (' ' + planted[i] if plant[i] else '')
+        for i, (a, b) in enumerate(zip(bounds[:-1], bounds[1:]))
+    ])
+
+
+def tokenized(responses):
+    """The responses' vocabulary and token ids in CSR form (ids, offsets)"""
+    token_lists = [generator.tokenize(text) for text in responses.tolist()]
+    offsets = np.zeros(len(token_lists) + 1, dtype=np.int64)
+    np.cumsum([len(tokens) for tokens in token_lists], out=offsets[1:])
+    ids, vocabulary = pd.factorize(np.array([word for tokens in token_lists for word in tokens], dtype=object))
+    return list(vocabulary), ids.astype(np.int32), offsets
+
+
+def exact_phrases(tokens, lengths=generator.PHRASE_LENGTHS):
+    """Count every n-gram of every response in one unbounded Counter"""
+    counts = Counter()
+    vocabulary, ids, offsets = tokens
+    for a, b in zip(offsets[:-1], offsets[1:]):
+        words = [vocabulary[i] for i in ids[a:b]]
+        for n in lengths:
+            counts.update(' '.join(words[k:k + n]) for k in range(len(words) - n + 1))
+    return list(counts.items())
+
+
+def bounded_phrases(tokens, capacity):
+    """Count the n-grams with count_phrases() into summaries of the given capacity"""
+    vocabulary, ids, offsets = tokens
+    phrases = generator.phrase_counts(capacity)
+    generator.count_phrases(phrases, ids, offsets)
+    return generator.counted_phrases(phrases, vocabulary)
+
+
+def measure(func, *args):
+    """Time one call, then repeat it under tracemalloc for the peak allocation"""
+    start = time.perf_counter()
+    result = func(*args)
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    func(*args)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def top(phrases, k=15):
+    return [phrase for phrase, _ in sorted(phrases, key=lambda pair: pair[1], reverse=True)[:k]]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[10000, 100000, 1000000])
+    parser.add_argument('--capacity', type=int, default=generator.PHRASE_CAPACITY)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    mb = 1024 * 1024
+    print(f"{'rows':>8} {'counter':>8} {'time (s)':>10} {'peak (MB)':>10} {'top-15 overlap':>15}")
+    for rows in args.rows:
+        tokens = tokenized(synthetic_responses(rows, rng))
+        exact, exact_time, exact_peak = measure(exact_phrases, tokens)
+        bounded, bounded_time, bounded_peak = measure(bounded_phrases, tokens, args.capacity)
+        overlap = len(set(top(exact)) & set(top(bounded)))
+        print(f"{rows:>8} {'exact':>8} {exact_time:>10.2f} {exact_peak / mb:>10.1f} {'':>15}")
+        print(f"{rows:>8} {'bounded':>8} {bounded_time:>10.2f} {bounded_peak / mb:>10.1f} {overlap:>12}/15")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
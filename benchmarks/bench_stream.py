@@ -0,0 +1,148 @@
+"""Benchmark: streaming chunked aggregation vs loading the whole export.
+
+Run from the repository root:
+
+    python benchmarks/bench_stream.py [--waves 20 200] [--chunksize 10000]
+
+The survey export is concatenated with itself, header and ImportId rows
+included, to mimic several survey waves in one file. Each export is
+aggregated twice: by parsing the whole table and folding it in one go, and
+with stream_aggregates() one chunk at a time. The script fails unless both
+give exactly the dashboard's in-memory value counts, crosstab cube and
+stats, and the streamed text analysis, distinctive terms, enrichment labels
+and filter bundle equal those of the whole table folded at once. Otherwise
+it reports time and peak traced memory.
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+import tracemalloc
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import simple_static_generator as generator
+
+
+def write_waves(source_path, waves, target_path):
+    """Concatenate the raw export `waves` times, metadata rows and all"""
+    with open(source_path, encoding='utf-8') as f:
+        export = f.read()
+    if not export.endswith('\n'):
+        export += '\n'
+    with open(target_path, 'w', encoding='utf-8', newline='') as f:
+        for _ in range(waves):
+            f.write(export)
+
+
+def parse_frame(csv_path):
+    """SurveyAnalyzer's in-memory parse, without touching the frame cache"""
+    analyzer = generator.SurveyAnalyzer.__new__(generator.SurveyAnalyzer)
+    analyzer.csv_path = csv_path
+    analyzer.columns = generator.dashboard_columns()
+    return analyzer._parse_csv()
+
+
+def in_memory(csv_path):
+    aggregates = generator.SurveyAggregates()
+    aggregates.update(parse_frame(csv_path))
+    return aggregates
+
+
+def streamed(csv_path, chunksize):
+    return generator.stream_aggregates(csv_path, chunksize=chunksize)
+
+
+def enrichment_mismatches(analytics, expected):
+    """Which views of two EnrichmentAnalytics differ (mean scores up to float summation order)"""
+    problems = []
+    for view in ('sentiment_counts', 'emotion_counts', 'topic_counts', 'actionability_counts',
+                 'effort_counts', 'topic_sentiment'):
+        actual, wanted = getattr(analytics, view)(), getattr(expected, view)()
+        if not actual.equals(wanted) or list(actual.index) != list(wanted.index):
+            problems.append(view)
+    for view in ('mean_score', 'mean_effort'):
+        actual, wanted = getattr(analytics, view)(), getattr(expected, view)()
+        if (actual is None) != (wanted is None) or (actual is not None and not np.isclose(actual, wanted)):
+            problems.append(view)
+    return problems
+
+
+def mismatches(aggregates, df, full):
+    """Compare aggregates with what the dashboard computes from the full frame (folded at once as `full`)"""
+    problems = []
+    for col in aggregates.counts:
+        expected = generator.value_counts(df[col])
+        actual = aggregates.value_counts(col)
+        if list(expected.index) != list(actual.index) or expected.tolist() != actual.tolist():
+            problems.append(f'value counts of {col}')
+    cube = generator.CrosstabCube.from_frame(df)
+    folded = aggregates.crosstab_cube()
+    if (cube.questions != folded.questions or cube.responses != folded.responses
+            or cube.categories != folded.categories
+            or any(not np.array_equal(cube.counts[d], folded.counts[d]) for d in cube.counts)):
+        problems.append('crosstab cube')
+    stats = aggregates.stats()
+    expected = {
+        'total_responses': len(df),
+        'completion_rate': (df['Finished'] == 'True').mean() * 100,
+        'avg_duration_minutes': df['Duration (in seconds)'].mean() / 60
+    }
+    if stats != expected:
+        problems.append(f'stats {stats} != {expected}')
+    for field in generator.ANALYZED_TEXT_COLUMNS:
+        if aggregates.text_analysis(field) != full.text_analysis(field):
+            problems.append(f'text analysis of {field}')
+    if aggregates.distinctive_terms() != full.distinctive_terms():
+        problems.append('distinctive terms')
+    for field in generator.ENRICHED_TEXT_FIELDS:
+        expected = generator.EnrichmentAnalytics(generator.enrichment_tables(df, field))
+        problems.extend(f'{view} of {field}'
+                        for view in enrichment_mismatches(aggregates.enrichment_analytics(field), expected))
+    if aggregates.filter_bundle() != full.filter_bundle():
+        problems.append('filter bundle')
+    return problems
+
+
+def measure(func, *args):
+    """Time one call, then repeat it under tracemalloc for the peak allocation"""
+    start = time.perf_counter()
+    result = func(*args)
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    func(*args)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--waves', type=int, nargs='+', default=[20, 200])
+    parser.add_argument('--chunksize', type=int, default=10000)
+    args = parser.parse_args()
+
+    mb = 1024 * 1024
+    print(f"{'rows':>8} {'mode':>9} {'time (s)':>10} {'peak (MB)':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for waves in args.waves:
+            csv_path = os.path.join(tmp, f'survey_{waves}_waves.csv')
+            write_waves(generator.DATA_PATH, waves, csv_path)
+            df = parse_frame(csv_path)
+            full = in_memory(csv_path)
+            results = (('in-memory', in_memory, (csv_path,)),
+                       ('streamed', streamed, (csv_path, args.chunksize)))
+            for name, func, func_args in results:
+                aggregates, elapsed, peak = measure(func, *func_args)
+                problems = mismatches(aggregates, df, full)
+                if problems:
+                    print(f'{name} results differ from the in-memory frame: {problems}', file=sys.stderr)
+                    return 1
+                print(f"{len(df):>8} {name:>9} {elapsed:>10.2f} {peak / mb:>10.1f}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
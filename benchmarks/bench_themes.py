@@ -0,0 +1,74 @@
+"""Benchmark: compiled ThemeMatcher vs the original per-theme keyword loop.
+
+Run from the repository root:
+
+    python benchmarks/bench_themes.py [--rows 10000 100000 1000000] [--seed N]
+
+Synthetic cleaned responses are drawn from the theme keywords (including
+keywords embedded in longer words, like "man" in "woman") mixed with filler
+words. Both implementations tag every response; the script fails if any
+response x theme cell differs and otherwise prints the timings.
+"""
+import os
+import sys
+import time
+import argparse
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import simple_static_generator as generator
+
+FILLER = ['campus', 'people', 'comment', 'heard', 'someone', 'building', 'office',
+          'event', 'felt', 'uncomfortable', 'during', 'meeting', 'joke', 'remark',
+          'staff', 'library', 'hallway', 'residence', 'club', 'team']
+
+
+def legacy_themes(cleaned_texts, themes=generator.TEXT_THEMES):
+    """The original analyze_text() theme scoring, kept per response"""
+    columns = {}
+    for theme_name, keywords in themes.items():
+        columns[theme_name] = [any(keyword in text for keyword in keywords) for text in cleaned_texts]
+    return pd.DataFrame(columns, index=cleaned_texts.index)
+
+
+def synthetic_corpus(rows, rng):
+    """Cleaned-text-like responses of 5-40 words, about a fifth of them keywords"""
+    keywords = [k for ks in generator.TEXT_THEMES.values() for k in ks]
+    vocabulary = np.array(FILLER + keywords + ['woman', 'classroom', 'reporting', 'socially'])
+    weights = np.where(np.arange(len(vocabulary)) < len(FILLER), 4.0, 1.0)
+    weights /= weights.sum()
+    lengths = rng.integers(5, 41, size=rows)
+    words = rng.choice(vocabulary, size=int(lengths.sum()), p=weights)
+    bounds = np.concatenate([[0], np.cumsum(lengths)])
+    return pd.Series([' '.join(words[a:b]) for a, b in zip(bounds[:-1], bounds[1:])])
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[10000, 100000, 1000000])
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    print(f"{'rows':>8} {'legacy (s)':>11} {'matcher (s)':>12} {'speedup':>8}")
+    for rows in args.rows:
+        texts = synthetic_corpus(rows, rng)
+        expected, legacy_time = timed(legacy_themes, texts)
+        matrix, matcher_time = timed(generator.THEME_MATCHER.match, texts)
+        if not matrix.equals(expected):
+            print(f'Theme matrices differ for {rows} rows', file=sys.stderr)
+            return 1
+        print(f"{rows:>8} {legacy_time:>11.2f} {matcher_time:>12.2f} {legacy_time / matcher_time:>7.1f}x")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
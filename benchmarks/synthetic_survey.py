@@ -0,0 +1,104 @@
+"""Synthetic Qualtrics-shaped survey exports of any size, for benchmarking.
+
+Run from the repository root:
+
+    python benchmarks/synthetic_survey.py --rows 100000 --output /tmp/survey_100k.csv
+
+The export has every column of data/survey_data.csv, including its question
+text and ImportId rows. Each synthetic response copies the answers of a
+randomly drawn real response, so categorical answers, multi-select
+combinations ("Woman,Man"), skip patterns and the Text iQ label columns
+keep their real joint distribution. Free-text answers are written fresh
+wherever the drawn response answered: their word counts follow the real
+answer's length (jittered by +/-50%) and their words are drawn from the
+pooled vocabulary of every real free-text answer, weighted by frequency.
+Tokenizing and phrase counting therefore see realistic text rather than
+repeats. ResponseIds are unique. Rows are generated and written in chunks,
+so a million-row export needs little memory.
+"""
+import os
+import sys
+import argparse
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import simple_static_generator as generator
+
+RESPONSE_ID_CHARS = np.frombuffer(b'abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789', dtype=np.uint8)
+
+
+def load_template(source_path=generator.DATA_PATH):
+    """The raw header lines and response rows (as text) of the real export"""
+    with open(source_path, encoding='utf-8') as f:
+        header = [f.readline() for _ in range(3)]
+    responses = pd.read_csv(source_path, skiprows=[1, 2], dtype=str, keep_default_na=False)
+    return header, responses
+
+
+def text_columns(responses):
+    """The export's open-text questions"""
+    return [col for col in generator.OPEN_TEXT_COLUMNS if col in responses.columns]
+
+
+def response_ids(n, rng):
+    """n distinct Qualtrics-style ids (R_ and 15 letters or digits)"""
+    codes = RESPONSE_ID_CHARS[rng.integers(len(RESPONSE_ID_CHARS), size=(n, 15))]
+    ids = np.char.add('R_', codes.view('S15').ravel().astype(str))
+    # Collisions are vanishingly rare, but ids must be unique
+    while len(np.unique(ids)) < n:
+        ids = response_ids(n, rng)
+    return ids
+
+
+class SyntheticSurvey:
+    """Draws synthetic responses shaped like a real Qualtrics export"""
+
+    def __init__(self, source_path=generator.DATA_PATH):
+        self.header, self.responses = load_template(source_path)
+        self.text_columns = text_columns(self.responses)
+        answers = self.responses[self.text_columns].to_numpy().ravel()
+        self.words = np.array(' '.join(answers).split(), dtype=object)
+        self.word_counts = {col: self.responses[col].str.split().str.len().to_numpy()
+                            for col in self.text_columns}
+
+    def chunk(self, n, rng):
+        """A frame of n synthetic responses, every value as export text"""
+        rows = rng.integers(len(self.responses), size=n)
+        frame = self.responses.iloc[rows].reset_index(drop=True)
+        frame['ResponseId'] = response_ids(n, rng)
+        for col in self.text_columns:
+            lengths = self.word_counts[col][rows]
+            answered = lengths > 0
+            lengths = np.maximum(1, np.rint(lengths[answered] * rng.uniform(0.5, 1.5, answered.sum())))
+            lengths = lengths.astype(np.int64)
+            words = self.words[rng.integers(len(self.words), size=int(lengths.sum()))]
+            bounds = np.concatenate([[0], np.cumsum(lengths)])
+            texts = np.full(n, '', dtype=object)
+            texts[answered] = [' '.join(words[a:b]) for a, b in zip(bounds[:-1], bounds[1:])]
+            frame[col] = texts
+        return frame
+
+    def write(self, target_path, rows, rng, chunksize=100000):
+        """Write an export of `rows` synthetic responses, header rows included"""
+        with open(target_path, 'w', encoding='utf-8', newline='') as f:
+            f.writelines(self.header)
+            for start in range(0, rows, chunksize):
+                self.chunk(min(chunksize, rows - start), rng).to_csv(f, header=False, index=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=10000)
+    parser.add_argument('--output', required=True)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    SyntheticSurvey().write(args.output, args.rows, np.random.default_rng(args.seed))
+    print(f"Wrote {args.rows} synthetic responses to {args.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,259 +1,1948 @@
 import os
+import sys
+import gzip
 import json
-import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
-import plotly
-from flask import Flask, render_template_string
-from flask_frozen import Freezer
+import time
+import pickle
+import hashlib
+import posixpath
+import argparse
+import threading
+import functools
+import itertools
+import contextlib
+import multiprocessing
+import types
+import importlib
+import importlib.util
+from concurrent.futures import ProcessPoolExecutor
 import re
+import csv
+import mimetypes
 from collections import Counter
-import nltk
 from datetime import datetime
-from markupsafe import Markup
 
-# Download NLTK data if needed
+class LazyModule(types.ModuleType):
+    """A module that is imported on first attribute access.
+
+    The heavy dependencies below are bound as LazyModules, so importing this
+    file (or running --help) loads none of them; a build pulls each in when a
+    page first needs it. After the first access the real module's namespace
+    is copied in and later lookups are plain attribute reads.
+    """
+
+    def __getattr__(self, attr):
+        module = importlib.import_module(self.__name__)
+        self.__dict__.update(module.__dict__)
+        return getattr(module, attr)
+
+np = LazyModule('numpy')
+pd = LazyModule('pandas')
+px = LazyModule('plotly.express')
+go = LazyModule('plotly.graph_objects')
+plotly = LazyModule('plotly')
+flask = LazyModule('flask')
+flask_frozen = LazyModule('flask_frozen')
+jinja2 = LazyModule('jinja2')
+
+# Optional: Arrow/Feather support for the cleaned-frame cache
+feather = LazyModule('pyarrow.feather') if importlib.util.find_spec('pyarrow') is not None else None
+
+# Optional: Brotli for the precompressed .br siblings of the output
+brotli = LazyModule('brotli') if importlib.util.find_spec('brotli') is not None else None
+
+# Optional: peak memory in build profiles (Unix only)
 try:
-    nltk.data.find('corpora/stopwords')
-except LookupError:
-    nltk.download('stopwords')
-from nltk.corpus import stopwords
+    import resource
+except ImportError:
+    resource = None
+
+# Location of the survey export used to build the dashboard
+DATA_PATH = 'data/survey_data.csv'
+
+# Where the static site is written
+OUTPUT_DIR = 'docs'
+
+# Optional list of survey datasets (waves, campuses, instruments) to build, in
+# trend order. Each entry names its CSV and the prefix under OUTPUT_DIR its
+# dashboard is written to; without the file only DEFAULT_DATASET is built.
+DATASETS_PATH = 'datasets.json'
+DEFAULT_DATASET = {'name': 'survey', 'label': '3C+ Survey', 'data': DATA_PATH, 'output': '', 'stream': False}
+
+# Wave-over-wave trend page, written at the top of OUTPUT_DIR when several
+# datasets are built
+TREND_PAGE = 'trends.html'
+# Content-hashed chart JSON, next to each dataset's pages
+CHART_ASSET_DIR = 'charts'
+CHART_ASSET_PATTERN = re.compile(CHART_ASSET_DIR + r'/([0-9a-f]{20}\.json)')
+
+# Incremental build state kept between runs (not deployed)
+BUILD_CACHE_DIR = '.build-cache'
+MANIFEST_PATH = os.path.join(BUILD_CACHE_DIR, 'manifest.json')
+MANIFEST_DIR = os.path.join(BUILD_CACHE_DIR, 'manifests')
+MANIFEST_VERSION = 2
+FRAME_CACHE_DIR = os.path.join(BUILD_CACHE_DIR, 'frames')
+AGGREGATE_STATE_DIR = os.path.join(BUILD_CACHE_DIR, 'aggregates')
+TEMPLATE_CACHE_DIR = os.path.join(BUILD_CACHE_DIR, 'templates')
+AGGREGATE_STATE_VERSION = 4
+
+# Exit status used when a build had nothing new to write
+EXIT_UNCHANGED = 3
+
+# Where --profile writes its JSON report unless given a path
+PROFILE_PATH = os.path.join(BUILD_CACHE_DIR, 'profile.json')
+
+# Outputs that get precompressed siblings (for nginx gzip_static/brotli_static),
+# and the content hash of each as last compressed
+PRECOMPRESSED_TYPES = ('.html', '.json', '.js')
+COMPRESSED_SUFFIXES = ('.gz', '.br')
+COMPRESSION_MANIFEST_PATH = os.path.join(BUILD_CACHE_DIR, 'compressed.json')
+PROFILE_VERSION = 1
+
+# Observation questions: one column per campus context
+OBSERVATION_CONTEXTS = [
+    {'suffix': '_1', 'label': 'Campus Community'},
+    {'suffix': '_2', 'label': 'Classroom'},
+    {'suffix': '_3', 'label': 'Conversations with Peers'},
+    {'suffix': '_4', 'label': 'Conversations with Staff/Faculty'}
+]
+MISOGYNY_COLUMNS = ['Q10' + ctx['suffix'] for ctx in OBSERVATION_CONTEXTS]
+QUEERPHOBIA_COLUMNS = ['Q19' + ctx['suffix'] for ctx in OBSERVATION_CONTEXTS]
+TRANSPHOBIA_COLUMNS = ['Q28' + ctx['suffix'] for ctx in OBSERVATION_CONTEXTS]
+
+# Every open-text question, including the "Other - Text" fields
+OPEN_TEXT_COLUMNS = ['Q2_5_TEXT', 'Q3_5_TEXT', 'Q4_6_TEXT', 'Q4_10_TEXT', 'Q6_6_TEXT',
+                     'Q11_10_TEXT', 'Q14', 'Q15_14_TEXT', 'Q20_10_TEXT', 'Q24_15_TEXT',
+                     'Q29_10_TEXT', 'Q33_14_TEXT', 'Q37_1_TEXT', 'Q37_2_TEXT',
+                     'Q40', 'Q41', 'Q42', 'Q43']
+
+# Text iQ labels exported next to some open-text answers as "<field> - <attribute>"
+# columns; multi-valued labels (emotions, topics) are comma-separated
+ENRICHED_TEXT_FIELDS = {'Q14': 'Impact of Misogyny (Q14)', 'Q42': 'Education on Sexism (Q42)'}
+ENRICHMENT_ATTRIBUTES = {
+    'Sentiment': 'category',
+    'Sentiment Score': 'numeric',
+    'Emotion': 'category',
+    'Topics': 'category',
+    'Actionability': 'category',
+    'Effort Numeric': 'numeric'
+}
+# Sentiment labels from most negative to most positive, with their colours
+SENTIMENT_COLORS = {
+    'Very Negative': '#c0392b',
+    'Negative': '#e74c3c',
+    'Mixed': '#f39c12',
+    'Neutral': '#95a5a6',
+    'Positive': '#2ecc71',
+    'Very Positive': '#27ae60'
+}
+# Topic label Text iQ assigns when no topic model matched
+UNKNOWN_TOPIC = 'Unknown'
+# Effort scores (how hard the respondent found things) from hardest to easiest
+EFFORT_LABELS = {-2: 'Very Hard', -1: 'Hard', 0: 'Neutral', 1: 'Easy', 2: 'Very Easy'}
+
+def enrichment_columns(field):
+    """Return the exported enrichment columns of a text field"""
+    return [f'{field} - {attribute}' for attribute in ENRICHMENT_ATTRIBUTES]
+
+# Observation questions by topic, with the colours their charts use
+OBSERVATION_TOPICS = {
+    'misogyny': {'columns': MISOGYNY_COLUMNS,
+                 'colors': {'Yes': 'green', 'No': 'red', 'Unsure': 'gold'}},
+    'queerphobia': {'columns': QUEERPHOBIA_COLUMNS,
+                    'colors': {'Yes': 'purple', 'No': 'red', 'Unsure': 'gold'}},
+    'transphobia': {'columns': TRANSPHOBIA_COLUMNS,
+                    'colors': {'Yes': 'blue', 'No': 'red', 'Unsure': 'gold'}}
+}
+
+# Chart dependency graph: each node lists the source columns it reads and the
+# SurveyAnalyzer method that builds its chart entries
+CHART_NODES = {
+    'gender': {'columns': ['Q2'], 'builder': '_chart_gender'},
+    'role': {'columns': ['Q6'], 'builder': '_chart_role'},
+    'faculty': {'columns': ['Q5'], 'builder': '_chart_faculty'},
+    'misogyny': {'columns': MISOGYNY_COLUMNS, 'builder': '_chart_misogyny'},
+    'queerphobia': {'columns': QUEERPHOBIA_COLUMNS, 'builder': '_chart_queerphobia'},
+    'transphobia': {'columns': TRANSPHOBIA_COLUMNS, 'builder': '_chart_transphobia'},
+    'comparison': {'columns': MISOGYNY_COLUMNS + QUEERPHOBIA_COLUMNS + TRANSPHOBIA_COLUMNS,
+                   'builder': '_chart_comparison'},
+    'misogyny_by_gender': {'columns': MISOGYNY_COLUMNS + ['Q2'],
+                           'builder': '_chart_misogyny_by_gender'},
+    'queerphobia_by_gender': {'columns': QUEERPHOBIA_COLUMNS + ['Q2'],
+                              'builder': '_chart_queerphobia_by_gender'},
+    'transphobia_by_gender': {'columns': TRANSPHOBIA_COLUMNS + ['Q2'],
+                              'builder': '_chart_transphobia_by_gender'},
+    'q14_enrichment': {'columns': enrichment_columns('Q14'), 'builder': '_chart_q14_enrichment'},
+    'q42_enrichment': {'columns': enrichment_columns('Q42'), 'builder': '_chart_q42_enrichment'}
+}
+
+# What each page reads: chart nodes, analyzed text fields and any other columns
+PAGE_INPUTS = {
+    'index': {'charts': ['gender', 'role', 'faculty'], 'text': [],
+              'columns': ['Finished', 'Duration (in seconds)']},
+    'misogyny': {'charts': ['misogyny', 'misogyny_by_gender'], 'text': ['Q11_10_TEXT'],
+                 'columns': []},
+    'queerphobia': {'charts': ['queerphobia', 'queerphobia_by_gender'], 'text': ['Q20_10_TEXT'],
+                    'columns': []},
+    'transphobia': {'charts': ['transphobia', 'transphobia_by_gender'], 'text': ['Q29_10_TEXT'],
+                    'columns': []},
+    'text-analysis': {'charts': ['q14_enrichment', 'q42_enrichment'], 'text': ['Q11_10_TEXT', 'Q20_10_TEXT', 'Q29_10_TEXT', 'Q40'],
+                      'columns': ['Q2'] + OPEN_TEXT_COLUMNS},
+    'comparative': {'charts': ['comparison'], 'text': [], 'columns': []},
+    'dashboard-data': {'charts': [], 'text': [],
+                       'columns': ['Q2', 'Q5', 'Q6', 'Q7'] + MISOGYNY_COLUMNS
+                                  + QUEERPHOBIA_COLUMNS + TRANSPHOBIA_COLUMNS},
+    'dashboard-filters': {'charts': [], 'text': [], 'columns': []},
+    'dashboard-charts': {'charts': [], 'text': [], 'columns': []}
+}
+
+# Declared dtype of every column the dashboard reads: 'category' for
+# Likert/Yes-No-Unsure answers and demographics, 'numeric' or 'text'
+COLUMN_SCHEMA = {
+    'ResponseId': 'text',
+    'Finished': 'category',
+    'Progress': 'numeric',
+    'Duration (in seconds)': 'numeric',
+    'Q1': 'category',
+    'Q2': 'category',
+    'Q3': 'category',
+    'Q4': 'category',
+    'Q5': 'category',
+    'Q6': 'category',
+    'Q7': 'category',
+    'Q8': 'category',
+    'Q11_10_TEXT': 'text',
+    'Q20_10_TEXT': 'text',
+    'Q29_10_TEXT': 'text',
+    'Q40': 'text'
+}
+for _col in MISOGYNY_COLUMNS + QUEERPHOBIA_COLUMNS + TRANSPHOBIA_COLUMNS:
+    COLUMN_SCHEMA[_col] = 'category'
+for _col in OPEN_TEXT_COLUMNS:
+    COLUMN_SCHEMA[_col] = 'text'
+for _field in ENRICHED_TEXT_FIELDS:
+    for _attribute, _dtype in ENRICHMENT_ATTRIBUTES.items():
+        COLUMN_SCHEMA[f'{_field} - {_attribute}'] = _dtype
+
+def value_counts(series):
+    """series.value_counts(), ordered as for object dtype even when series is categorical.
+
+    Categorical value_counts lists unused categories and breaks count ties in
+    category order; here ties keep first-appearance order so charts don't
+    depend on the column's dtype.
+    """
+    if not isinstance(series.dtype, pd.CategoricalDtype):
+        return series.value_counts()
+    codes = series.cat.codes.to_numpy()
+    codes = codes[codes >= 0]
+    uniques, first_seen = np.unique(codes, return_index=True)
+    order = uniques[np.argsort(first_seen, kind='stable')]
+    counts = np.bincount(codes, minlength=len(series.cat.categories))[order]
+    keys = pd.Index(np.asarray(series.cat.categories)[order], name=series.name)
+    return pd.Series(counts, index=keys, name='count').sort_values(ascending=False, kind='stable')
+
+def has_import_id_row(csv_path):
+    """Check whether the export has Qualtrics' ImportId metadata as its third line"""
+    with open(csv_path, newline='', encoding='utf-8') as f:
+        rows = csv.reader(f)
+        for i, row in enumerate(rows):
+            if i == 2:
+                return any('ImportId' in value for value in row)
+    return False
+
+# Demographic questions: single-select answers are categorical codes, multi-select
+# answers (Qualtrics joins the chosen options with commas) become indicator matrices
+SINGLE_SELECT_DEMOGRAPHICS = {'Q5': 'Faculty', 'Q7': 'Years on Campus'}
+MULTI_SELECT_DEMOGRAPHICS = {'Q2': 'Gender Identity', 'Q3': 'Sexual Orientation',
+                             'Q4': 'Race', 'Q6': 'Role'}
+
+# Choice separator in multi-select answers: a comma outside parentheses, since
+# options like "White (British, German, ...)" contain commas themselves
+CHOICE_SEPARATOR = re.compile(r',(?![^(]*\))')
+
+def split_choices(answer):
+    """Split a multi-select answer into its chosen options"""
+    return [choice.strip() for choice in CHOICE_SEPARATOR.split(answer) if choice.strip()]
+
+def recode(series, func):
+    """Map func over a column as a categorical, calling it once per distinct value"""
+    codes, uniques = pd.factorize(series)
+    mapped = np.array([func(value) for value in uniques] + [np.nan], dtype=object)
+    # Code -1 (missing) picks the trailing NaN
+    return pd.Series(pd.Categorical(mapped[codes]), index=series.index, name=series.name)
+
+def recode_gender(answer):
+    """Collapse a gender identity answer to one category, in the dashboard's precedence order"""
+    for category in ('Woman', 'Man', 'Non-binary', 'Gender Diverse'):
+        if category in answer:
+            return category
+    return answer
+
+def choice_indicators(series):
+    """One-hot matrix (respondents x options) for a multi-select answer column.
+
+    Each distinct answer is split once; rows are then filled by indexing that
+    lookup table with the column's codes.
+    """
+    codes, uniques = pd.factorize(series)
+    split_answers = [split_choices(answer) for answer in uniques]
+    options = list(dict.fromkeys(choice for choices in split_answers for choice in choices))
+    option_index = {option: i for i, option in enumerate(options)}
+    # One extra all-False row for missing answers (code -1)
+    lookup = np.zeros((len(uniques) + 1, len(options)), dtype=bool)
+    for row, choices in enumerate(split_answers):
+        lookup[row, [option_index[choice] for choice in choices]] = True
+    return pd.DataFrame(lookup[codes], index=series.index,
+                        columns=pd.Index(options, name=series.name))
+
+def explode_choices(series):
+    """Long form of a multi-valued column: one entry per (respondent, option), indexed by respondent"""
+    indicators = choice_indicators(series)
+    rows, options = np.nonzero(indicators.to_numpy())
+    return pd.Series(indicators.columns[options], index=series.index[rows], name=series.name, dtype=object)
+
+# Dimensions of the demographic crosstab cube and the column behind each
+CUBE_DIMENSIONS = {
+    'gender': 'Gender',
+    'role': 'Q6',
+    'faculty': 'Q5',
+    'years': 'Q7',
+    'orientation': 'Q3',
+    'race': 'Q4'
+}
+CUBE_QUESTIONS = MISOGYNY_COLUMNS + QUEERPHOBIA_COLUMNS + TRANSPHOBIA_COLUMNS
+# Source columns the cube is computed from (Gender is recoded from Q2)
+CUBE_SOURCE_COLUMNS = ['Q2', 'Q6', 'Q5', 'Q7', 'Q3', 'Q4'] + CUBE_QUESTIONS
+
+# Demographic groups smaller than this are left out of breakdown charts
+MIN_BREAKDOWN_GROUP = 5
+
+class CrosstabCube:
+    """Respondent counts for every demographic category x observation question x response.
+
+    counts[dimension] is a dense int array shaped (categories, questions,
+    responses); categories, question_index and response_index map labels to
+    positions. Multi-select dimensions count a respondent once per chosen
+    option.
+    """
+
+    def __init__(self, categories, questions, responses, counts):
+        self.categories = categories
+        self.questions = questions
+        self.responses = responses
+        self.counts = counts
+        self.question_index = {question: i for i, question in enumerate(questions)}
+        self.response_index = {response: i for i, response in enumerate(responses)}
+
+    @classmethod
+    def from_frame(cls, df, dimensions=CUBE_DIMENSIONS, questions=CUBE_QUESTIONS):
+        """Build the cube with one indicator matrix product per dimension"""
+        questions = [q for q in questions if q in df.columns]
+        responses = list(dict.fromkeys(
+            value for q in questions for value in pd.unique(df[q].dropna())))
+        n = len(df)
+
+        # Respondents x (question, response) indicators
+        answered = np.zeros((n, len(questions) * len(responses)), dtype=np.int32)
+        rows = np.arange(n)
+        for i, q in enumerate(questions):
+            codes = pd.Categorical(df[q], categories=responses).codes
+            valid = codes >= 0
+            answered[rows[valid], i * len(responses) + codes[valid]] = 1
+
+        categories = {}
+        counts = {}
+        for dimension, column in dimensions.items():
+            if column not in df.columns:
+                continue
+            if column in MULTI_SELECT_DEMOGRAPHICS:
+                members = choice_indicators(df[column])
+                labels = list(members.columns)
+                members = members.to_numpy(dtype=np.int32)
+            else:
+                codes, uniques = pd.factorize(df[column])
+                labels = list(uniques)
+                members = np.zeros((n, len(labels)), dtype=np.int32)
+                valid = codes >= 0
+                members[rows[valid], codes[valid]] = 1
+            categories[dimension] = labels
+            counts[dimension] = (members.T @ answered).reshape(
+                len(labels), len(questions), len(responses))
+        return cls(categories, questions, responses, counts)
+
+    def slice(self, dimension, question):
+        """Counts for one question broken down by one dimension (categories x responses)"""
+        table = self.counts[dimension][:, self.question_index[question], :]
+        return pd.DataFrame(table, index=pd.Index(self.categories[dimension], name=dimension),
+                            columns=pd.Index(self.responses, name=question))
+
+    def response_rate(self, dimension, question, response='Yes', min_group=1):
+        """Percentage of each category answering `response`, for groups of at least min_group"""
+        table = self.slice(dimension, question)
+        totals = table.sum(axis=1)
+        table = table[totals >= max(min_group, 1)]
+        if response not in table.columns:
+            return pd.Series(0.0, index=table.index)
+        return table[response] / table.sum(axis=1) * 100
+
+# Filters offered on the observation pages and the column behind each
+FILTER_DIMENSIONS = {
+    'faculty': {'column': 'Q5', 'label': 'Faculty'},
+    'role': {'column': 'Q6', 'label': 'Role'},
+    'years': {'column': 'Q7', 'label': 'Years on Campus'},
+    'gender': {'column': 'Gender', 'label': 'Gender'}
+}
+
+def filter_profiles(df):
+    """Tally respondents by their combination of filter answers, with their observation answers.
+
+    A profile is the tuple of raw answers to every FILTER_DIMENSIONS column
+    (None when missing or not loaded). Returns respondents per profile, in
+    order of first appearance, and answers per (profile, question,
+    response). Both add up across frames, so folding an export's chunks in
+    file order gives the tallies of the whole export.
+    """
+    n = len(df)
+    keys = []
+    answers = []
+    for spec in FILTER_DIMENSIONS.values():
+        if spec['column'] in df.columns:
+            codes, uniques = pd.factorize(df[spec['column']])
+            uniques = uniques.tolist()
+        else:
+            codes, uniques = np.full(n, -1, dtype=np.int64), []
+        keys.append(np.asarray(codes, dtype=np.int64))
+        answers.append(uniques + [None])
+    if not n:
+        return {}, {}
+    profiles, first, group = np.unique(np.column_stack(keys), axis=0, return_index=True, return_inverse=True)
+    # Renumber the profiles in order of first appearance
+    order = np.argsort(first, kind='stable')
+    rank = np.empty(len(order), dtype=np.int64)
+    rank[order] = np.arange(len(order))
+    group = rank[group.reshape(-1)]
+    profiles = [tuple(values[code] for values, code in zip(answers, profile)) for profile in profiles[order]]
+    sizes = dict(zip(profiles, np.bincount(group, minlength=len(profiles)).tolist()))
+
+    counts = {}
+    for q in CUBE_QUESTIONS:
+        if q not in df.columns:
+            continue
+        codes, responses = pd.factorize(df[q])
+        valid = codes >= 0
+        cells = np.bincount(group[valid] * len(responses) + codes[valid], minlength=len(profiles) * len(responses))
+        responses = responses.tolist()
+        for cell in np.flatnonzero(cells):
+            g, r = divmod(int(cell), len(responses))
+            counts[profiles[g], q, responses[r]] = int(cells[cell])
+    return sizes, counts
+
+def build_filter_bundle(columns, profile_sizes, profile_counts, questions, responses):
+    """Aggregate the observation answers into a compact bundle for client-side filtering.
+
+    Takes the filter_profiles() tallies of every response, the
+    FILTER_DIMENSIONS columns that were loaded and the observation
+    questions and responses to count. Respondents are grouped by their
+    combination of filter values; the bundle holds the category
+    dictionaries (in order of first appearance), each group's filter codes
+    (a bitmask of chosen options for multi-select filters) and integer
+    answer counts per group x question x response. No individual responses
+    are included.
+
+    A selection of one filter is answered from that filter's marginal table
+    (category x question x response), so it counts every matching
+    respondent; categories of fewer than MIN_BREAKDOWN_GROUP respondents are
+    suppressed there. Selections of several filters sum the groups instead.
+    Groups of fewer than MIN_BREAKDOWN_GROUP respondents are merged into one
+    suppressed remainder, the last group, whose filter codes are None, and
+    left_out holds how many respondents of the remainder match each such
+    selection. The remainder is grown from the smallest groups until it
+    reaches the cutoff too.
+    """
+    seen = [profile for profile, size in profile_sizes.items() if size]
+    filters = {}
+    keys = []
+    for i, (name, spec) in enumerate(FILTER_DIMENSIONS.items()):
+        column = spec['column']
+        if column not in columns:
+            continue
+        answers = list(dict.fromkeys(profile[i] for profile in seen if profile[i] is not None))
+        if column in MULTI_SELECT_DEMOGRAPHICS:
+            choices = {answer: split_choices(answer) for answer in answers}
+            categories = list(dict.fromkeys(choice for answer in answers for choice in choices[answer]))[:31]
+            bits = {category: 1 << bit for bit, category in enumerate(categories)}
+            codes = {answer: sum(bits.get(choice, 0) for choice in set(choices[answer])) for answer in answers}
+            codes[None] = 0
+        else:
+            categories = [str(answer) for answer in answers]
+            codes = {answer: code for code, answer in enumerate(answers)}
+            codes[None] = -1
+        filters[name] = {'label': spec['label'], 'multi': column in MULTI_SELECT_DEMOGRAPHICS,
+                         'categories': categories}
+        keys.append([codes[profile[i]] for profile in seen])
+
+    # Profiles whose answers give the same filter codes form one group
+    if keys:
+        profiles, group = np.unique(np.array(keys, dtype=np.int64).T, axis=0, return_inverse=True)
+        group = group.reshape(-1)
+    else:
+        profiles, group = np.zeros((1, 0), dtype=np.int64), np.zeros(len(seen), dtype=np.int64)
+    group_of = dict(zip(seen, group.tolist()))
+    sizes = np.bincount(group, weights=[profile_sizes[profile] for profile in seen],
+                        minlength=len(profiles)).astype(np.int64)
+
+    question_index = {q: i for i, q in enumerate(questions)}
+    response_index = {r: i for i, r in enumerate(responses)}
+    counts = np.zeros((len(profiles), len(questions) * len(responses)), dtype=np.int64)
+    for (profile, q, response), count in profile_counts.items():
+        if count and profile in group_of and q in question_index:
+            counts[group_of[profile], question_index[q] * len(responses) + response_index[response]] += count
+
+    # Marginal tables for single-filter selections, small categories suppressed
+    marginals = {}
+    for i, (name, spec) in enumerate(filters.items()):
+        options = np.arange(len(spec['categories']))
+        if spec['multi']:
+            members = (profiles[:, i, None] >> options & 1).astype(bool)
+        else:
+            members = profiles[:, i, None] == options
+        totals = members.T.astype(np.int64) @ sizes
+        table = members.T.astype(np.int64) @ counts
+        shown = totals >= MIN_BREAKDOWN_GROUP
+        marginals[name] = {
+            'sizes': [int(size) if keep else None for size, keep in zip(totals, shown)],
+            'counts': (table * shown[:, None]).reshape(-1).tolist()
+        }
+
+    # Suppress small groups, growing the remainder until it is not small itself
+    suppressed = sizes < MIN_BREAKDOWN_GROUP
+    for g in np.argsort(sizes, kind='stable'):
+        if not 0 < sizes[suppressed].sum() < MIN_BREAKDOWN_GROUP:
+            break
+        suppressed[g] = True
+    kept = np.flatnonzero(~suppressed)
+    remainder = [None] if suppressed.any() else []
+    if remainder:
+        counts = np.vstack([counts[kept], counts[suppressed].sum(axis=0)])
+        group_sizes = sizes[kept].tolist() + [int(sizes[suppressed].sum())]
+    else:
+        counts = counts[kept]
+        group_sizes = sizes[kept].tolist()
+
+    # Respondents of the remainder matching each selection of two or more filters,
+    # keyed by the selected option of every filter (-1 for "All")
+    left_out = Counter()
+    for profile, size in zip(profiles[suppressed], sizes[suppressed]):
+        choices = []
+        for code, spec in zip(profile, filters.values()):
+            if spec['multi']:
+                chosen = [bit for bit in range(len(spec['categories'])) if code >> bit & 1]
+            else:
+                chosen = [int(code)] if code >= 0 else []
+            choices.append([-1] + chosen)
+        for selection in itertools.product(*choices):
+            if sum(value >= 0 for value in selection) > 1:
+                left_out[','.join(map(str, selection))] += int(size)
+
+    return {
+        'filters': filters,
+        'questions': questions,
+        'responses': [str(response) for response in responses],
+        'contexts': [ctx['label'] for ctx in OBSERVATION_CONTEXTS],
+        'topics': {topic: {'questions': spec['columns'], 'colors': spec['colors']}
+                   for topic, spec in OBSERVATION_TOPICS.items()},
+        'min_group': MIN_BREAKDOWN_GROUP,
+        'sizes': group_sizes,
+        'groups': {name: profiles[kept, i].tolist() + remainder for i, name in enumerate(filters)},
+        'counts': counts.reshape(-1).tolist(),
+        'marginals': marginals,
+        'left_out': dict(sorted(left_out.items()))
+    }
+
+# Themes scored in the open-text analysis: a response has a theme when its
+# cleaned text contains any of the theme's keywords
+TEXT_THEMES = {
+    "Classroom Experiences": ["class", "classroom", "professor", "faculty", "lecture", "student", "course", "teaching"],
+    "Social Interactions": ["friend", "peer", "social", "group", "talk", "conversation", "interact"],
+    "Harassment & Discrimination": ["harass", "discriminat", "bias", "attack", "target", "threat", "abuse", "aggressive"],
+    "Online Experiences": ["online", "email", "social media", "facebook", "twitter", "instagram", "reddit", "zoom", "message"],
+    "Institutional Issues": ["policy", "report", "complaint", "response", "administration", "university", "system", "support", "resource"],
+    "Gender & Identity": ["gender", "woman", "man", "trans", "queer", "identity", "lgbtq", "sexuality", "female", "male"]
+}
+
+class ThemeMatcher:
+    """Tag texts with every theme whose keywords they contain.
+
+    Each theme's keywords are compiled once into a single alternation, so a
+    text is scanned once per theme instead of once per keyword. With Arrow
+    backed strings the scans run in Arrow's RE2 automaton over the whole
+    column. Matching has the same `keyword in text` substring semantics as a
+    plain keyword loop.
+    """
+
+    def __init__(self, themes=TEXT_THEMES):
+        self.themes = list(themes)
+        self.patterns = ['|'.join(re.escape(keyword) for keyword in keywords)
+                         for keywords in themes.values()]
+
+    def match(self, texts):
+        """Return a texts x themes boolean DataFrame (texts is a Series of strings)"""
+        try:
+            texts = texts.astype('string[pyarrow]')
+        except ImportError:
+            pass
+        matrix = np.zeros((len(texts), len(self.themes)), dtype=bool)
+        for i, pattern in enumerate(self.patterns):
+            matrix[:, i] = texts.str.contains(pattern, regex=True).to_numpy(dtype=bool)
+        return pd.DataFrame(matrix, index=texts.index, columns=self.themes)
+
+    @staticmethod
+    def cooccurrence(matrix):
+        """Number of texts tagged with each pair of themes (diagonal: per theme)"""
+        values = matrix.to_numpy(dtype=np.int64)
+        return pd.DataFrame(values.T @ values, index=matrix.columns, columns=matrix.columns)
+
+THEME_MATCHER = ThemeMatcher()
+
+# Tokenization of open-text answers: lowercase, drop punctuation and digits,
+# then keep words longer than three letters that aren't stop words
+PUNCTUATION = re.compile(r'[^\w\s]')
+DIGITS = re.compile(r'\d+')
+# NLTK's English stop-word list (nltk 3.8.1), bundled so no corpus lookup or
+# download is needed, plus survey boilerplate
+STOP_WORDS = frozenset([
+    'i', 'me', 'my', 'myself', 'we', 'our', 'ours', 'ourselves', 'you', "you're", "you've",
+    "you'll", "you'd", 'your', 'yours', 'yourself', 'yourselves', 'he', 'him', 'his',
+    'himself', 'she', "she's", 'her', 'hers', 'herself', 'it', "it's", 'its', 'itself',
+    'they', 'them', 'their', 'theirs', 'themselves', 'what', 'which', 'who', 'whom', 'this',
+    'that', "that'll", 'these', 'those', 'am', 'is', 'are', 'was', 'were', 'be', 'been',
+    'being', 'have', 'has', 'had', 'having', 'do', 'does', 'did', 'doing', 'a', 'an', 'the',
+    'and', 'but', 'if', 'or', 'because', 'as', 'until', 'while', 'of', 'at', 'by', 'for',
+    'with', 'about', 'against', 'between', 'into', 'through', 'during', 'before', 'after',
+    'above', 'below', 'to', 'from', 'up', 'down', 'in', 'out', 'on', 'off', 'over', 'under',
+    'again', 'further', 'then', 'once', 'here', 'there', 'when', 'where', 'why', 'how',
+    'all', 'any', 'both', 'each', 'few', 'more', 'most', 'other', 'some', 'such', 'no',
+    'nor', 'not', 'only', 'own', 'same', 'so', 'than', 'too', 'very', 's', 't', 'can',
+    'will', 'just', 'don', "don't", 'should', "should've", 'now', 'd', 'll', 'm', 'o', 're',
+    've', 'y', 'ain', 'aren', "aren't", 'couldn', "couldn't", 'didn', "didn't", 'doesn',
+    "doesn't", 'hadn', "hadn't", 'hasn', "hasn't", 'haven', "haven't", 'isn', "isn't", 'ma',
+    'mightn', "mightn't", 'mustn', "mustn't", 'needn', "needn't", 'shan', "shan't",
+    'shouldn', "shouldn't", 'wasn', "wasn't", 'weren', "weren't", 'won', "won't", 'wouldn',
+    "wouldn't"
+]) | {
+    'please', 'specify', 'text', 'importid', 'qid', 'yes', 'no', 'that', 'things', 'also'}
+MIN_TEXT_LENGTH = 20
+
+def answered_text_mask(series):
+    """Which answers are non-empty, however short, skipping the ImportId row"""
+    answered = series.notna() & (series.str.strip() != '') & ~series.str.contains('ImportId', na=False)
+    return answered.to_numpy(dtype=bool, na_value=False)
+
+def tokenize(text):
+    """The kept tokens of one answer, in order"""
+    return [word for word in DIGITS.sub('', PUNCTUATION.sub('', text.lower())).split()
+            if len(word) > 3 and word not in STOP_WORDS]
+
+def take_rows(ids, offsets, rows):
+    """The token ids of the given responses (by position) of a CSR token array, with their offsets"""
+    lengths = np.diff(offsets)[rows]
+    taken = np.zeros(len(lengths) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=taken[1:])
+    # Each kept token's position: its response's start plus its place within the response
+    positions = np.repeat(offsets[:-1][rows] - taken[:-1], lengths) + np.arange(taken[-1])
+    return ids[positions], taken
+
+# Phrase counting: n-gram lengths, how many phrases each bounded summary
+# keeps, and how many responses are counted per streamed chunk
+PHRASE_LENGTHS = (2, 3)
+PHRASE_CAPACITY = 2000
+PHRASE_CHUNK_SIZE = 10000
+# N-grams are coded in this base, so a phrase keeps its code as the
+# vocabulary grows (up to two million distinct words per field)
+PHRASE_CODE_BASE = 1 << 21
+
+class FrequentItems:
+    """Bounded-memory heavy-hitter counter over integer keys (a Misra-Gries summary).
+
+    At most `capacity` keys are kept. Each update merges a batch into the
+    summary; when more than `capacity` keys remain, the (capacity + 1)-th
+    largest count is subtracted from every key and keys left at zero are
+    dropped. Kept counts are lower bounds, true counts are at most
+    count + error, and every key occurring more than total / (capacity + 1)
+    times is kept. With no overflow the counts are exact.
+    """
+
+    def __init__(self, capacity=PHRASE_CAPACITY):
+        self.capacity = capacity
+        self.keys = np.zeros(0, dtype=np.int64)
+        self.counts = np.zeros(0, dtype=np.int64)
+        self.error = 0
+        self.total = 0
+
+    def update(self, keys, counts=None):
+        """Merge a batch of keys (with optional per-key counts) into the summary"""
+        keys = np.asarray(keys, dtype=np.int64)
+        counts = np.ones(len(keys), dtype=np.int64) if counts is None else np.asarray(counts, dtype=np.int64)
+        self.total += int(counts.sum())
+        keys, inverse = np.unique(np.concatenate([self.keys, keys]), return_inverse=True)
+        counts = np.bincount(inverse, weights=np.concatenate([self.counts, counts]),
+                             minlength=len(keys)).astype(np.int64)
+        if len(keys) > self.capacity:
+            cut = len(counts) - self.capacity - 1
+            threshold = np.partition(counts, cut)[cut]
+            keep = counts > threshold
+            keys, counts = keys[keep], counts[keep] - threshold
+            self.error += int(threshold)
+        self.keys, self.counts = keys, counts
+
+    def to_state(self):
+        """The summary as plain arrays and numbers"""
+        return dict(vars(self))
+
+    @classmethod
+    def from_state(cls, state):
+        """A summary restored from to_state()"""
+        summary = cls()
+        vars(summary).update(state)
+        return summary
+
+def phrase_codes(ids, offsets, n):
+    """Codes of the n-grams inside each response of a run of CSR offsets into ids"""
+    first = offsets[0]
+    tokens = ids[first:offsets[-1]].astype(np.int64)
+    # Position just past the end of each token's response
+    ends = np.repeat(offsets[1:] - first, np.diff(offsets))
+    positions = np.arange(len(tokens))
+    valid = positions[positions + n <= ends]
+    codes = np.zeros(len(valid), dtype=np.int64)
+    for j in range(n):
+        codes = codes * PHRASE_CODE_BASE + tokens[valid + j]
+    return codes
+
+def phrase_counts(capacity=PHRASE_CAPACITY):
+    """Empty phrase counts: a FrequentItems state per n-gram length and no pending responses"""
+    return {'summaries': {n: FrequentItems(capacity).to_state() for n in PHRASE_LENGTHS},
+            'pending': {'ids': np.zeros(0, dtype=np.int32), 'offsets': np.zeros(1, dtype=np.int64)}}
+
+def count_phrases(phrases, ids, offsets, chunk_size=PHRASE_CHUNK_SIZE):
+    """Stream tokenized responses' n-grams, chunk by chunk, into phrase counts from phrase_counts().
+
+    ids and offsets are the responses' tokens in CSR form. Responses are
+    counted chunk_size at a time; the last ones, short of a chunk, wait in
+    the pending buffer for the next call. Chunks therefore don't depend on
+    how the responses were split across calls, and memory stays at one
+    chunk plus the bounded summaries however many responses there are.
+    Phrases never span two responses.
+    """
+    pending = phrases['pending']
+    ids = np.concatenate([pending['ids'], ids[offsets[0]:offsets[-1]]])
+    offsets = np.concatenate([pending['offsets'], offsets[1:] - offsets[0] + pending['offsets'][-1]])
+    counted = (len(offsets) - 1) // chunk_size * chunk_size
+    for n, state in phrases['summaries'].items():
+        summary = FrequentItems.from_state(state)
+        for start in range(0, counted, chunk_size):
+            summary.update(phrase_codes(ids, offsets[start:start + chunk_size + 1], n))
+        phrases['summaries'][n] = summary.to_state()
+    phrases['pending'] = {'ids': ids[offsets[counted]:], 'offsets': offsets[counted:] - offsets[counted]}
+
+def counted_phrases(phrases, words):
+    """(phrase, count) pairs of phrase counts, the pending responses counted as the last chunk.
+
+    Counts are guaranteed lower bounds, exact unless a summary overflowed.
+    """
+    pending = phrases['pending']
+    pairs = []
+    for n, state in phrases['summaries'].items():
+        summary = FrequentItems.from_state(state)
+        summary.update(phrase_codes(pending['ids'], pending['offsets'], n))
+        pairs.extend((phrase_text(code, n, words), count)
+                     for code, count in zip(summary.keys.tolist(), summary.counts.tolist()))
+    return pairs
+
+def phrase_text(code, n, words):
+    """The words of an n-gram code from phrase_codes()"""
+    parts = []
+    for _ in range(n):
+        code, term = divmod(code, PHRASE_CODE_BASE)
+        parts.append(words[term])
+    return ' '.join(reversed(parts))
+
+def tally(values):
+    """Occurrences of each value (missing values skipped), in order of first appearance"""
+    codes, uniques = pd.factorize(values)
+    counts = np.bincount(codes[codes >= 0], minlength=len(uniques))
+    return dict(zip(uniques.tolist(), counts.tolist()))
+
+def table_counts(table, name=None):
+    """A tally's non-zero counts as a Series, ordered as value_counts() orders them"""
+    table = {value: count for value, count in table.items() if count}
+    return pd.Series(list(table.values()), index=pd.Index(list(table), name=name),
+                     name='count', dtype=np.int64).sort_values(ascending=False, kind='stable')
+
+def enrichment_tables(df, field):
+    """Tally the enrichment columns of one field in a frame (missing columns count as empty).
+
+    Multi-valued emotions and topics count once per label (UNKNOWN_TOPIC
+    dropped), and topic x sentiment pairs once per respondent. The tallies
+    and score sums add up across frames, so folding an export's chunks in
+    file order gives the tables of the whole export.
+    """
+    def column(attribute):
+        name = f'{field} - {attribute}'
+        if name in df.columns:
+            return df[name]
+        return pd.Series(np.nan, index=df.index, dtype=object)
+
+    def labels(attribute):
+        values = column(attribute).dropna()
+        return values.astype(str)[values.astype(str) != '']
+
+    def exploded(attribute):
+        values = explode_choices(column(attribute))
+        return values[values != UNKNOWN_TOPIC]
+
+    def scores(attribute):
+        return pd.to_numeric(column(attribute), errors='coerce').dropna()
+
+    sentiment, topics = labels('Sentiment'), exploded('Topics')
+    pairs = pd.DataFrame({'Topic': topics}).join(sentiment.rename('Sentiment'), how='inner')
+    sentiment_scores, effort = scores('Sentiment Score'), scores('Effort Numeric')
+    return {
+        'sentiment': tally(sentiment),
+        'score_total': float(sentiment_scores.sum()),
+        'score_count': len(sentiment_scores),
+        'emotions': tally(exploded('Emotion')),
+        'topics': tally(topics),
+        'topic_sentiment': tally(pd.Series(list(zip(pairs['Topic'], pairs['Sentiment'])), dtype=object)),
+        'actionability': tally(labels('Actionability')),
+        'effort': tally(effort.round().astype(int)),
+        'effort_total': float(effort.sum()),
+        'effort_count': len(effort)
+    }
+
+class EnrichmentAnalytics:
+    """Views of a text field's exported sentiment, emotion, topic, actionability and effort labels.
+
+    Built from the tallies of enrichment_tables(), folded over every
+    response; counts come out ordered as value_counts() and crosstab()
+    over the responses themselves would order them.
+    """
+
+    def __init__(self, tables):
+        self.tables = tables
+
+    def sentiment_counts(self):
+        """Responses per sentiment label, from most negative to most positive"""
+        counts = table_counts(self.tables['sentiment'])
+        order = [label for label in SENTIMENT_COLORS if label in counts.index]
+        order += [label for label in counts.index if label not in SENTIMENT_COLORS]
+        return counts.reindex(order)
+
+    def mean_score(self):
+        """Mean sentiment score, or None without scores"""
+        count = self.tables['score_count']
+        return self.tables['score_total'] / count if count else None
+
+    def emotion_counts(self):
+        """Responses expressing each emotion (a response can express several)"""
+        return table_counts(self.tables['emotions'])
+
+    def topic_counts(self):
+        """Responses mentioning each topic"""
+        return table_counts(self.tables['topics'])
+
+    def actionability_counts(self):
+        """Responses per actionability label (suggestions, response needed, ...)"""
+        return table_counts(self.tables['actionability'])
+
+    def effort_counts(self):
+        """Responses per effort score, from hardest to easiest"""
+        counts = table_counts(self.tables['effort'])
+        return counts.reindex(sorted(counts.index)).rename(
+            index=lambda score: EFFORT_LABELS.get(score, str(score)))
+
+    def mean_effort(self):
+        """Mean effort score, or None without scores"""
+        count = self.tables['effort_count']
+        return self.tables['effort_total'] / count if count else None
+
+    def topic_sentiment(self):
+        """Topics x sentiment labels table of response counts"""
+        pairs = {pair: count for pair, count in self.tables['topic_sentiment'].items() if count}
+        if not pairs:
+            return pd.DataFrame()
+        labels = sorted({sentiment for _, sentiment in pairs})
+        order = [label for label in SENTIMENT_COLORS if label in labels]
+        order += [label for label in labels if label not in SENTIMENT_COLORS]
+        # Most mentioned topics first; topics with no sentiment label have no row
+        paired = {topic for topic, _ in pairs}
+        topics = [topic for topic in self.topic_counts().index if topic in paired]
+        table = pd.DataFrame([[pairs.get((topic, label), 0) for label in order] for topic in topics],
+                             index=pd.Index(topics, name='Topic'),
+                             columns=pd.Index(order, name='Sentiment'), dtype=np.int64)
+        return table
+
+def distinctiveness(group_counts):
+    """TF-IDF of each term in each group (groups x terms counts), treating every group as one document.
+
+    Terms used by every group score zero, so each group's top terms are the
+    ones it uses more than the others.
+    """
+    totals = group_counts.sum(axis=1, keepdims=True)
+    tf = np.divide(group_counts, totals, out=np.zeros(group_counts.shape), where=totals > 0)
+    document_frequency = (group_counts > 0).sum(axis=0)
+    idf = np.log(len(group_counts) / np.maximum(document_frequency, 1))
+    return tf * idf
+
+def padded(counts, size):
+    """A count array extended with zeros to size entries"""
+    if len(counts) >= size:
+        return counts
+    return np.concatenate([counts, np.zeros(size - len(counts), dtype=np.int64)])
+
+def add_counts(counts, ids, size, sign=1):
+    """A count array over size ids plus sign times the occurrences of each of ids"""
+    return padded(counts, size) + sign * np.bincount(ids, minlength=size)
+
+# Columns every load needs for cleaning, and the columns cleaning derives
+CORE_COLUMNS = (['ResponseId', 'Q1', 'Finished', 'Duration (in seconds)']
+                + list(MULTI_SELECT_DEMOGRAPHICS) + list(SINGLE_SELECT_DEMOGRAPHICS))
+DERIVED_COLUMNS = ['completed_survey', 'Gender']
+
+def page_columns(page):
+    """Return the source columns a page reads"""
+    inputs = PAGE_INPUTS[page]
+    columns = list(inputs['columns']) + list(inputs['text'])
+    for name in inputs['charts']:
+        columns.extend(CHART_NODES[name]['columns'])
+    return columns
+
+def dashboard_columns():
+    """Return every source column the dashboard reads, in a stable order"""
+    columns = list(CORE_COLUMNS)
+    for page in PAGE_INPUTS:
+        columns.extend(page_columns(page))
+    return list(dict.fromkeys(columns))
+
+# ResponseId values of Qualtrics' header rows, which repeat inside exports
+# built by concatenating several survey waves
+QUALTRICS_HEADER_IDS = ['ResponseId', 'Response ID']
+
+# Responses parsed per chunk when streaming an export
+STREAM_CHUNK_SIZE = 50000
+
+def clean_survey_frame(df):
+    """Clean a parsed export (or one chunk of it): drop metadata rows, derive columns"""
+    # Header rows of later waves in a concatenated export
+    if 'ResponseId' in df.columns:
+        metadata = df['ResponseId'].isin(QUALTRICS_HEADER_IDS) | df['ResponseId'].str.contains('ImportId', na=False)
+        if metadata.any():
+            df = df[~metadata].copy()
+
+    # Add completion flag
+    if 'Finished' in df.columns:
+        df['completed_survey'] = df['Finished'] == 'True'
+    
+    # Clean up ImportId entries if Q1 exists
+    if 'Q1' in df.columns:
+        df = df[~df['Q1'].str.contains('ImportId', na=False)].copy()
+        for col in df.columns:
+            if isinstance(df[col].dtype, pd.CategoricalDtype):
+                df[col] = df[col].cat.remove_unused_categories()
+    
+    # Clean gender data if Q2 exists
+    if 'Q2' in df.columns:
+        df['Gender'] = recode(df['Q2'], recode_gender)
+    else:
+        df['Gender'] = 'Unknown'
+    
+    # Numeric columns that held text (e.g. repeated headers) are parsed leniently
+    for col in df.columns:
+        if COLUMN_SCHEMA.get(col) == 'numeric' and not pd.api.types.is_numeric_dtype(df[col]):
+            df[col] = pd.to_numeric(df[col], errors='coerce')
+    return df
+
+# Open-text fields charted word by word, phrase by phrase and theme by theme
+# (with sample answers); every open-text field feeds the distinctive terms
+ANALYZED_TEXT_COLUMNS = list(dict.fromkeys(
+    field for inputs in PAGE_INPUTS.values() for field in inputs['text']))
+# Groups whose distinctive open-text terms the text analysis page lists
+DISTINCTIVE_TERMS_COLUMN = 'Gender'
+# Sample answers shown per analyzed text field
+SAMPLE_RESPONSES = 3
+# Every exported Text iQ label column
+ENRICHMENT_COLUMNS = [col for field in ENRICHED_TEXT_FIELDS for col in enrichment_columns(field)]
+
+class SurveyAggregates:
+    """Additive totals over survey responses, folded in one cleaned frame (or chunk) at a time.
+
+    Holds the response and completion counts, value counts of every
+    categorical column, the demographic crosstab cube, per open-text field
+    the token counts (over token ids numbered in first-seen order), theme
+    hits, phrase summaries and first sample answers, token counts per
+    DISTINCTIVE_TERMS_COLUMN group, the enrichment_tables() of every
+    enriched field and the filter_profiles() tallies behind the filter
+    bundle. Every table keeps its keys in first-seen order, so folding an
+    export's chunks in file order gives exactly the in-memory results, count
+    ties included. Frames can also be folded out again (sign=-1), given the
+    per-response text records update() returned when they were folded in;
+    keys whose count drops to zero are hidden, and reorder() restores
+    first-seen order afterwards.
+    """
+
+    def __init__(self):
+        self.responses = 0
+        self.completed = 0
+        self.duration_total = 0.0
+        self.duration_count = 0
+        self.counts = {}
+        self.cube_categories = {}
+        self.cube_counts = {}
+        self.text = {}
+        self.text_respondents = {}
+        self.enrichment = {}
+        self.filter_sizes = {}
+        self.filter_counts = {}
+
+    @staticmethod
+    def source_columns(df):
+        """The columns of a cleaned frame that update() reads"""
+        return [col for col in df.columns
+                if isinstance(df[col].dtype, pd.CategoricalDtype) or col == 'Duration (in seconds)'
+                or col in OPEN_TEXT_COLUMNS or col in ENRICHMENT_COLUMNS]
+
+    def to_state(self):
+        """The totals as plain dicts and numbers, to persist without pickling the class"""
+        return dict(vars(self))
+
+    @classmethod
+    def from_state(cls, state):
+        """Aggregates restored from to_state()"""
+        aggregates = cls()
+        vars(aggregates).update(state)
+        return aggregates
+
+    def update(self, df, sign=1, records=None):
+        """Fold a cleaned frame of responses into the totals (sign=-1 removes them).
+
+        Its text fields are tokenized unless their records are given (folding
+        out needs the records folding in returned). Returns the records.
+        """
+        if records is None:
+            with PROFILER.stage('tokenize'):
+                records = {field: self._tokenize(df, field) for field in OPEN_TEXT_COLUMNS if field in df.columns}
+        if not len(df):
+            return records
+        self.responses += sign * len(df)
+        if 'Finished' in df.columns:
+            self.completed += sign * int((df['Finished'] == 'True').sum())
+        if 'Duration (in seconds)' in df.columns:
+            durations = df['Duration (in seconds)'].dropna()
+            self.duration_total += sign * float(durations.sum())
+            self.duration_count += sign * len(durations)
+
+        for col in df.columns:
+            if isinstance(df[col].dtype, pd.CategoricalDtype):
+                codes, uniques = pd.factorize(df[col])
+                counts = np.bincount(codes[codes >= 0], minlength=len(uniques))
+                table = self.counts.setdefault(col, {})
+                for value, count in zip(uniques, counts.tolist()):
+                    table[value] = table.get(value, 0) + sign * count
+
+        cube = CrosstabCube.from_frame(df)
+        for dimension, labels in cube.categories.items():
+            # Respondents per category, so categories left empty can be dropped
+            column = CUBE_DIMENSIONS[dimension]
+            if column in MULTI_SELECT_DEMOGRAPHICS:
+                members = choice_indicators(df[column]).sum()
+            else:
+                members = df[column].value_counts(sort=False)
+            table = self.cube_categories.setdefault(dimension, {})
+            for label in labels:
+                table[label] = table.get(label, 0) + sign * int(members[label])
+            for c, q, r in zip(*np.nonzero(cube.counts[dimension])):
+                key = (dimension, labels[c], cube.questions[q], cube.responses[r])
+                self.cube_counts[key] = self.cube_counts.get(key, 0) + sign * int(cube.counts[dimension][c, q, r])
+
+        self._update_text(df, records, sign)
+        for field in ENRICHED_TEXT_FIELDS:
+            if any(col in df.columns for col in enrichment_columns(field)):
+                totals = self.enrichment.setdefault(field, {})
+                for key, value in enrichment_tables(df, field).items():
+                    if isinstance(value, dict):
+                        table = totals.setdefault(key, {})
+                        for label, count in value.items():
+                            table[label] = table.get(label, 0) + sign * count
+                    else:
+                        totals[key] = totals.get(key, 0) + sign * value
+        sizes, counts = filter_profiles(df)
+        for profile, size in sizes.items():
+            self.filter_sizes[profile] = self.filter_sizes.get(profile, 0) + sign * size
+        for key, count in counts.items():
+            self.filter_counts[key] = self.filter_counts.get(key, 0) + sign * count
+        return records
+
+    def _text_totals(self, field):
+        """The running totals of one text field, created empty on first use"""
+        if field not in self.text:
+            self.text[field] = {
+                'words': [],
+                'index': {},
+                'answered': np.zeros(0, dtype=np.int64),
+                'groups': {},
+                'long': np.zeros(0, dtype=np.int64),
+                'long_order': np.zeros(0, dtype=np.int64),
+                'responses': 0,
+                'themes': np.zeros(len(THEME_MATCHER.themes), dtype=np.int64),
+                'phrases': phrase_counts(),
+                'samples': []
+            }
+        return self.text[field]
+
+    def _tokenize(self, df, field):
+        """Tokenize a frame's answers to a text field into per-response records.
+
+        Words not seen before get the next token ids, so ids follow first
+        appearance. The records hold each response's token ids in CSR form
+        (response i has ids[offsets[i]:offsets[i + 1]]), whether it answered,
+        whether its answer is long enough to chart and its theme bits.
+        """
+        totals = self._text_totals(field)
+        series = df[field]
+        answered = answered_text_mask(series)
+        long = answered & series.str.len().gt(MIN_TEXT_LENGTH).to_numpy(dtype=bool, na_value=False)
+        token_lists = [tokenize(text) for text in series[answered].tolist()]
+        lengths = np.zeros(len(series), dtype=np.int64)
+        lengths[answered] = [len(tokens) for tokens in token_lists]
+        offsets = np.zeros(len(series) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+        codes, uniques = pd.factorize(np.array([word for tokens in token_lists for word in tokens], dtype=object))
+        words, index = totals['words'], totals['index']
+        for word in uniques:
+            if word not in index:
+                index[word] = len(words)
+                words.append(word)
+        ids = np.array([index[word] for word in uniques], dtype=np.int32)[codes]
+        themes = np.zeros(len(series), dtype=np.uint8)
+        if field in ANALYZED_TEXT_COLUMNS and long.any():
+            texts = pd.Series([' '.join(tokens) for tokens, keep in zip(token_lists, long[answered]) if keep],
+                              dtype=object)
+            bits = np.left_shift(1, np.arange(len(THEME_MATCHER.themes)))
+            themes[long] = THEME_MATCHER.match(texts).to_numpy() @ bits
+        return {'ids': ids, 'offsets': offsets, 'answered': answered, 'long': long, 'themes': themes}
+
+    def _update_text(self, df, records, sign):
+        """Fold per-response text records into the open-text totals"""
+        groups = None
+        if DISTINCTIVE_TERMS_COLUMN in df.columns:
+            groups, labels = pd.factorize(df[DISTINCTIVE_TERMS_COLUMN])
+        answered_any = np.zeros(len(df), dtype=bool)
+        for field, record in records.items():
+            totals = self._text_totals(field)
+            size = len(totals['words'])
+            ids, lengths = record['ids'], np.diff(record['offsets'])
+            answered_any |= record['answered']
+            totals['answered'] = add_counts(totals['answered'], ids, size, sign)
+            if groups is not None:
+                token_groups = np.repeat(groups, lengths)
+                for g, label in enumerate(labels):
+                    table = totals['groups'].get(label, np.zeros(0, dtype=np.int64))
+                    totals['groups'][label] = add_counts(table, ids[token_groups == g], size, sign)
+            if field not in ANALYZED_TEXT_COLUMNS:
+                continue
+
+            long_ids = ids[np.repeat(record['long'], lengths)]
+            totals['long'] = add_counts(totals['long'], long_ids, size, sign)
+            totals['responses'] += sign * int(record['long'].sum())
+            bits = record['themes'][record['long']].astype(np.int64)
+            totals['themes'] += sign * (bits[:, None] >> np.arange(len(totals['themes'])) & 1).sum(axis=0)
+            # Phrases and samples can't be folded out; reorder() recounts them
+            if sign > 0:
+                seen = pd.unique(long_ids)
+                totals['long_order'] = np.concatenate([
+                    totals['long_order'], seen[~np.isin(seen, totals['long_order'])].astype(np.int64)])
+                count_phrases(totals['phrases'], *take_rows(ids, record['offsets'], np.flatnonzero(record['long'])))
+                missing = SAMPLE_RESPONSES - len(totals['samples'])
+                if missing > 0 and field in df.columns:
+                    totals['samples'].extend(df[field][record['long']].head(missing).tolist())
+        if groups is not None:
+            counts = np.bincount(groups[answered_any & (groups >= 0)], minlength=len(labels))
+            for label, count in zip(labels, counts.tolist()):
+                self.text_respondents[label] = self.text_respondents.get(label, 0) + sign * count
+
+    def reorder(self, df, records=None):
+        """Re-derive first-appearance order of the tables from df and its text records.
+
+        Folding in appended responses keeps file order by itself; this is only
+        needed after responses were removed, changed or inserted mid-file.
+        Token ids are renumbered in first-seen order, dropping words no answer
+        uses any more; phrases, samples, enrichment tables and filter profiles
+        are recounted. Returns the records with the new token ids.
+        """
+        for col, table in self.counts.items():
+            if col in df.columns:
+                self.counts[col] = {value: table[value] for value in pd.unique(df[col].dropna()) if value in table}
+        for dimension, table in self.cube_categories.items():
+            column = CUBE_DIMENSIONS[dimension]
+            if column in MULTI_SELECT_DEMOGRAPHICS:
+                labels = choice_indicators(df[column]).columns
+            else:
+                labels = pd.unique(df[column].dropna())
+            self.cube_categories[dimension] = {label: table[label] for label in labels if label in table}
+        for field in self.enrichment:
+            self.enrichment[field] = enrichment_tables(df, field)
+        self.filter_sizes, self.filter_counts = filter_profiles(df)
+
+        renumbered = {}
+        for field, record in (records or {}).items():
+            totals = self._text_totals(field)
+            size = len(totals['words'])
+            # Every word still used, in order of first appearance
+            used = pd.unique(record['ids']).astype(np.int64)
+            new_ids = np.zeros(size, dtype=np.int32)
+            new_ids[used] = np.arange(len(used))
+            ids = new_ids[record['ids']]
+            renumbered[field] = dict(record, ids=ids)
+            totals['words'] = [totals['words'][i] for i in used]
+            totals['index'] = {word: i for i, word in enumerate(totals['words'])}
+            totals['answered'] = padded(totals['answered'], size)[used]
+            totals['groups'] = {label: padded(table, size)[used] for label, table in totals['groups'].items()}
+            if field not in ANALYZED_TEXT_COLUMNS:
+                continue
+            long_ids, long_offsets = take_rows(ids, record['offsets'], np.flatnonzero(record['long']))
+            totals['long'] = padded(totals['long'], size)[used]
+            totals['long_order'] = pd.unique(long_ids).astype(np.int64)
+            totals['phrases'] = phrase_counts()
+            count_phrases(totals['phrases'], long_ids, long_offsets)
+            totals['samples'] = df[field][record['long']].head(SAMPLE_RESPONSES).tolist()
+        return renumbered
+
+    def text_analysis(self, field, words=20, phrases=15):
+        """Top words and phrases (used at least twice), theme percentages and samples of a field's long answers.
+
+        None when the field has no long answers. Word ties keep first-seen
+        order, phrase ties are alphabetical.
+        """
+        totals = self.text.get(field)
+        if field not in ANALYZED_TEXT_COLUMNS or totals is None or totals['responses'] < 1:
+            return None
+        counts = totals['long']
+        order = totals['long_order'][counts[totals['long_order']] > 0]
+        top = order[np.argsort(-counts[order], kind='stable')[:words]]
+        used = [pair for pair in counted_phrases(totals['phrases'], totals['words']) if pair[1] >= 2]
+        used.sort(key=lambda pair: (-pair[1], pair[0]))
+        return {
+            'responses': totals['responses'],
+            'words': [(totals['words'][i], int(counts[i])) for i in top],
+            'phrases': used[:phrases],
+            'themes': dict(zip(THEME_MATCHER.themes, (totals['themes'] / totals['responses'] * 100).tolist())),
+            'samples': list(totals['samples'])
+        }
+
+    def distinctive_terms(self, k=8, min_group=MIN_BREAKDOWN_GROUP):
+        """Rank each DISTINCTIVE_TERMS_COLUMN group's most distinctive open-text terms by TF-IDF.
+
+        The open-text fields' vocabularies are joined in OPEN_TEXT_COLUMNS
+        order into one term list. Groups whose answers come from fewer than
+        min_group respondents are left out.
+        """
+        labels = [label for label in self.counts.get(DISTINCTIVE_TERMS_COLUMN, {})
+                  if self.text_respondents.get(label, 0) >= min_group]
+        if not labels:
+            return []
+        term_index = {}
+        fields = []
+        for field in OPEN_TEXT_COLUMNS:
+            totals = self.text.get(field)
+            if totals is not None:
+                ids = np.flatnonzero(totals['answered'] > 0)
+                terms = np.array([term_index.setdefault(totals['words'][i], len(term_index)) for i in ids],
+                                 dtype=np.int64)
+                fields.append((totals, ids, terms))
+        group_counts = np.zeros((len(labels), len(term_index)), dtype=np.int64)
+        for totals, ids, terms in fields:
+            for row, label in enumerate(labels):
+                table = totals['groups'].get(label)
+                if table is not None:
+                    group_counts[row, terms] += padded(table, len(totals['words']))[ids]
+        scores = distinctiveness(group_counts)
+        vocabulary = list(term_index)
+        groups = []
+        for row, label in enumerate(labels):
+            top = np.argsort(-scores[row], kind='stable')[:k]
+            groups.append({
+                'group': str(label),
+                'respondents': int(self.text_respondents[label]),
+                'terms': [vocabulary[i] for i in top if scores[row, i] > 0]
+            })
+        return groups
+
+    def value_counts(self, column):
+        """The column's value counts, ordered as value_counts() orders them"""
+        return table_counts(self.counts.get(column, {}), column)
+
+    def enrichment_analytics(self, field):
+        """The EnrichmentAnalytics of a field's folded label tables"""
+        return EnrichmentAnalytics(self.enrichment.get(field) or enrichment_tables(pd.DataFrame(), field))
+
+    def filter_bundle(self):
+        """The build_filter_bundle() of the folded responses"""
+        cube = self.crosstab_cube()
+        columns = [spec['column'] for spec in FILTER_DIMENSIONS.values() if spec['column'] in self.counts]
+        return build_filter_bundle(columns, self.filter_sizes, self.filter_counts, cube.questions, cube.responses)
+
+    def crosstab_cube(self):
+        """The CrosstabCube the folded responses would give in one frame"""
+        questions = [q for q in CUBE_QUESTIONS if q in self.counts]
+        responses = list(dict.fromkeys(r for q in questions for r, count in self.counts[q].items() if count))
+        categories = {dimension: [label for label, members in labels.items() if members]
+                      for dimension, labels in self.cube_categories.items()}
+        counts = {dimension: np.zeros((len(labels), len(questions), len(responses)), dtype=np.int32)
+                  for dimension, labels in categories.items()}
+        cube = CrosstabCube(categories, questions, responses, counts)
+        category_index = {dimension: {label: i for i, label in enumerate(labels)}
+                          for dimension, labels in categories.items()}
+        for (dimension, category, question, response), count in self.cube_counts.items():
+            if count:
+                counts[dimension][category_index[dimension][category], cube.question_index[question],
+                                  cube.response_index[response]] = count
+        return cube
+
+    def stats(self):
+        """The figures get_stats() reports"""
+        return {
+            'total_responses': self.responses,
+            'completion_rate': self.completed / self.responses * 100 if self.responses else 0,
+            'avg_duration_minutes': (self.duration_total / self.duration_count / 60
+                                     if self.duration_count else 0)
+        }
+
+def pack_frame(df):
+    """A frame's columns as plain arrays: categoricals as codes plus their categories"""
+    packed = {}
+    for col in df.columns:
+        if isinstance(df[col].dtype, pd.CategoricalDtype):
+            packed[col] = {'categories': df[col].cat.categories.tolist(),
+                           'codes': df[col].cat.codes.to_numpy()}
+        else:
+            packed[col] = {'values': df[col].to_numpy()}
+    return packed
+
+def unpack_frame(packed, rows):
+    """The rows (by position) of a frame packed by pack_frame()"""
+    return pd.DataFrame({
+        col: (pd.Categorical.from_codes(column['codes'][rows], column['categories'])
+              if 'codes' in column else column['values'][rows])
+        for col, column in packed.items()
+    })
+
+def take_records(records, rows):
+    """The text records (from SurveyAggregates.update()) of the given responses, by position"""
+    taken = {}
+    for field, record in records.items():
+        ids, offsets = take_rows(record['ids'], record['offsets'], rows)
+        taken[field] = {'ids': ids, 'offsets': offsets, 'answered': record['answered'][rows],
+                        'long': record['long'][rows], 'themes': record['themes'][rows]}
+    return taken
+
+def concat_records(first, second):
+    """The text records of two runs of responses, one after the other"""
+    combined = {}
+    for field, record in first.items():
+        other = second[field]
+        combined[field] = {
+            'ids': np.concatenate([record['ids'], other['ids']]),
+            'offsets': np.concatenate([record['offsets'], other['offsets'][1:] + record['offsets'][-1]])
+        }
+        for key in ('answered', 'long', 'themes'):
+            combined[field][key] = np.concatenate([record[key], other[key]])
+    return combined
+
+def stream_aggregates(csv_path, columns=None, chunksize=STREAM_CHUNK_SIZE):
+    """Fold a Qualtrics export into SurveyAggregates chunk by chunk.
+
+    Only `columns` (default: every dashboard column) are read, and only one
+    chunk of rows is held at a time. Numeric columns are parsed after the
+    metadata rows of every wave have been dropped.
+    """
+    columns = dashboard_columns() if columns is None else columns
+    wanted = set(columns)
+    skiprows = [1, 2] if has_import_id_row(csv_path) else [1]
+    # Text (and, until cleaned, numeric) columns stay strings even in all-blank chunks
+    dtype = {col: 'category' if kind == 'category' else 'str' for col, kind in COLUMN_SCHEMA.items()}
+    aggregates = SurveyAggregates()
+    with pd.read_csv(csv_path, skiprows=skiprows, usecols=lambda col: col in wanted,
+                     dtype=dtype, chunksize=chunksize) as reader:
+        for chunk in reader:
+            aggregates.update(clean_survey_frame(chunk))
+    return aggregates
 
 class SurveyAnalyzer:
-    """Simple class to analyze the 3C+ survey data"""
+    """Simple class to analyze the 3C+ survey data.
+
+    With stream=True the export is never loaded: only its header is parsed,
+    and aggregates() folds the rows chunk by chunk with stream_aggregates().
+    Stats, text analysis, enrichment labels, the filter bundle and every
+    chart come from the aggregates, so they come out exactly as usual, in
+    memory bounded by STREAM_CHUNK_SIZE and the size of the vocabulary.
+    """
     
-    def __init__(self, csv_path):
+    def __init__(self, csv_path, columns=None, stream=False):
         self.csv_path = csv_path
+        self.stream = stream
+        # Source columns to load (None loads every column)
+        self.columns = list(columns) if columns is not None else None
+        self.data_hash = None
         self.df = None
+        # Memoized results keyed by name, stored with the digest of their source columns
+        self._node_results = {}
+        self._text_results = {}
+        self._indicator_results = {}
+        self._cube = None
+        self._bundle = None
+        self._enrichment_results = {}
+        self._aggregates = None
+        self._column_digests = {}
+        self._lock = threading.RLock()
         self.load_data()
     
     def load_data(self):
-        """Load and clean the CSV data"""
+        """Load and clean the CSV data, using the cleaned-frame cache when possible"""
+        # Memoized charts survive a reload; they are rebuilt only if their columns changed
+        self._column_digests = {}
+        self.data_hash = file_hash(self.csv_path)
         try:
-            # Load the CSV data, skipping the question text row
-            self.df = pd.read_csv(self.csv_path, skiprows=[1])
-            
-            # Add completion flag
-            if 'Finished' in self.df.columns:
-                self.df['completed_survey'] = self.df['Finished'] == 'True'
-            
-            # Clean up ImportId entries if Q1 exists
-            if 'Q1' in self.df.columns:
-                self.df = self.df[~self.df['Q1'].str.contains('ImportId', na=False)].copy()
-            
-            # Clean gender data if Q2 exists
-            if 'Q2' in self.df.columns:
-                self.df['Gender'] = self.df['Q2'].apply(
-                    lambda x: 'Woman' if isinstance(x, str) and 'Woman' in x else
-                             ('Man' if isinstance(x, str) and 'Man' in x else
-                             ('Non-binary' if isinstance(x, str) and 'Non-binary' in x else
-                             ('Gender Diverse' if isinstance(x, str) and 'Gender Diverse' in x else x)))
-                )
-            else:
-                self.df['Gender'] = 'Unknown'
-            
-            # Clean duration data
-            if 'Duration (in seconds)' in self.df.columns:
-                self.df['Duration (in seconds)'] = pd.to_numeric(
-                    self.df['Duration (in seconds)'], errors='coerce')
+            if self.stream:
+                # Just the columns; aggregates() streams the rows
+                self.df = self._parse_csv(nrows=0)
+                print(f"Streaming responses in chunks of {STREAM_CHUNK_SIZE}.")
+                return
+
+            with PROFILER.stage('load_cache'):
+                self.df = self._read_frame_cache()
+            if self.df is not None:
+                PROFILER.count('frame_cache_loads')
+                print(f"Data loaded from cache. {len(self.df)} total responses found.")
+                return
+
+            with PROFILER.stage('load_csv'):
+                self.df = self._parse_csv()
+            PROFILER.count('csv_loads')
+            with PROFILER.stage('write_cache'):
+                self._write_frame_cache()
+            if self.columns is not None:
+                keep = [col for col in self.df.columns
+                        if col in self.columns or col in DERIVED_COLUMNS]
+                self.df = self.df[keep]
             
             print(f"Data loaded successfully. {len(self.df)} total responses found.")
         
         except Exception as e:
             print(f"Error loading data: {e}")
             self.df = pd.DataFrame()
+
+    def _parse_csv(self, nrows=None):
+        """Parse and clean the raw Qualtrics export (or its first nrows responses).
+
+        Only the requested columns are read, with the dtypes declared in
+        COLUMN_SCHEMA applied at read time.
+        """
+        # Skip the question text row, and the ImportId row when it is where Qualtrics puts it
+        skiprows = [1, 2] if has_import_id_row(self.csv_path) else [1]
+        usecols = None
+        if self.columns is not None:
+            wanted = set(self.columns)
+            usecols = lambda col: col in wanted
+        dtype = {col: 'category' for col, kind in COLUMN_SCHEMA.items() if kind == 'category'}
+        numeric = {col: 'float64' for col, kind in COLUMN_SCHEMA.items() if kind == 'numeric'}
+        try:
+            df = pd.read_csv(self.csv_path, skiprows=skiprows, usecols=usecols,
+                             dtype=dict(dtype, **numeric), nrows=nrows)
+        except ValueError:
+            # A numeric column holds text; parse it leniently below instead
+            df = pd.read_csv(self.csv_path, skiprows=skiprows, usecols=usecols, dtype=dtype, nrows=nrows)
+        
+        return clean_survey_frame(df)
+
+    def _frame_cache_path(self):
+        """Path of the cached cleaned frame for this CSV, generator version and column selection"""
+        if feather is None or self.data_hash is None:
+            return None
+        key = hashlib.sha256(f'{self.data_hash}:{code_hash()}'.encode('utf-8')).hexdigest()
+        # Only the selected columns are parsed, so each selection gets a file of its own
+        selection = hashlib.sha256(json.dumps(self.columns).encode('utf-8')).hexdigest()
+        return os.path.join(FRAME_CACHE_DIR, f'{key[:32]}-{selection[:16]}.feather')
+
+    def _read_frame_cache(self):
+        """Load the requested columns from the Feather cache, memory-mapped"""
+        cache_path = self._frame_cache_path()
+        if cache_path is None or not os.path.exists(cache_path):
+            return None
+        try:
+            table = feather.read_table(cache_path, memory_map=True)
+        except Exception as e:
+            print(f"Ignoring unreadable frame cache {cache_path}: {e}")
+            return None
+        if self.columns is not None:
+            table = table.select([col for col in table.column_names
+                                  if col in self.columns or col in DERIVED_COLUMNS])
+        return table.to_pandas()
+
+    def _write_frame_cache(self):
+        """Persist the cleaned frame of the selected columns so later runs can skip CSV parsing"""
+        cache_path = self._frame_cache_path()
+        if cache_path is None or self.df.empty:
+            return
+        try:
+            os.makedirs(FRAME_CACHE_DIR, exist_ok=True)
+            tmp_path = f'{cache_path}.{os.getpid()}.tmp'
+            # Uncompressed so later loads can memory-map columns without copying
+            feather.write_feather(self.df.reset_index(drop=True), tmp_path,
+                                  compression='uncompressed')
+            os.replace(tmp_path, cache_path)
+            # Only the latest export is worth keeping (in every column selection)
+            prefix = os.path.basename(cache_path).split('-')[0] + '-'
+            for name in os.listdir(FRAME_CACHE_DIR):
+                if name.endswith('.feather') and not name.startswith(prefix):
+                    os.remove(os.path.join(FRAME_CACHE_DIR, name))
+        except Exception as e:
+            print(f"Could not write frame cache: {e}")
     
+    def aggregates(self, rebuild=False):
+        """Return the SurveyAggregates of the loaded responses.
+
+        The aggregates persist in the build cache with a hash of every folded
+        response, keyed by ResponseId. The next load folds in only responses
+        that were added, changed or removed since (subtracting removed ones and
+        the old versions of changed ones), so its cost follows the size of the
+        change, not of the export. rebuild=True folds every response anew.
+        """
+        with self._lock:
+            if rebuild or self._aggregates is None or self._aggregates[0] != self.data_hash:
+                with PROFILER.stage('aggregates'):
+                    self._aggregates = (self.data_hash, self._refresh_aggregates(rebuild))
+            return self._aggregates[1]
+
+    def _aggregate_state_path(self):
+        """Where the aggregates of this CSV and column selection persist between builds"""
+        key = hashlib.sha256(json.dumps([self.csv_path, list(self.df.columns)]).encode('utf-8')).hexdigest()
+        return os.path.join(AGGREGATE_STATE_DIR, key[:16] + '.pickle')
+
+    def _refresh_aggregates(self, rebuild):
+        """Bring the persisted aggregates up to date with the loaded frame.
+
+        The state holds only plain dicts and arrays: the totals, a hash of each
+        ResponseId and of each response's aggregated columns, and what changed
+        or removed responses need to be folded out again: their categorical
+        columns as codes and their text records (token ids and theme bits).
+        Only added and changed responses are tokenized.
+        """
+        df = self.df
+        if self.stream and len(df.columns):
+            aggregates = stream_aggregates(self.csv_path, self.columns)
+            print(f"Streamed {aggregates.responses} responses.")
+            return aggregates
+
+        ids = None
+        if 'ResponseId' in df.columns:
+            ids = pd.util.hash_pandas_object(df['ResponseId'], index=False).to_numpy()
+        # Without unique ResponseIds responses can't be matched across builds
+        if ids is None or not pd.Index(ids).is_unique:
+            aggregates = SurveyAggregates()
+            aggregates.update(df)
+            return aggregates
+
+        path = self._aggregate_state_path()
+        columns = SurveyAggregates.source_columns(df)
+        hashes = pd.util.hash_pandas_object(df[columns], index=False).to_numpy()
+        state = None
+        if not rebuild and os.path.exists(path):
+            try:
+                with open(path, 'rb') as f:
+                    state = pickle.load(f)
+            except Exception as e:
+                print(f"Ignoring unreadable aggregate state {path}: {e}")
+        if state is not None and (state.get('version') != AGGREGATE_STATE_VERSION
+                                  or state.get('code') != code_hash() or state.get('columns') != columns):
+            state = None
+
+        if state is None:
+            aggregates = SurveyAggregates()
+            records = aggregates.update(df)
+            print(f"Aggregated {len(df)} responses.")
+        else:
+            aggregates = SurveyAggregates.from_state(state['aggregates'])
+            previous_ids, previous_hashes, records = state['ids'], state['hashes'], state['records']
+            known_rows = len(previous_ids)
+            if (len(ids) >= known_rows and np.array_equal(ids[:known_rows], previous_ids)
+                    and np.array_equal(hashes[:known_rows], previous_hashes)):
+                # Responses were only appended, which keeps first-appearance order
+                if len(ids) == known_rows:
+                    return aggregates
+                records = concat_records(records, aggregates.update(df.iloc[known_rows:]))
+                print(f"Aggregates updated: {len(ids) - known_rows} added responses.")
+            else:
+                positions = pd.Index(previous_ids).get_indexer(ids)
+                known = positions >= 0
+                changed = np.zeros(len(ids), dtype=bool)
+                changed[known] = hashes[known] != previous_hashes[positions[known]]
+                kept = np.zeros(known_rows, dtype=bool)
+                kept[positions[known]] = True
+                outgoing = np.sort(np.concatenate([np.flatnonzero(~kept), positions[changed]]))
+                aggregates.update(unpack_frame(state['rows'], outgoing), sign=-1,
+                                  records=take_records(records, outgoing))
+                incoming = ~known | changed
+                added = aggregates.update(df[incoming])
+                # Kept responses keep their records; the rest come from the tokens just folded in
+                source = positions.copy()
+                source[incoming] = known_rows + np.arange(int(incoming.sum()))
+                records = aggregates.reorder(df, take_records(concat_records(records, added), source))
+                print(f"Aggregates updated: {int((~known).sum())} added, {int(changed.sum())} changed, "
+                      f"{int((~kept).sum())} removed responses.")
+
+        try:
+            os.makedirs(AGGREGATE_STATE_DIR, exist_ok=True)
+            tmp_path = f'{path}.{os.getpid()}.tmp'
+            with open(tmp_path, 'wb') as f:
+                pickle.dump({
+                    'version': AGGREGATE_STATE_VERSION,
+                    'code': code_hash(),
+                    'columns': columns,
+                    'ids': ids,
+                    'hashes': hashes,
+                    'rows': pack_frame(df[[col for col in columns if col not in records]]),
+                    'records': records,
+                    'aggregates': aggregates.to_state()
+                }, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            print(f"Could not write aggregate state: {e}")
+        return aggregates
+
+    def column_digest(self, columns):
+        """Hash the contents of the given columns (missing columns hash as absent)"""
+        with self._lock:
+            digest = hashlib.sha256(str(len(self.df)).encode('utf-8'))
+            for col in columns:
+                if col not in self._column_digests:
+                    if col in self.df.columns and self.stream:
+                        # Rows aren't loaded, so any change to the export counts as a change
+                        self._column_digests[col] = self.data_hash
+                    elif col in self.df.columns:
+                        values = pd.util.hash_pandas_object(self.df[col], index=False).values
+                        self._column_digests[col] = hashlib.sha256(values.tobytes()).hexdigest()
+                    else:
+                        self._column_digests[col] = 'missing'
+                digest.update(f'{col}={self._column_digests[col]};'.encode('utf-8'))
+            return digest.hexdigest()
+
+    def page_digest(self, page):
+        """Hash the contents of every column a page reads"""
+        return self.column_digest(page_columns(page))
+
+    def choice_indicators(self, question):
+        """Return the one-hot matrix for a multi-select question, or None if it wasn't loaded"""
+        with self._lock:
+            if question not in self.df.columns:
+                return None
+            digest = self.column_digest([question])
+            cached = self._indicator_results.get(question)
+            if cached is None or cached[0] != digest:
+                cached = (digest, choice_indicators(self.df[question]))
+                self._indicator_results[question] = cached
+            return cached[1]
+
+    def crosstab_cube(self):
+        """Return the demographic x observation count cube (rebuilt when its columns change)"""
+        with self._lock:
+            digest = self.column_digest(CUBE_SOURCE_COLUMNS)
+            if self._cube is None or self._cube[0] != digest:
+                self._cube = (digest, self.aggregates().crosstab_cube())
+            return self._cube[1]
+
+    def filter_bundle(self):
+        """Return the client-side filtering bundle (rebuilt when its columns change)"""
+        with self._lock:
+            digest = self.column_digest(page_columns('dashboard-data'))
+            if self._bundle is None or self._bundle[0] != digest:
+                self._bundle = (digest, self.aggregates().filter_bundle())
+            return self._bundle[1]
+
     def get_stats(self):
         """Get basic statistics about the survey data"""
-        if self.df.empty:
+        if self.df.empty and not self.stream:
             return {
                 'total_responses': 0,
                 'completion_rate': 0,
                 'avg_duration_minutes': 0
             }
         
-        total = len(self.df)
-        completion_rate = 0
-        if 'Finished' in self.df.columns:
-            completion_rate = (self.df['Finished'] == 'True').mean() * 100
-        
-        avg_duration = 0
-        if 'Duration (in seconds)' in self.df.columns:
-            avg_duration = self.df['Duration (in seconds)'].mean() / 60  # Convert to minutes
-        
-        return {
-            'total_responses': total,
-            'completion_rate': completion_rate,
-            'avg_duration_minutes': avg_duration
-        }
+        return self.aggregates().stats()
+
+    def trend_summary(self):
+        """Headline figures of this dataset for the wave-over-wave trend page"""
+        summary = {'stats': {key: float(value) for key, value in self.get_stats().items()},
+                   'yes_rates': {}}
+        if self.df.empty and not self.stream:
+            return summary
+        for topic, spec in OBSERVATION_TOPICS.items():
+            yes = total = 0
+            for col in spec['columns']:
+                if col in self.df.columns:
+                    counts = self.aggregates().value_counts(col)
+                    yes += int(counts.get('Yes', 0))
+                    total += int(counts.sum())
+            if total:
+                summary['yes_rates'][topic] = yes / total * 100
+        return summary
     
+    def get_charts(self, nodes):
+        """Return the chart entries for the given chart nodes.
+
+        Each node is built on first use and memoized with the digest of its
+        source columns, so it is only rebuilt after those columns change.
+        """
+        charts = {}
+        with self._lock:
+            for name in nodes:
+                node = CHART_NODES[name]
+                digest = self.column_digest(node['columns'])
+                cached = self._node_results.get(name)
+                if cached is None or cached[0] != digest:
+                    with PROFILER.stage('charts'):
+                        cached = (digest, getattr(self, node['builder'])())
+                    PROFILER.count_figures(cached[1])
+                    self._node_results[name] = cached
+                charts.update(cached[1])
+        return charts
+
     def get_charts_data(self):
         """Generate all the charts data needed for the dashboard"""
-        charts = {}
+        return self.get_charts(CHART_NODES)
+
+    def _chart_gender(self):
+        """Gender distribution"""
+        if 'Gender' not in self.df.columns:
+            return {}
+        gender_counts = self.aggregates().value_counts('Gender').reset_index()
+        gender_counts.columns = ['Gender', 'Count']
+        # Convert to plain Python lists to avoid binary encoding
+        gender_data = pd.DataFrame({
+            'Gender': gender_counts['Gender'].tolist(),
+            'Count': gender_counts['Count'].astype(int).tolist()
+        })
+        gender_fig = px.pie(gender_data, values='Count', names='Gender',
+                          title='Gender Distribution',
+                          color_discrete_sequence=px.colors.qualitative.Set3)
+        gender_fig.update_traces(textposition='inside', textinfo='percent+label')
+        return {'gender': gender_fig}
+
+    def _chart_role(self):
+        """Role distribution"""
+        if 'Q6' not in self.df.columns:
+            return {}
+        role_counts = self.aggregates().value_counts('Q6').reset_index().head(10)
+        role_counts.columns = ['Role', 'Count']
+        # Convert to plain Python lists
+        role_data = pd.DataFrame({
+            'Role': role_counts['Role'].tolist(),
+            'Count': role_counts['Count'].astype(int).tolist()
+        })
+        role_fig = px.bar(role_data, x='Count', y='Role',
+                         title='Top 10 Roles on Campus',
+                         color_discrete_sequence=['#3498db'],
+                         orientation='h')
+        return {'role': role_fig}
+
+    def _chart_faculty(self):
+        """Faculty distribution"""
+        if 'Q5' not in self.df.columns:
+            return {}
+        faculty_counts = self.aggregates().value_counts('Q5').reset_index()
+        faculty_counts.columns = ['Faculty', 'Count']
+        if 'Not Applicable' in faculty_counts['Faculty'].values:
+            faculty_counts = faculty_counts[faculty_counts['Faculty'] != 'Not Applicable']
+        # Convert to plain Python lists
+        faculty_data = pd.DataFrame({
+            'Faculty': faculty_counts['Faculty'].tolist(),
+            'Count': faculty_counts['Count'].astype(int).tolist()
+        })
+        faculty_fig = px.bar(faculty_data, x='Faculty', y='Count',
+                            title='Faculty Distribution',
+                            color_discrete_sequence=['#2ecc71'])
+        faculty_fig.update_layout(xaxis_tickangle=-45)
+        return {'faculty': faculty_fig}
 
-        # Gender distribution
-        if 'Gender' in self.df.columns:
-            gender_counts = self.df['Gender'].value_counts().reset_index()
-            gender_counts.columns = ['Gender', 'Count']
-            # Convert to plain Python lists to avoid binary encoding
-            gender_data = pd.DataFrame({
-                'Gender': gender_counts['Gender'].tolist(),
-                'Count': gender_counts['Count'].astype(int).tolist()
+    def _observation_chart(self, columns, title, color_map):
+        """Stacked Yes/No/Unsure counts for one observation question across contexts"""
+        if not all(col in self.df.columns for col in columns):
+            return None
+        observation_data = []
+        for col, ctx in zip(columns, OBSERVATION_CONTEXTS):
+            counts = self.aggregates().value_counts(col).reset_index()
+            counts.columns = ['Response', 'Count']
+            counts['Context'] = ctx['label']
+            observation_data.append(counts)
+
+        observation_df = pd.concat(observation_data)
+        # Convert to plain Python lists
+        observation_df = observation_df.copy()
+        observation_df['Count'] = observation_df['Count'].astype(int)
+        plot_data = pd.DataFrame({
+            'Context': observation_df['Context'].tolist(),
+            'Count': observation_df['Count'].tolist(),
+            'Response': observation_df['Response'].tolist()
+        })
+        return px.bar(plot_data, x='Context', y='Count', color='Response',
+                      title=title, color_discrete_map=color_map)
+
+    def _chart_misogyny(self):
+        """Misogyny observations"""
+        fig = self._observation_chart(MISOGYNY_COLUMNS,
+                                      'Observations of Misogyny in Different Contexts',
+                                      OBSERVATION_TOPICS['misogyny']['colors'])
+        return {'misogyny': fig} if fig is not None else {}
+
+    def _chart_queerphobia(self):
+        """Queerphobia observations"""
+        fig = self._observation_chart(QUEERPHOBIA_COLUMNS,
+                                      'Observations of Queerphobia in Different Contexts',
+                                      OBSERVATION_TOPICS['queerphobia']['colors'])
+        return {'queerphobia': fig} if fig is not None else {}
+
+    def _chart_transphobia(self):
+        """Transphobia observations"""
+        fig = self._observation_chart(TRANSPHOBIA_COLUMNS,
+                                      'Observations of Transphobia in Different Contexts',
+                                      OBSERVATION_TOPICS['transphobia']['colors'])
+        return {'transphobia': fig} if fig is not None else {}
+
+    def _breakdown_chart(self, columns, dimension, title):
+        """Grouped bars of the % answering Yes per context, split by a demographic dimension"""
+        cube = self.crosstab_cube()
+        if dimension not in cube.categories or not all(col in cube.question_index for col in columns):
+            return None
+        label = dimension.title()
+        frames = []
+        for col, ctx in zip(columns, OBSERVATION_CONTEXTS):
+            rates = cube.response_rate(dimension, col, 'Yes', MIN_BREAKDOWN_GROUP)
+            frames.append(pd.DataFrame({
+                'Context': ctx['label'],
+                label: [str(category) for category in rates.index],
+                'Yes %': rates.round(1).tolist()
+            }))
+        plot_data = pd.concat(frames, ignore_index=True)
+        if plot_data.empty:
+            return None
+        return px.bar(plot_data, x='Context', y='Yes %', color=label, barmode='group',
+                      title=title, color_discrete_sequence=px.colors.qualitative.Set2)
+
+    def _chart_misogyny_by_gender(self):
+        """Misogyny observations broken down by gender"""
+        fig = self._breakdown_chart(MISOGYNY_COLUMNS, 'gender',
+                                    'Misogyny Observed by Gender (% answering Yes)')
+        return {'misogyny_by_gender': fig} if fig is not None else {}
+
+    def _chart_queerphobia_by_gender(self):
+        """Queerphobia observations broken down by gender"""
+        fig = self._breakdown_chart(QUEERPHOBIA_COLUMNS, 'gender',
+                                    'Queerphobia Observed by Gender (% answering Yes)')
+        return {'queerphobia_by_gender': fig} if fig is not None else {}
+
+    def _chart_transphobia_by_gender(self):
+        """Transphobia observations broken down by gender"""
+        fig = self._breakdown_chart(TRANSPHOBIA_COLUMNS, 'gender',
+                                    'Transphobia Observed by Gender (% answering Yes)')
+        return {'transphobia_by_gender': fig} if fig is not None else {}
+
+    def _enrichment_charts(self, field):
+        """Sentiment, emotion, actionability, effort and topic x sentiment charts from a field's exported labels"""
+        analytics = self.enrichment(field)
+        key = field.lower()
+        charts = {}
+        sentiment = analytics.sentiment_counts()
+        if len(sentiment):
+            title = 'Sentiment'
+            if analytics.mean_score() is not None:
+                title += f' (mean score {analytics.mean_score():+.2f})'
+            sentiment_data = pd.DataFrame({
+                'Sentiment': [str(label) for label in sentiment.index],
+                'Responses': sentiment.astype(int).tolist()
             })
-            gender_fig = px.pie(gender_data, values='Count', names='Gender',
-                              title='Gender Distribution',
-                              color_discrete_sequence=px.colors.qualitative.Set3)
-            gender_fig.update_traces(textposition='inside', textinfo='percent+label')
-            charts['gender'] = gender_fig
-        
-        # Role distribution
-        if 'Q6' in self.df.columns:
-            role_counts = self.df['Q6'].value_counts().reset_index().head(10)
-            role_counts.columns = ['Role', 'Count']
-            # Convert to plain Python lists
-            role_data = pd.DataFrame({
-                'Role': role_counts['Role'].tolist(),
-                'Count': role_counts['Count'].astype(int).tolist()
+            sentiment_fig = px.bar(sentiment_data, x='Sentiment', y='Responses', color='Sentiment',
+                                   title=title, color_discrete_map=SENTIMENT_COLORS)
+            sentiment_fig.update_layout(showlegend=False)
+            charts[f'{key}_sentiment'] = sentiment_fig
+        emotions = analytics.emotion_counts()
+        if len(emotions):
+            emotion_data = pd.DataFrame({
+                'Emotion': [str(label) for label in emotions.index[::-1]],
+                'Responses': emotions.astype(int).tolist()[::-1]
             })
-            role_fig = px.bar(role_data, x='Count', y='Role',
-                             title='Top 10 Roles on Campus',
-                             color_discrete_sequence=['#3498db'],
-                             orientation='h')
-            charts['role'] = role_fig
-
-        # Faculty distribution
-        if 'Q5' in self.df.columns:
-            faculty_counts = self.df['Q5'].value_counts().reset_index()
-            faculty_counts.columns = ['Faculty', 'Count']
-            if 'Not Applicable' in faculty_counts['Faculty'].values:
-                faculty_counts = faculty_counts[faculty_counts['Faculty'] != 'Not Applicable']
-            # Convert to plain Python lists
-            faculty_data = pd.DataFrame({
-                'Faculty': faculty_counts['Faculty'].tolist(),
-                'Count': faculty_counts['Count'].astype(int).tolist()
+            charts[f'{key}_emotion'] = px.bar(emotion_data, x='Responses', y='Emotion',
+                                              title='Emotions Expressed',
+                                              color_discrete_sequence=['#e67e22'],
+                                              orientation='h')
+        actionability = analytics.actionability_counts()
+        if len(actionability):
+            actionability_data = pd.DataFrame({
+                'Actionability': [str(label) for label in actionability.index],
+                'Responses': actionability.astype(int).tolist()
             })
-            faculty_fig = px.bar(faculty_data, x='Faculty', y='Count',
-                                title='Faculty Distribution',
-                                color_discrete_sequence=['#2ecc71'])
-            faculty_fig.update_layout(xaxis_tickangle=-45)
-            charts['faculty'] = faculty_fig
-        
-        # Misogyny observations
-        if all(col in self.df.columns for col in ['Q10_1', 'Q10_2', 'Q10_3', 'Q10_4']):
-            # Prepare observation data
-            contexts = [
-                {'id': 'Q10_1', 'label': 'Campus Community'},
-                {'id': 'Q10_2', 'label': 'Classroom'},
-                {'id': 'Q10_3', 'label': 'Conversations with Peers'},
-                {'id': 'Q10_4', 'label': 'Conversations with Staff/Faculty'}
-            ]
-            misogyny_data = []
-            for ctx in contexts:
-                counts = self.df[ctx['id']].value_counts().reset_index()
-                counts.columns = ['Response', 'Count']
-                counts['Context'] = ctx['label']
-                misogyny_data.append(counts)
-            
-            if misogyny_data:
-                misogyny_df = pd.concat(misogyny_data)
-                # Convert to plain Python lists
-                misogyny_df = misogyny_df.copy()
-                misogyny_df['Count'] = misogyny_df['Count'].astype(int)
-                misogyny_plot_data = pd.DataFrame({
-                    'Context': misogyny_df['Context'].tolist(),
-                    'Count': misogyny_df['Count'].tolist(),
-                    'Response': misogyny_df['Response'].tolist()
-                })
-                misogyny_fig = px.bar(misogyny_plot_data, x='Context', y='Count', color='Response',
-                                    title='Observations of Misogyny in Different Contexts',
-                                    color_discrete_map={'Yes': 'green', 'No': 'red', 'Unsure': 'gold'})
-                charts['misogyny'] = misogyny_fig
-        
-        # Queerphobia observations
-        if all(col in self.df.columns for col in ['Q19_1', 'Q19_2', 'Q19_3', 'Q19_4']):
-            # Prepare observation data
-            contexts = [
-                {'id': 'Q19_1', 'label': 'Campus Community'},
-                {'id': 'Q19_2', 'label': 'Classroom'},
-                {'id': 'Q19_3', 'label': 'Conversations with Peers'},
-                {'id': 'Q19_4', 'label': 'Conversations with Staff/Faculty'}
-            ]
-            queerphobia_data = []
-            for ctx in contexts:
-                counts = self.df[ctx['id']].value_counts().reset_index()
-                counts.columns = ['Response', 'Count']
-                counts['Context'] = ctx['label']
-                queerphobia_data.append(counts)
-
-            if queerphobia_data:
-                queerphobia_df = pd.concat(queerphobia_data)
-                # Convert to plain Python lists
-                queerphobia_df = queerphobia_df.copy()
-                queerphobia_df['Count'] = queerphobia_df['Count'].astype(int)
-                queerphobia_plot_data = pd.DataFrame({
-                    'Context': queerphobia_df['Context'].tolist(),
-                    'Count': queerphobia_df['Count'].tolist(),
-                    'Response': queerphobia_df['Response'].tolist()
-                })
-                queerphobia_fig = px.bar(queerphobia_plot_data, x='Context', y='Count', color='Response',
-                                        title='Observations of Queerphobia in Different Contexts',
-                                        color_discrete_map={'Yes': 'purple', 'No': 'red', 'Unsure': 'gold'})
-                charts['queerphobia'] = queerphobia_fig
-
-        # Transphobia observations
-        if all(col in self.df.columns for col in ['Q28_1', 'Q28_2', 'Q28_3', 'Q28_4']):
-            # Prepare observation data
-            contexts = [
-                {'id': 'Q28_1', 'label': 'Campus Community'},
-                {'id': 'Q28_2', 'label': 'Classroom'},
-                {'id': 'Q28_3', 'label': 'Conversations with Peers'},
-                {'id': 'Q28_4', 'label': 'Conversations with Staff/Faculty'}
-            ]
-            transphobia_data = []
-            for ctx in contexts:
-                counts = self.df[ctx['id']].value_counts().reset_index()
-                counts.columns = ['Response', 'Count']
-                counts['Context'] = ctx['label']
-                transphobia_data.append(counts)
-
-            if transphobia_data:
-                transphobia_df = pd.concat(transphobia_data)
-                # Convert to plain Python lists
-                transphobia_df = transphobia_df.copy()
-                transphobia_df['Count'] = transphobia_df['Count'].astype(int)
-                transphobia_plot_data = pd.DataFrame({
-                    'Context': transphobia_df['Context'].tolist(),
-                    'Count': transphobia_df['Count'].tolist(),
-                    'Response': transphobia_df['Response'].tolist()
-                })
-                transphobia_fig = px.bar(transphobia_plot_data, x='Context', y='Count', color='Response',
-                                        title='Observations of Transphobia in Different Contexts',
-                                        color_discrete_map={'Yes': 'blue', 'No': 'red', 'Unsure': 'gold'})
-                charts['transphobia'] = transphobia_fig
-        
-        # Comparative analysis
-        contexts = [
-            {'misogyny': 'Q10_1', 'queerphobia': 'Q19_1', 'transphobia': 'Q28_1', 'name': 'Campus Community'},
-            {'misogyny': 'Q10_2', 'queerphobia': 'Q19_2', 'transphobia': 'Q28_2', 'name': 'Classroom'},
-            {'misogyny': 'Q10_3', 'queerphobia': 'Q19_3', 'transphobia': 'Q28_3', 'name': 'Conversations with Peers'},
-            {'misogyny': 'Q10_4', 'queerphobia': 'Q19_4', 'transphobia': 'Q28_4', 'name': 'Conversations with Staff/Faculty'}
-        ]
+            charts[f'{key}_actionability'] = px.bar(actionability_data, x='Actionability', y='Responses',
+                                                    title='Actionability',
+                                                    color_discrete_sequence=['#16a085'])
+        effort = analytics.effort_counts()
+        if len(effort):
+            effort_data = pd.DataFrame({
+                'Effort': [str(label) for label in effort.index],
+                'Responses': effort.astype(int).tolist()
+            })
+            charts[f'{key}_effort'] = px.bar(effort_data, x='Effort', y='Responses',
+                                             title=f'Effort (mean score {analytics.mean_effort():+.2f})',
+                                             color_discrete_sequence=['#8e44ad'])
+        table = analytics.topic_sentiment()
+        if not table.empty:
+            topic_data = table.reset_index().melt(id_vars='Topic', var_name='Sentiment',
+                                                  value_name='Responses')
+            topic_data = topic_data[topic_data['Responses'] > 0]
+            charts[f'{key}_topic_sentiment'] = px.bar(
+                topic_data, x='Responses', y='Topic', color='Sentiment', orientation='h',
+                title='Topics by Sentiment', color_discrete_map=SENTIMENT_COLORS,
+                category_orders={'Sentiment': list(table.columns),
+                                 'Topic': [str(topic) for topic in table.index[::-1]]})
+        return charts
+
+    def _chart_q14_enrichment(self):
+        """Exported sentiment and emotion labels of the misogyny impact answers"""
+        return self._enrichment_charts('Q14')
+
+    def _chart_q42_enrichment(self):
+        """Exported sentiment and emotion labels of the sexism education answers"""
+        return self._enrichment_charts('Q42')
 
+    def _chart_comparison(self):
+        """Comparative analysis of Yes rates across the three observation questions"""
+        charts = {}
         comparison_data = []
-        for ctx in contexts:
-            if all(col in self.df.columns for col in [ctx['misogyny'], ctx['queerphobia'], ctx['transphobia']]):
-                m_yes = self.df[ctx['misogyny']].value_counts().get('Yes', 0)
-                m_total = self.df[ctx['misogyny']].notna().sum()
+        for m_col, q_col, t_col, ctx in zip(MISOGYNY_COLUMNS, QUEERPHOBIA_COLUMNS,
+                                            TRANSPHOBIA_COLUMNS, OBSERVATION_CONTEXTS):
+            if all(col in self.df.columns for col in [m_col, q_col, t_col]):
+                m_counts = self.aggregates().value_counts(m_col)
+                m_yes = m_counts.get('Yes', 0)
+                m_total = m_counts.sum()
 
-                q_yes = self.df[ctx['queerphobia']].value_counts().get('Yes', 0)
-                q_total = self.df[ctx['queerphobia']].notna().sum()
+                q_counts = self.aggregates().value_counts(q_col)
+                q_yes = q_counts.get('Yes', 0)
+                q_total = q_counts.sum()
 
-                t_yes = self.df[ctx['transphobia']].value_counts().get('Yes', 0)
-                t_total = self.df[ctx['transphobia']].notna().sum()
+                t_counts = self.aggregates().value_counts(t_col)
+                t_yes = t_counts.get('Yes', 0)
+                t_total = t_counts.sum()
 
                 if m_total > 0 and q_total > 0 and t_total > 0:
                     comparison_data.append({
-                        'Context': ctx['name'],
+                        'Context': ctx['label'],
                         'Misogyny Yes %': (m_yes / m_total) * 100,
                         'Queerphobia Yes %': (q_yes / q_total) * 100,
                         'Transphobia Yes %': (t_yes / t_total) * 100
@@ -314,40 +2003,43 @@ class SurveyAnalyzer:
         return charts
     
     def analyze_text(self, field_name):
-        """Analyze a text field for frequency and themes"""
-        if field_name not in self.df.columns:
-            return None
-        
-        # Get valid responses
-        valid_responses = self.df[
-            self.df[field_name].notna() & 
-            (self.df[field_name].str.len() > 20) &
-            (~self.df[field_name].str.contains('ImportId', na=False))
-        ]
-        
-        if len(valid_responses) < 1:
+        """Analyze a text field for frequency and themes (rebuilt only when the field changes)"""
+        with self._lock:
+            digest = self.column_digest([field_name])
+            cached = self._text_results.get(field_name)
+            if cached is None or cached[0] != digest:
+                with PROFILER.stage('text_analysis'):
+                    cached = (digest, self._build_text_analysis(field_name))
+                PROFILER.count_figures(cached[1])
+                self._text_results[field_name] = cached
+            return cached[1]
+
+    def enrichment(self, field):
+        """Return the EnrichmentAnalytics of a text field (rebuilt when its label columns change)"""
+        with self._lock:
+            digest = self.column_digest(enrichment_columns(field))
+            cached = self._enrichment_results.get(field)
+            if cached is None or cached[0] != digest:
+                cached = (digest, self.aggregates().enrichment_analytics(field))
+                self._enrichment_results[field] = cached
+            return cached[1]
+
+    def distinctive_terms(self, k=8, min_group=MIN_BREAKDOWN_GROUP):
+        """Rank each gender group's most distinctive open-text terms by TF-IDF.
+
+        Groups whose answers come from fewer than min_group respondents are left out.
+        """
+        return self.aggregates().distinctive_terms(k, min_group)
+
+    def _build_text_analysis(self, field_name):
+        """Chart the word frequencies, phrases and themes of a text field, with samples, from its folded totals"""
+        # Charts and samples use the answers long enough to say something
+        analysis = self.aggregates().text_analysis(field_name)
+        if analysis is None:
             return None
         
-        # Clean text
-        stop_words = set(stopwords.words('english'))
-        additional_stops = {'please', 'specify', 'text', 'importid', 'qid', 'yes', 'no', 'that', 'things', 'also'}
-        stop_words = stop_words.union(additional_stops)
-        
-        def clean_text(text):
-            if not isinstance(text, str):
-                return ""
-            text = re.sub(r'[^\w\s]', '', text.lower())
-            text = re.sub(r'\d+', '', text)
-            words = text.split()
-            filtered_words = [word for word in words if word not in stop_words and len(word) > 3]
-            return ' '.join(filtered_words)
-        
-        cleaned_texts = valid_responses[field_name].apply(clean_text)
-        all_text = ' '.join(cleaned_texts)
-        
         # Word frequency
-        words = all_text.split()
-        word_counts = Counter(words).most_common(20) if words else []
+        word_counts = analysis['words']
         
         if word_counts:
             words, counts = zip(*word_counts)
@@ -358,22 +2050,20 @@ class SurveyAnalyzer:
         else:
             word_freq_fig = None
         
-        # Theme analysis
-        themes = {
-            "Classroom Experiences": ["class", "classroom", "professor", "faculty", "lecture", "student", "course", "teaching"],
-            "Social Interactions": ["friend", "peer", "social", "group", "talk", "conversation", "interact"],
-            "Harassment & Discrimination": ["harass", "discriminat", "bias", "attack", "target", "threat", "abuse", "aggressive"],
-            "Online Experiences": ["online", "email", "social media", "facebook", "twitter", "instagram", "reddit", "zoom", "message"],
-            "Institutional Issues": ["policy", "report", "complaint", "response", "administration", "university", "system", "support", "resource"],
-            "Gender & Identity": ["gender", "woman", "man", "trans", "queer", "identity", "lgbtq", "sexuality", "female", "male"]
-        }
+        # Phrase frequency: bigrams and trigrams used at least twice
+        phrases = analysis['phrases']
+        
+        if phrases:
+            phrase_df = pd.DataFrame(phrases[::-1], columns=['Phrase', 'Frequency'])
+            phrase_fig = px.bar(phrase_df, x='Frequency', y='Phrase',
+                                title='Most Common Phrases',
+                                color_discrete_sequence=['#9b59b6'],
+                                orientation='h')
+        else:
+            phrase_fig = None
         
-        theme_counts = {}
-        for theme_name, keywords in themes.items():
-            theme_count = sum(1 for text in cleaned_texts if any(keyword in text for keyword in keywords))
-            if len(valid_responses) > 0:
-                theme_percentage = (theme_count / len(valid_responses)) * 100
-                theme_counts[theme_name] = theme_percentage
+        # Theme analysis: share of the answers tagged with each theme
+        theme_counts = analysis['themes']
         
         if theme_counts:
             theme_df = pd.DataFrame({'Theme': list(theme_counts.keys()), 
@@ -387,20 +2077,573 @@ class SurveyAnalyzer:
             theme_fig = None
         
         # Get sample responses
-        sample_responses = valid_responses[field_name].head(3).tolist()
-        sample_responses = [resp[:300] + "..." if len(resp) > 300 else resp for resp in sample_responses]
+        sample_responses = [resp[:300] + "..." if len(resp) > 300 else resp for resp in analysis['samples']]
         
         return {
             'word_freq_fig': word_freq_fig,
+            'phrase_fig': phrase_fig,
             'theme_fig': theme_fig,
             'sample_responses': sample_responses
         }
 
-# Flask app for generating the static HTML
-app = Flask(__name__)
-freezer = Freezer(app)
+def file_signature(path):
+    """Return a cheap (mtime, size) signature for a file, or None if it is missing"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+def file_hash(path):
+    """Return the SHA-256 hex digest of a file's contents, or None if it is missing"""
+    digest = hashlib.sha256()
+    try:
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+    except OSError:
+        return None
+    return digest.hexdigest()
+
+_code_hash = None
+
+def code_hash():
+    """Return the SHA-256 of this generator's source, computed once per process"""
+    global _code_hash
+    if _code_hash is None:
+        _code_hash = file_hash(os.path.abspath(__file__))
+    return _code_hash
+
+def peak_rss_mb(who=None):
+    """Peak resident set size of this process (or its reaped children) in MB, if known"""
+    if resource is None:
+        return None
+    usage = resource.getrusage(resource.RUSAGE_SELF if who is None else who)
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+    return usage.ru_maxrss / (1024 * 1024 if sys.platform == 'darwin' else 1024)
+
+class BuildProfiler:
+    """Per-stage timings, counters and output sizes of a build.
+
+    Disabled by default, when every hook returns at once. Stage times are
+    exclusive: time spent in a stage nested inside another (tokenizing during
+    text analysis, say) counts only toward the inner one. Work done while a
+    page is requested is attributed to that page, the rest to the build.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.reset()
+
+    def reset(self):
+        """Drop everything recorded so far"""
+        self.started = time.perf_counter()
+        self.build = {'stages': Counter(), 'counters': Counter()}
+        self.pages = {}
+        self._page = None
+        self._page_started = None
+        self._stack = []
+
+    def _target(self):
+        return self._page if self._page is not None else self.build
+
+    def start(self, name):
+        """Enter a stage; pair with stop()"""
+        if self.enabled:
+            self._stack.append([name, time.perf_counter(), 0.0])
+
+    def stop(self):
+        """Leave the innermost stage"""
+        if not self.enabled or not self._stack:
+            return
+        name, started, nested = self._stack.pop()
+        elapsed = time.perf_counter() - started
+        self._target()['stages'][name] += elapsed - nested
+        if self._stack:
+            self._stack[-1][2] += elapsed
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        """Time the enclosed block as one stage"""
+        self.start(name)
+        try:
+            yield
+        finally:
+            self.stop()
+
+    def count(self, name, n=1):
+        """Add n to a counter of the current page (or the build)"""
+        if self.enabled and n:
+            self._target()['counters'][name] += n
+
+    def count_figures(self, results):
+        """Count the Plotly figures among a builder's results"""
+        if self.enabled and results:
+            self.count('figure_builds', sum(isinstance(value, go.Figure) for value in results.values()))
+
+    def begin_page(self, page):
+        """Attribute what follows to page until end_page()"""
+        if self.enabled:
+            self._page = self.pages.setdefault(
+                page, {'seconds': 0.0, 'bytes': 0, 'stages': Counter(), 'counters': Counter()})
+            self._page_started = time.perf_counter()
+
+    def end_page(self, size):
+        """Close the current page with the size of its output"""
+        if self.enabled and self._page is not None:
+            self._page['seconds'] += time.perf_counter() - self._page_started
+            self._page['bytes'] = size
+            self._page['peak_rss_mb'] = peak_rss_mb()
+            self._page = None
+
+    def page_written(self, page, seconds):
+        """Record a page's total time including the write; the difference is the write stage"""
+        record = self.pages.get(page) if self.enabled else None
+        if record is not None:
+            record['stages']['write'] += max(0.0, seconds - record['seconds'])
+            record['seconds'] = seconds
+
+    def snapshot(self):
+        """Everything recorded, in a form that can be sent between processes"""
+        return {'build': self.build, 'pages': self.pages}
+
+    def merge(self, snapshot):
+        """Fold in a snapshot recorded by a worker process"""
+        if not self.enabled or snapshot is None:
+            return
+        for key in ('stages', 'counters'):
+            self.build[key].update(snapshot['build'][key])
+        self.pages.update(snapshot['pages'])
+
+    def report(self):
+        """The JSON report: totals, per-stage and per-page figures"""
+        pages = {}
+        for page, record in sorted(self.pages.items()):
+            # Page time outside any stage: route code, template compilation, Flask
+            page_stages = dict(record['stages'])
+            page_stages['other'] = max(0.0, record['seconds'] - sum(page_stages.values()))
+            pages[page] = dict(record, stages=page_stages, counters=dict(record['counters']))
+        stages = Counter(self.build['stages'])
+        counters = Counter(self.build['counters'])
+        for record in pages.values():
+            stages.update(record['stages'])
+            counters.update(record['counters'])
+        return {
+            'version': PROFILE_VERSION,
+            'finished': datetime.now().isoformat(timespec='seconds'),
+            'total_seconds': time.perf_counter() - self.started,
+            'peak_rss_mb': peak_rss_mb(),
+            'peak_worker_rss_mb': peak_rss_mb(resource.RUSAGE_CHILDREN) if resource is not None else None,
+            'output_bytes': sum(record['bytes'] for record in self.pages.values()),
+            'stages': dict(stages.most_common()),
+            'counters': dict(sorted(counters.items())),
+            'build': {'stages': dict(self.build['stages']), 'counters': dict(self.build['counters'])},
+            'pages': pages
+        }
+
+    def write_report(self, path):
+        """Write the JSON report to path and print a human summary; return the report"""
+        report = self.report()
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(report, f, indent=2)
+        os.replace(tmp_path, path)
+
+        def megabytes(value):
+            return 'n/a' if value is None else f'{value:.1f} MB'
+        print(f"Build profile: {report['total_seconds']:.2f} s, peak RSS {megabytes(report['peak_rss_mb'])} "
+              f"(workers {megabytes(report['peak_worker_rss_mb'])}), "
+              f"{report['output_bytes'] / 1024:.1f} KB rendered")
+        print(f"  {'stage':<16} {'seconds':>8}")
+        for name, seconds in report['stages'].items():
+            print(f"  {name:<16} {seconds:>8.3f}")
+        if report['pages']:
+            print(f"  {'page':<32} {'seconds':>8} {'KB':>8}  slowest stage")
+            for page, record in sorted(report['pages'].items(), key=lambda item: -item[1]['seconds']):
+                slowest = max(record['stages'], key=record['stages'].get) if record['stages'] else '-'
+                print(f"  {page:<32} {record['seconds']:>8.3f} {record['bytes'] / 1024:>8.1f}  {slowest}")
+        print('  ' + ', '.join(f'{name}={value}' for name, value in report['counters'].items()))
+        print(f"Profile written to '{path}'.")
+        return report
+
+# Build profiler shared by every stage hook; enabled by --profile
+PROFILER = BuildProfiler()
+
+def load_datasets(path=DATASETS_PATH):
+    """Read the dataset list from path, or return just DEFAULT_DATASET if it is missing.
+
+    The file holds a JSON list of objects with a "data" CSV path and optional
+    "name", "label", "output" prefix (default: the name) and "stream" flag
+    (fold the export chunk by chunk, see SurveyAnalyzer). At most one
+    dataset may use the empty prefix and be written to OUTPUT_DIR itself.
+    """
+    if not os.path.exists(path):
+        return [DEFAULT_DATASET]
+    with open(path) as f:
+        entries = json.load(f)
+    datasets = []
+    for i, entry in enumerate(entries):
+        if 'data' not in entry:
+            raise ValueError(f'Dataset {i} in {path} has no "data" CSV path')
+        name = str(entry.get('name', os.path.splitext(os.path.basename(entry['data']))[0]))
+        output = os.path.normpath(entry.get('output', name)).replace(os.sep, '/')
+        output = '' if output == '.' else output
+        if os.path.isabs(output) or output.split('/')[0] == '..':
+            raise ValueError(f'Output prefix of dataset {name!r} must stay inside {OUTPUT_DIR!r}')
+        datasets.append({'name': name, 'label': entry.get('label', name),
+                         'data': entry['data'], 'output': output,
+                         'stream': bool(entry.get('stream', False))})
+    for key in ('name', 'output'):
+        values = [dataset[key] for dataset in datasets]
+        if len(set(values)) != len(values):
+            raise ValueError(f'Datasets in {path} must have distinct {key}s')
+    if not datasets:
+        raise ValueError(f'{path} lists no datasets')
+    return datasets
+
+# Every dataset of this build, and the one whose pages are being rendered
+_datasets = [DEFAULT_DATASET]
+_dataset = DEFAULT_DATASET
+
+def use_datasets(datasets, current=None):
+    """Set the datasets of this build and the one routes render (default: the first)"""
+    global _datasets, _dataset
+    _datasets = list(datasets)
+    _dataset = current if current is not None else _datasets[0]
+
+def dataset_output_dir(dataset=None):
+    """Directory a dataset's pages are written to (default: the current dataset)"""
+    dataset = dataset if dataset is not None else _dataset
+    return os.path.normpath(os.path.join(OUTPUT_DIR, dataset['output']))
+
+def dataset_manifest_path(dataset):
+    """Build manifest of a dataset; the one written to OUTPUT_DIR keeps MANIFEST_PATH"""
+    if not dataset['output']:
+        return MANIFEST_PATH
+    return os.path.join(MANIFEST_DIR, dataset['name'] + '.json')
+
+def dataset_links(from_dir, active=None):
+    """Navigation links from from_dir to every dataset's dashboard and the trend page.
+
+    Empty when only one dataset is built, so single-survey pages are unchanged.
+    """
+    if len(_datasets) < 2:
+        return []
+    def href(path):
+        return os.path.relpath(path, from_dir).replace(os.sep, '/')
+    links = [{'label': dataset['label'], 'active': dataset['name'] == active,
+              'href': href(os.path.join(dataset_output_dir(dataset), 'index.html'))}
+             for dataset in _datasets]
+    links.append({'label': 'Trends', 'active': active == TREND_PAGE,
+                  'href': href(os.path.join(OUTPUT_DIR, TREND_PAGE))})
+    return links
+
+# Build-scoped analyzer cache, keyed by CSV path and loaded columns
+_analyzer_cache = {}
+_analyzer_cache_lock = threading.Lock()
+
+def get_analyzer(csv_path=None, columns=None, stream=None):
+    """Return the shared SurveyAnalyzer for csv_path (by default the dataset being built).
+
+    Only the given source columns are loaded (by default every column the
+    dashboard reads), and with stream (by default the dataset's "stream"
+    flag) the export is folded chunk by chunk instead of loaded. The CSV is
+    parsed once and reused by every page. The cached analyzer is
+    reloaded when the file's mtime/size change and its content hash differs,
+    so a long-running dev server picks up new data without a restart.
+    """
+    if csv_path is None:
+        csv_path = _dataset['data']
+        if stream is None:
+            stream = _dataset.get('stream', False)
+    if columns is None:
+        columns = dashboard_columns()
+    stream = bool(stream)
+    key = (csv_path, tuple(columns), stream)
+    with _analyzer_cache_lock:
+        signature = file_signature(csv_path)
+        cached = _analyzer_cache.get(key)
+        if cached is not None and cached['signature'] == signature:
+            return cached['analyzer']
+
+        digest = file_hash(csv_path)
+        if cached is not None and digest is not None and cached['hash'] == digest:
+            # File was touched but its contents are the same
+            cached['signature'] = signature
+            return cached['analyzer']
+
+        if cached is not None:
+            # Reload in place so charts whose columns are unchanged stay memoized
+            analyzer = cached['analyzer']
+            analyzer.load_data()
+        else:
+            analyzer = SurveyAnalyzer(csv_path, columns, stream=stream)
+        _analyzer_cache[key] = {
+            'signature': signature,
+            'hash': digest,
+            'analyzer': analyzer
+        }
+        return analyzer
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def _json_default(obj):
+    """Encode numpy values as plain Python values, deferring anything else to Plotly"""
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    return plotly.utils.PlotlyJSONEncoder().default(obj)
+
+def fig_to_json(fig, compact=False):
+    """Serialize a Plotly figure to JSON with plain lists instead of binary arrays.
+
+    The figure is walked once: numpy arrays become lists directly rather than
+    going through Plotly's base64 typed-array encoding. The default output is
+    byte-identical to json.dumps of the decoded Plotly JSON. With compact=True
+    the separators are dropped and orjson is used when it is installed.
+    """
+    with PROFILER.stage('serialize'):
+        return dumps_figure(fig_to_dict(fig), compact)
+
+def fig_to_dict(fig):
+    """A Plotly figure's data, layout and frames as plain dicts (numpy arrays kept as is)"""
+    fig_dict = {
+        'data': [trace.to_plotly_json() for trace in fig.data],
+        'layout': fig.layout.to_plotly_json()
+    }
+    if fig.frames:
+        fig_dict['frames'] = [frame.to_plotly_json() for frame in fig.frames]
+    return fig_dict
+
+def dumps_figure(fig_dict, compact=False):
+    """Serialize (part of) a figure dict from fig_to_dict() the way fig_to_json() does"""
+    if compact and orjson is not None:
+        return orjson.dumps(fig_dict, default=_json_default,
+                            option=orjson.OPT_SERIALIZE_NUMPY).decode('utf-8')
+    separators = (',', ':') if compact else None
+    try:
+        return json.dumps(fig_dict, default=_json_default, allow_nan=False, separators=separators)
+    except ValueError:
+        # NaN/Infinity present: encode them as null, as PlotlyJSONEncoder does
+        fig_json_str = json.dumps(fig_dict, default=_json_default)
+        fig_dict = json.loads(fig_json_str, parse_constant=lambda constant: None)
+        return json.dumps(fig_dict, separators=separators)
+
+# Site-wide chart theme: the parts of Plotly's default template these charts
+# use, defined once. Published charts name it instead of embedding the full
+# template Plotly attaches to every figure.
+SITE_THEME = {
+    'layout': {
+        'autotypenumbers': 'strict',
+        'colorway': ['#636efa', '#EF553B', '#00cc96', '#ab63fa', '#FFA15A',
+                     '#19d3f3', '#FF6692', '#B6E880', '#FF97FF', '#FECB52'],
+        'font': {'color': '#2a3f5f'},
+        'hovermode': 'closest',
+        'hoverlabel': {'align': 'left'},
+        'paper_bgcolor': 'white',
+        'plot_bgcolor': '#E5ECF6',
+        'polar': {
+            'bgcolor': '#E5ECF6',
+            'angularaxis': {'gridcolor': 'white', 'linecolor': 'white', 'ticks': ''},
+            'radialaxis': {'gridcolor': 'white', 'linecolor': 'white', 'ticks': ''}
+        },
+        'xaxis': {'gridcolor': 'white', 'linecolor': 'white', 'ticks': '', 'title': {'standoff': 15},
+                  'zerolinecolor': 'white', 'automargin': True, 'zerolinewidth': 2},
+        'yaxis': {'gridcolor': 'white', 'linecolor': 'white', 'ticks': '', 'title': {'standoff': 15},
+                  'zerolinecolor': 'white', 'automargin': True, 'zerolinewidth': 2},
+        'title': {'x': 0.05}
+    },
+    'data': {
+        'bar': [{'marker': {'line': {'color': '#E5ECF6', 'width': 0.5}}}],
+        'pie': [{'automargin': True}]
+    }
+}
+
+# plotly.js defaults that Plotly Express writes out anyway, by trace type ('*'
+# for every trace) and for the layout. None of them is set by SITE_THEME, so
+# dropping them leaves the chart unchanged.
+TRACE_DEFAULTS = {
+    '*': {'legendgroup': '', 'xaxis': 'x', 'yaxis': 'y', 'marker': {'pattern': {'shape': ''}}},
+    'pie': {'domain': {'x': [0.0, 1.0], 'y': [0.0, 1.0]}}
+}
+LAYOUT_DEFAULTS = {
+    'xaxis': {'anchor': 'y', 'domain': [0.0, 1.0]},
+    'yaxis': {'anchor': 'x', 'domain': [0.0, 1.0]}
+}
+
+# Significant digits kept for floats in trace data (percentages, scores)
+FIGURE_SIGNIFICANT_DIGITS = 4
+
+def drop_defaults(values, defaults):
+    """Remove the entries of values that hold their default, recursively; nested dicts left empty go too"""
+    for key, default in defaults.items():
+        if key not in values:
+            continue
+        value = values[key]
+        if isinstance(default, dict):
+            if isinstance(value, dict):
+                drop_defaults(value, default)
+                if not value:
+                    del values[key]
+        elif (list(value) if isinstance(value, (tuple, np.ndarray)) else value) == default:
+            del values[key]
+
+def round_floats(value, digits=FIGURE_SIGNIFICANT_DIGITS):
+    """Round every float in a (nested) figure value to the given significant digits"""
+    if isinstance(value, float):
+        return float(f'{value:.{digits}g}')
+    if isinstance(value, dict):
+        return {key: round_floats(item, digits) for key, item in value.items()}
+    if isinstance(value, np.ndarray):
+        if value.dtype.kind not in 'fO':
+            return value
+        value = value.tolist()
+    if isinstance(value, (list, tuple)):
+        return [round_floats(item, digits) for item in value]
+    return value
 
-# Define the HTML template as a single complete template
+def minimize_figure(fig_dict):
+    """Strip a figure dict from fig_to_dict() down to what its chart needs.
+
+    The embedded Plotly template goes (charts are drawn with SITE_THEME), as
+    do attributes holding their plotly.js default, and floats in the trace
+    data are rounded to FIGURE_SIGNIFICANT_DIGITS.
+    """
+    fig_dict['layout'].pop('template', None)
+    drop_defaults(fig_dict['layout'], LAYOUT_DEFAULTS)
+    for trace in fig_dict['data']:
+        drop_defaults(trace, TRACE_DEFAULTS['*'])
+        drop_defaults(trace, TRACE_DEFAULTS.get(trace.get('type'), {}))
+    fig_dict['data'] = [round_floats(trace) for trace in fig_dict['data']]
+    return fig_dict
+
+def chart_asset(fig, output_dir=None):
+    """Write a figure as a content-hashed JSON file and return its URL relative to the pages.
+
+    Charts go to charts/ under output_dir (the current dataset's by
+    default), minimized by minimize_figure(). SITE_THEME is written once as
+    a content-hashed file of its own that every chart names. Pages load both
+    with DashboardCharts.plot().
+    """
+    output_dir = output_dir or dataset_output_dir()
+    with PROFILER.stage('serialize'):
+        with PROFILER.stage('minimize'):
+            spec = minimize_figure(fig_to_dict(fig))
+        spec['template'] = write_chart_file(output_dir, dumps_figure(SITE_THEME, compact=True))
+        return posixpath.join(CHART_ASSET_DIR, write_chart_file(output_dir, dumps_figure(spec, compact=True)))
+
+def write_chart_file(output_dir, content):
+    """Write JSON to charts/ named by its hash, unless it is already there; return the file name"""
+    content = content.encode('utf-8')
+    name = hashlib.sha256(content).hexdigest()[:20] + '.json'
+    path = os.path.join(output_dir, CHART_ASSET_DIR, name)
+    if not os.path.isfile(path):
+        with PROFILER.stage('write'):
+            write_atomic(path, content)
+    return name
+
+def page_chart_assets(output_dir, page_path):
+    """Names of the chart files a page in output_dir refers to, with the theme files those charts name"""
+    try:
+        with open(os.path.join(output_dir, page_path), encoding='utf-8') as f:
+            used = set(CHART_ASSET_PATTERN.findall(f.read()))
+    except OSError:
+        return set()
+    for name in list(used):
+        try:
+            with open(os.path.join(output_dir, CHART_ASSET_DIR, name), 'rb') as f:
+                template = json.loads(f.read()).get('template')
+        except (OSError, ValueError):
+            continue
+        if template:
+            used.add(template)
+    return used
+
+def chart_asset_hashes(output_dir, page_path):
+    """Map each chart file a page in output_dir refers to onto the hash of its content"""
+    return {name: file_hash(os.path.join(output_dir, CHART_ASSET_DIR, name))
+            for name in sorted(page_chart_assets(output_dir, page_path))}
+
+def prune_chart_assets(output_dir):
+    """Delete the files in output_dir's charts/ that no page there refers to any more"""
+    chart_dir = os.path.join(output_dir, CHART_ASSET_DIR)
+    if not os.path.isdir(chart_dir):
+        return
+    used = set()
+    for name in os.listdir(output_dir):
+        if name.endswith('.html'):
+            used.update(page_chart_assets(output_dir, name))
+    for name in os.listdir(chart_dir):
+        source, suffix = os.path.splitext(name)
+        if (source if suffix in COMPRESSED_SUFFIXES else name) not in used:
+            os.remove(os.path.join(chart_dir, name))
+
+# Pages of the dashboard: each view with its URL rule. The Flask app is
+# created (and Flask imported) only when a build first needs it.
+ROUTES = []
+
+def route(rule):
+    """Register a view for rule on the app get_app() creates"""
+    def register(view):
+        ROUTES.append((rule, view))
+        return view
+    return register
+
+def profile_page_start():
+    freezer = get_freezer()
+    PROFILER.begin_page(posixpath.join(_dataset['output'], freezer.urlpath_to_filepath(flask.request.path)))
+
+def profile_page_end(response):
+    PROFILER.end_page(len(response.get_data()) if PROFILER.enabled else 0)
+    return response
+
+def profile_render_start(sender, template, context, **extra):
+    PROFILER.start('render')
+
+def profile_render_end(sender, template, context, **extra):
+    PROFILER.stop()
+
+def dataset_navigation():
+    return {'dataset_links': dataset_links(dataset_output_dir(), _dataset['name'])}
+
+# Flask app for generating the static HTML, and its Freezer
+_app = None
+_freezer = None
+
+def get_app():
+    """Return the Flask app, creating it with every route and hook on first use"""
+    global _app, _freezer
+    if _app is None:
+        app = flask.Flask(__name__)
+        # Templates are compiled once per process, and their bytecode is
+        # cached on disk for the next build
+        os.makedirs(TEMPLATE_CACHE_DIR, exist_ok=True)
+        app.jinja_loader = jinja2.DictLoader(TEMPLATES)
+        app.jinja_options = dict(app.jinja_options,
+                                 bytecode_cache=jinja2.FileSystemBytecodeCache(TEMPLATE_CACHE_DIR))
+        for rule, view in ROUTES:
+            app.add_url_rule(rule, view.__name__, view)
+        app.before_request(profile_page_start)
+        app.after_request(profile_page_end)
+        flask.before_render_template.connect(profile_render_start, app)
+        flask.template_rendered.connect(profile_render_end, app)
+        app.context_processor(dataset_navigation)
+        _freezer = flask_frozen.Freezer(app)
+        _app = app
+    return _app
+
+def get_freezer():
+    """Return the Freezer of the Flask app"""
+    get_app()
+    return _freezer
+
+# Define the HTML template as a single complete template: the base layout every
+# page template extends, filling in its content and scripts blocks
 HTML_TEMPLATE = """<!DOCTYPE html>
 <html lang="en">
 <head>
@@ -433,31 +2676,38 @@ HTML_TEMPLATE = """<!DOCTYPE html>
                 <div class="collapse navbar-collapse" id="navbarNav">
                     <ul class="navbar-nav">
                         <li class="nav-item">
-                            <a class="nav-link {% if active_page == 'index' %}active{% endif %}" href="index.html">Demographics</a>
+                            <a class="nav-link {% if active_page == 'index' %}active{% endif %}" href="{{ page_prefix }}index.html">Demographics</a>
                         </li>
                         <li class="nav-item">
-                            <a class="nav-link {% if active_page == 'misogyny' %}active{% endif %}" href="misogyny.html">Misogyny Analysis</a>
+                            <a class="nav-link {% if active_page == 'misogyny' %}active{% endif %}" href="{{ page_prefix }}misogyny.html">Misogyny Analysis</a>
                         </li>
                         <li class="nav-item">
-                            <a class="nav-link {% if active_page == 'queerphobia' %}active{% endif %}" href="queerphobia.html">Queerphobia Analysis</a>
+                            <a class="nav-link {% if active_page == 'queerphobia' %}active{% endif %}" href="{{ page_prefix }}queerphobia.html">Queerphobia Analysis</a>
                         </li>
                         <li class="nav-item">
-                            <a class="nav-link {% if active_page == 'transphobia' %}active{% endif %}" href="transphobia.html">Transphobia Analysis</a>
+                            <a class="nav-link {% if active_page == 'transphobia' %}active{% endif %}" href="{{ page_prefix }}transphobia.html">Transphobia Analysis</a>
                         </li>
                         <li class="nav-item">
-                            <a class="nav-link {% if active_page == 'text-analysis' %}active{% endif %}" href="text-analysis.html">Text Analysis</a>
+                            <a class="nav-link {% if active_page == 'text-analysis' %}active{% endif %}" href="{{ page_prefix }}text-analysis.html">Text Analysis</a>
                         </li>
                         <li class="nav-item">
-                            <a class="nav-link {% if active_page == 'comparative' %}active{% endif %}" href="comparative.html">Comparative Analysis</a>
+                            <a class="nav-link {% if active_page == 'comparative' %}active{% endif %}" href="{{ page_prefix }}comparative.html">Comparative Analysis</a>
                         </li>
-                    </ul>
+                    </ul>{% if dataset_links %}
+                    <ul class="navbar-nav ms-auto">
+                        {% for link in dataset_links %}
+                        <li class="nav-item">
+                            <a class="nav-link {% if link.active %}active{% endif %}" href="{{ link.href }}">{{ link.label }}</a>
+                        </li>
+                        {% endfor %}
+                    </ul>{% endif %}
                 </div>
             </div>
         </nav>
         
         <!-- Main content -->
         <div class="tab-content">
-            {{ content|safe }}
+            {% block content %}{% endblock %}
         </div>
         
         <!-- Footer -->
@@ -468,19 +2718,212 @@ HTML_TEMPLATE = """<!DOCTYPE html>
     </div>
     
     <script src="https://cdn.jsdelivr.net/npm/bootstrap@5.3.0/dist/js/bootstrap.bundle.min.js"></script>
-    {{ scripts|safe }}
+    <script src="{{ page_prefix }}dashboard-charts.js"></script>
+    {% block scripts %}{% endblock %}
 </body>
 </html>"""
 
+# Every template by name, served to the Flask app's Jinja environment
+TEMPLATES = {'base.html': HTML_TEMPLATE}
+
+def page_template(name, content, scripts):
+    """Register a page template that fills the base layout's content and scripts blocks, returning its name"""
+    TEMPLATES[name] = ('{% extends "base.html" %}{% block content %}' + content
+                       + '{% endblock %}{% block scripts %}' + scripts + '{% endblock %}')
+    return name
+
+# Client-side cross-filtering engine for the observation charts. It fetches
+# dashboard-data.json once and re-sums the integer counts of the respondent
+# groups that match the selected filters.
+FILTERS_JS = """// 3C+ Dashboard client-side filters
+var DashboardFilters = (function () {
+    var bundlePromise = null;
+
+    function loadBundle() {
+        if (bundlePromise === null) {
+            bundlePromise = fetch('dashboard-data.json').then(function (response) {
+                if (!response.ok) {
+                    throw new Error('HTTP ' + response.status);
+                }
+                return response.json();
+            });
+        }
+        return bundlePromise;
+    }
+
+    // Does group g match every selected filter? (-1 means "All"; the
+    // suppressed remainder of small groups, with null codes, only counts there,
+    // and bundle.left_out says how much of it matches a selection)
+    function groupMatches(bundle, g, selection) {
+        for (var name in selection) {
+            var value = selection[name];
+            if (value < 0) {
+                continue;
+            }
+            var code = bundle.groups[name][g];
+            if (code === null) {
+                return false;
+            }
+            if (bundle.filters[name].multi ? !(code & (1 << value)) : code !== value) {
+                return false;
+            }
+        }
+        return true;
+    }
+
+    // Sum the response counts of the matching respondents for the given
+    // questions: one filter reads its marginal table, several filters sum the
+    // matching groups and report how many respondents of the suppressed
+    // remainder match too (leftOut)
+    function aggregate(bundle, selection, questions) {
+        var nq = bundle.questions.length;
+        var nr = bundle.responses.length;
+        var index = questions.map(function (q) { return bundle.questions.indexOf(q); });
+        var totals = new Array(questions.length * nr).fill(0);
+        var chosen = Object.keys(selection).filter(function (name) { return selection[name] >= 0; });
+        if (chosen.length === 1) {
+            var marginal = bundle.marginals[chosen[0]];
+            var value = selection[chosen[0]];
+            for (var i = 0; i < index.length; i++) {
+                for (var r = 0; r < nr; r++) {
+                    totals[i * nr + r] = marginal.counts[(value * nq + index[i]) * nr + r];
+                }
+            }
+            // A suppressed category (null) matches fewer than min_group respondents
+            return {totals: totals, respondents: marginal.sizes[value] || 0, leftOut: 0};
+        }
+        var key = Object.keys(bundle.filters).map(function (name) {
+            return name in selection ? selection[name] : -1;
+        }).join(',');
+        var respondents = 0;
+        for (var g = 0; g < bundle.sizes.length; g++) {
+            if (!groupMatches(bundle, g, selection)) {
+                continue;
+            }
+            respondents += bundle.sizes[g];
+            for (var i = 0; i < index.length; i++) {
+                var base = (g * nq + index[i]) * nr;
+                for (var r = 0; r < nr; r++) {
+                    totals[i * nr + r] += bundle.counts[base + r];
+                }
+            }
+        }
+        return {totals: totals, respondents: respondents,
+                leftOut: chosen.length > 1 ? bundle.left_out[key] || 0 : 0};
+    }
+
+    function render(chartId, topic, bundle, selection, notice) {
+        var spec = bundle.topics[topic];
+        var result = aggregate(bundle, selection, spec.questions);
+        var nr = bundle.responses.length;
+        var chart = document.getElementById(chartId);
+        var leftOut = result.leftOut ? ' Another ' + result.leftOut + ' matching respondents are in groups ' +
+            'of fewer than ' + bundle.min_group + ' and are left out.' : '';
+        if (result.respondents < bundle.min_group) {
+            notice.textContent = 'Fewer than ' + bundle.min_group + ' respondents' +
+                (result.leftOut ? ' outside small groups' : '') +
+                ' match these filters, so the chart is hidden.' + leftOut;
+            chart.style.display = 'none';
+            return;
+        }
+        notice.textContent = result.respondents + ' respondents' + (result.leftOut ? ' outside small groups' : '') +
+            ' match these filters.' + leftOut;
+        chart.style.display = '';
+        var traces = [];
+        bundle.responses.forEach(function (response, r) {
+            var y = spec.questions.map(function (q, i) { return result.totals[i * nr + r]; });
+            if (y.some(function (count) { return count > 0; })) {
+                traces.push({type: 'bar', name: response, x: bundle.contexts, y: y,
+                             marker: {color: spec.colors[response]}});
+            }
+        });
+        Plotly.react(chart, traces, chart.layout);
+    }
+
+    function attach(chartId, topic) {
+        var container = document.getElementById(chartId + '-filters');
+        if (!container) {
+            return;
+        }
+        loadBundle().then(function (bundle) {
+            var selection = {};
+            var notice = document.createElement('div');
+            notice.className = 'col-12 text-muted small';
+            Object.keys(bundle.filters).forEach(function (name) {
+                var filter = bundle.filters[name];
+                selection[name] = -1;
+                var column = document.createElement('div');
+                column.className = 'col-md-3';
+                var label = document.createElement('label');
+                label.className = 'form-label small mb-0';
+                label.textContent = filter.label;
+                var select = document.createElement('select');
+                select.className = 'form-select form-select-sm';
+                select.add(new Option('All', '-1'));
+                filter.categories.forEach(function (category, i) {
+                    select.add(new Option(category, String(i)));
+                });
+                select.addEventListener('change', function () {
+                    selection[name] = parseInt(this.value, 10);
+                    render(chartId, topic, bundle, selection, notice);
+                });
+                column.appendChild(label);
+                column.appendChild(select);
+                container.appendChild(column);
+            });
+            container.appendChild(notice);
+        }).catch(function () {
+            // No bundle (e.g. opened from file://): keep the pre-rendered chart
+            container.style.display = 'none';
+        });
+    }
+
+    return {attach: attach, aggregate: aggregate};
+})();
+"""
+
+# Client-side chart loader. Chart specs are content-hashed JSON files under
+# charts/ that name their shared layout template; each file is fetched once
+# per page and cached by the browser across pages and deploys.
+CHARTS_JS = """// 3C+ Dashboard chart loader
+var DashboardCharts = (function () {
+    var requests = {};
+
+    function load(url) {
+        if (!(url in requests)) {
+            requests[url] = fetch(url).then(function (response) {
+                if (!response.ok) {
+                    throw new Error('HTTP ' + response.status);
+                }
+                return response.json();
+            });
+        }
+        return requests[url];
+    }
+
+    // Fetch a chart and its template, then plot it into chartId
+    function plot(chartId, url) {
+        var base = url.slice(0, url.lastIndexOf('/') + 1);
+        return load(url).then(function (chart) {
+            if (!chart.template) {
+                return chart;
+            }
+            return load(base + chart.template).then(function (template) {
+                chart.layout.template = template;
+                return chart;
+            });
+        }).then(function (chart) {
+            return Plotly.newPlot(chartId, chart.data, chart.layout);
+        });
+    }
+
+    return {plot: plot};
+})();
+"""
+
 # Create routes for each page
-@app.route('/')
-def index():
-    analyzer = SurveyAnalyzer('data/survey_data.csv')
-    stats = analyzer.get_stats()
-    charts = analyzer.get_charts_data()
-    
-    # Create the demographics page content
-    content = """
+# Demographics page: key stats and the gender, role and faculty charts
+INDEX_TEMPLATE = page_template('index.html', content="""
         <!-- Key stats -->
         <div class="row mb-4">
             <div class="col-md-4">
@@ -518,98 +2961,58 @@ def index():
                 <div id="faculty-chart"></div>
             </div>
         </div>
-    """
-    
-    # Create the scripts for charts
-    scripts = """
+    """, scripts="""
     <script>
         // Render the gender chart
-        var genderData = {{ gender_chart|safe }};
-        Plotly.newPlot('gender-chart', genderData.data, genderData.layout);
+        DashboardCharts.plot('gender-chart', '{{ gender_chart }}');
         
         // Render the role chart
-        var roleData = {{ role_chart|safe }};
-        Plotly.newPlot('role-chart', roleData.data, roleData.layout);
+        DashboardCharts.plot('role-chart', '{{ role_chart }}');
         
         // Render the faculty chart
-        var facultyData = {{ faculty_chart|safe }};
-        Plotly.newPlot('faculty-chart', facultyData.data, facultyData.layout);
+        DashboardCharts.plot('faculty-chart', '{{ faculty_chart }}');
     </script>
-    """
-    
-    # First render content and scripts with their context
-    # Convert charts to JSON without binary encoding
-    def fig_to_json(fig):
-        import numpy as np
-        import base64
-
-        # Function to decode binary-encoded arrays
-        def decode_binary_arrays(obj):
-            if isinstance(obj, dict):
-                # Check if this is a binary-encoded array
-                if 'dtype' in obj and 'bdata' in obj:
-                    # Decode the base64 data
-                    binary_data = base64.b64decode(obj['bdata'])
-                    # Convert to numpy array with the specified dtype
-                    dtype = np.dtype(obj['dtype'])
-                    array = np.frombuffer(binary_data, dtype=dtype)
-                    # Return as a list
-                    return array.tolist()
-                else:
-                    # Recursively process dict values
-                    return {k: decode_binary_arrays(v) for k, v in obj.items()}
-            elif isinstance(obj, list):
-                return [decode_binary_arrays(item) for item in obj]
-            return obj
-
-        # First convert to JSON with PlotlyJSONEncoder, then decode binary arrays
-        fig_json_str = json.dumps(fig, cls=plotly.utils.PlotlyJSONEncoder)
-        fig_dict = json.loads(fig_json_str)
-        fig_dict = decode_binary_arrays(fig_dict)
-        return json.dumps(fig_dict)
-
-    rendered_content = render_template_string(content, stats=stats)
-    rendered_scripts = render_template_string(scripts,
-        gender_chart=fig_to_json(charts.get('gender', go.Figure())),
-        role_chart=fig_to_json(charts.get('role', go.Figure())),
-        faculty_chart=fig_to_json(charts.get('faculty', go.Figure()))
-    )
+    """)
+
+@route('/')
+def index():
+    analyzer = get_analyzer()
+    stats = analyzer.get_stats()
+    charts = analyzer.get_charts(PAGE_INPUTS['index']['charts'])
     
-    # Then render the main template with the rendered content/scripts
-    return render_template_string(
-        HTML_TEMPLATE,
+    # Render the page and its charts in one pass
+    return flask.render_template(
+        INDEX_TEMPLATE,
         active_page='index',
         current_date=datetime.now().strftime('%B %d, %Y'),
-        content=Markup(rendered_content),
-        scripts=Markup(rendered_scripts)
+        stats=stats,
+        gender_chart=chart_asset(charts.get('gender', go.Figure())),
+        role_chart=chart_asset(charts.get('role', go.Figure())),
+        faculty_chart=chart_asset(charts.get('faculty', go.Figure()))
     )
 
-@app.route('/misogyny.html')
-def misogyny():
-    analyzer = SurveyAnalyzer('data/survey_data.csv')
-    charts = analyzer.get_charts_data()
-    text_analysis = analyzer.analyze_text('Q11_10_TEXT')
-    
-    # Default values for the template
-    chart = go.Figure()
-    text_examples = []
-    
-    if 'misogyny' in charts:
-        chart = charts['misogyny']
-    
-    if text_analysis:
-        text_examples = text_analysis['sample_responses']
-    # test
-    # Create the misogyny page content
-    content = """
+# Misogyny page: observations chart, demographic breakdown and sample responses
+MISOGYNY_TEMPLATE = page_template('misogyny.html', content="""
         <h2 class="mb-4">Misogyny Analysis</h2>
         
+        <!-- Filters (shown once the aggregated data bundle loads) -->
+        <div id="misogyny-chart-filters" class="row g-2 mb-3"></div>
+
         <!-- Main chart -->
         <div class="row mb-4">
             <div class="col-12 chart-container">
                 <div id="misogyny-chart"></div>
             </div>
         </div>
+
+        {% if has_breakdown %}
+        <!-- Demographic experience -->
+        <div class="row mb-4">
+            <div class="col-12 chart-container">
+                <div id="misogyny-breakdown-chart"></div>
+            </div>
+        </div>
+        {% endif %}
         
         <!-- Text examples -->
         <h4 class="mb-3">Selected Response Examples</h4>
@@ -623,73 +3026,58 @@ def misogyny():
         {% else %}
             <p>No text responses available for the selected filters.</p>
         {% endif %}
-    """
-    
-    # Create the scripts for charts
-    scripts = """
+    """, scripts="""
+    <script src="dashboard-filters.js"></script>
     <script>
         // Render the misogyny observations chart
-        var misogynyData = {{ misogyny_chart|safe }};
-        Plotly.newPlot('misogyny-chart', misogynyData.data, misogynyData.layout);
-    </script>
-    """
-    
-    # Convert charts to JSON without binary encoding
-    def fig_to_json(fig):
-        import numpy as np
-        import base64
-        def decode_binary_arrays(obj):
-            if isinstance(obj, dict):
-                if 'dtype' in obj and 'bdata' in obj:
-                    binary_data = base64.b64decode(obj['bdata'])
-                    dtype = np.dtype(obj['dtype'])
-                    array = np.frombuffer(binary_data, dtype=dtype)
-                    return array.tolist()
-                else:
-                    return {k: decode_binary_arrays(v) for k, v in obj.items()}
-            elif isinstance(obj, list):
-                return [decode_binary_arrays(item) for item in obj]
-            return obj
-        fig_json_str = json.dumps(fig, cls=plotly.utils.PlotlyJSONEncoder)
-        fig_dict = json.loads(fig_json_str)
-        fig_dict = decode_binary_arrays(fig_dict)
-        return json.dumps(fig_dict)
-
-    # Render content and scripts
-    rendered_content = render_template_string(content, text_examples=text_examples)
-    rendered_scripts = render_template_string(scripts,
-        misogyny_chart=fig_to_json(chart)
-    )
-    
-    # Render the main template
-    return render_template_string(
-        HTML_TEMPLATE,
-        active_page='misogyny',
-        current_date=datetime.now().strftime('%B %d, %Y'),
-        content=Markup(rendered_content),
-        scripts=Markup(rendered_scripts)
-    )
+        DashboardCharts.plot('misogyny-chart', '{{ misogyny_chart }}').then(function () {
+            DashboardFilters.attach('misogyny-chart', 'misogyny');
+        });
+        {% if breakdown_chart %}
 
-@app.route('/queerphobia.html')
-def queerphobia():
-    analyzer = SurveyAnalyzer('data/survey_data.csv')
-    charts = analyzer.get_charts_data()
-    text_analysis = analyzer.analyze_text('Q20_10_TEXT')
+        // Render the demographic breakdown chart
+        DashboardCharts.plot('misogyny-breakdown-chart', '{{ breakdown_chart }}');
+        {% endif %}
+    </script>
+    """)
 
+@route('/misogyny.html')
+def misogyny():
+    analyzer = get_analyzer()
+    charts = analyzer.get_charts(PAGE_INPUTS['misogyny']['charts'])
+    text_analysis = analyzer.analyze_text('Q11_10_TEXT')
+    
     # Default values for the template
     chart = go.Figure()
     text_examples = []
+    
+    if 'misogyny' in charts:
+        chart = charts['misogyny']
 
-    if 'queerphobia' in charts:
-        chart = charts['queerphobia']
-
+    # Demographic breakdown (optional)
+    breakdown_chart = charts.get('misogyny_by_gender')
+    
     if text_analysis:
         text_examples = text_analysis['sample_responses']
 
-    # Create the queerphobia page content
-    content = """
+    # Render the page in one pass
+    return flask.render_template(
+        MISOGYNY_TEMPLATE,
+        active_page='misogyny',
+        current_date=datetime.now().strftime('%B %d, %Y'),
+        text_examples=text_examples,
+        has_breakdown=breakdown_chart is not None,
+        misogyny_chart=chart_asset(chart),
+        breakdown_chart=chart_asset(breakdown_chart) if breakdown_chart is not None else None
+    )
+
+# Queerphobia page: observations chart, demographic breakdown and sample responses
+QUEERPHOBIA_TEMPLATE = page_template('queerphobia.html', content="""
         <h2 class="mb-4">Queerphobia Analysis</h2>
 
+        <!-- Filters (shown once the aggregated data bundle loads) -->
+        <div id="queerphobia-chart-filters" class="row g-2 mb-3"></div>
+
         <!-- Main chart -->
         <div class="row mb-4">
             <div class="col-12 chart-container">
@@ -697,6 +3085,15 @@ def queerphobia():
             </div>
         </div>
 
+        {% if has_breakdown %}
+        <!-- Demographic experience -->
+        <div class="row mb-4">
+            <div class="col-12 chart-container">
+                <div id="queerphobia-breakdown-chart"></div>
+            </div>
+        </div>
+        {% endif %}
+
         <!-- Text examples -->
         <h4 class="mb-3">Selected Response Examples</h4>
         {% if text_examples %}
@@ -709,73 +3106,58 @@ def queerphobia():
         {% else %}
             <p>No text responses available for the selected filters.</p>
         {% endif %}
-    """
-
-    # Create the scripts for charts
-    scripts = """
+    """, scripts="""
+    <script src="dashboard-filters.js"></script>
     <script>
         // Render the queerphobia observations chart
-        var queerphobiaData = {{ queerphobia_chart|safe }};
-        Plotly.newPlot('queerphobia-chart', queerphobiaData.data, queerphobiaData.layout);
-    </script>
-    """
-
-    # Convert charts to JSON without binary encoding
-    def fig_to_json(fig):
-        import numpy as np
-        import base64
-        def decode_binary_arrays(obj):
-            if isinstance(obj, dict):
-                if 'dtype' in obj and 'bdata' in obj:
-                    binary_data = base64.b64decode(obj['bdata'])
-                    dtype = np.dtype(obj['dtype'])
-                    array = np.frombuffer(binary_data, dtype=dtype)
-                    return array.tolist()
-                else:
-                    return {k: decode_binary_arrays(v) for k, v in obj.items()}
-            elif isinstance(obj, list):
-                return [decode_binary_arrays(item) for item in obj]
-            return obj
-        fig_json_str = json.dumps(fig, cls=plotly.utils.PlotlyJSONEncoder)
-        fig_dict = json.loads(fig_json_str)
-        fig_dict = decode_binary_arrays(fig_dict)
-        return json.dumps(fig_dict)
-
-    # Render content and scripts
-    rendered_content = render_template_string(content, text_examples=text_examples)
-    rendered_scripts = render_template_string(scripts,
-        queerphobia_chart=fig_to_json(chart)
-    )
+        DashboardCharts.plot('queerphobia-chart', '{{ queerphobia_chart }}').then(function () {
+            DashboardFilters.attach('queerphobia-chart', 'queerphobia');
+        });
+        {% if breakdown_chart %}
 
-    # Render the main template
-    return render_template_string(
-        HTML_TEMPLATE,
-        active_page='queerphobia',
-        current_date=datetime.now().strftime('%B %d, %Y'),
-        content=Markup(rendered_content),
-        scripts=Markup(rendered_scripts)
-    )
+        // Render the demographic breakdown chart
+        DashboardCharts.plot('queerphobia-breakdown-chart', '{{ breakdown_chart }}');
+        {% endif %}
+    </script>
+    """)
 
-@app.route('/transphobia.html')
-def transphobia():
-    analyzer = SurveyAnalyzer('data/survey_data.csv')
-    charts = analyzer.get_charts_data()
-    text_analysis = analyzer.analyze_text('Q29_10_TEXT')
+@route('/queerphobia.html')
+def queerphobia():
+    analyzer = get_analyzer()
+    charts = analyzer.get_charts(PAGE_INPUTS['queerphobia']['charts'])
+    text_analysis = analyzer.analyze_text('Q20_10_TEXT')
 
     # Default values for the template
     chart = go.Figure()
     text_examples = []
 
-    if 'transphobia' in charts:
-        chart = charts['transphobia']
+    if 'queerphobia' in charts:
+        chart = charts['queerphobia']
+
+    # Demographic breakdown (optional)
+    breakdown_chart = charts.get('queerphobia_by_gender')
 
     if text_analysis:
         text_examples = text_analysis['sample_responses']
 
-    # Create the transphobia page content
-    content = """
+    # Render the page in one pass
+    return flask.render_template(
+        QUEERPHOBIA_TEMPLATE,
+        active_page='queerphobia',
+        current_date=datetime.now().strftime('%B %d, %Y'),
+        text_examples=text_examples,
+        has_breakdown=breakdown_chart is not None,
+        queerphobia_chart=chart_asset(chart),
+        breakdown_chart=chart_asset(breakdown_chart) if breakdown_chart is not None else None
+    )
+
+# Transphobia page: observations chart, demographic breakdown and sample responses
+TRANSPHOBIA_TEMPLATE = page_template('transphobia.html', content="""
         <h2 class="mb-4">Transphobia Analysis</h2>
 
+        <!-- Filters (shown once the aggregated data bundle loads) -->
+        <div id="transphobia-chart-filters" class="row g-2 mb-3"></div>
+
         <!-- Main chart -->
         <div class="row mb-4">
             <div class="col-12 chart-container">
@@ -783,6 +3165,15 @@ def transphobia():
             </div>
         </div>
 
+        {% if has_breakdown %}
+        <!-- Demographic experience -->
+        <div class="row mb-4">
+            <div class="col-12 chart-container">
+                <div id="transphobia-breakdown-chart"></div>
+            </div>
+        </div>
+        {% endif %}
+
         <!-- Text examples -->
         <h4 class="mb-3">Selected Response Examples</h4>
         {% if text_examples %}
@@ -795,83 +3186,54 @@ def transphobia():
         {% else %}
             <p>No text responses available for the selected filters.</p>
         {% endif %}
-    """
-
-    # Create the scripts for charts
-    scripts = """
+    """, scripts="""
+    <script src="dashboard-filters.js"></script>
     <script>
         // Render the transphobia observations chart
-        var transphobiaData = {{ transphobia_chart|safe }};
-        Plotly.newPlot('transphobia-chart', transphobiaData.data, transphobiaData.layout);
+        DashboardCharts.plot('transphobia-chart', '{{ transphobia_chart }}').then(function () {
+            DashboardFilters.attach('transphobia-chart', 'transphobia');
+        });
+        {% if breakdown_chart %}
+
+        // Render the demographic breakdown chart
+        DashboardCharts.plot('transphobia-breakdown-chart', '{{ breakdown_chart }}');
+        {% endif %}
     </script>
-    """
+    """)
 
-    # Convert charts to JSON without binary encoding
-    def fig_to_json(fig):
-        import numpy as np
-        import base64
-        def decode_binary_arrays(obj):
-            if isinstance(obj, dict):
-                if 'dtype' in obj and 'bdata' in obj:
-                    binary_data = base64.b64decode(obj['bdata'])
-                    dtype = np.dtype(obj['dtype'])
-                    array = np.frombuffer(binary_data, dtype=dtype)
-                    return array.tolist()
-                else:
-                    return {k: decode_binary_arrays(v) for k, v in obj.items()}
-            elif isinstance(obj, list):
-                return [decode_binary_arrays(item) for item in obj]
-            return obj
-        fig_json_str = json.dumps(fig, cls=plotly.utils.PlotlyJSONEncoder)
-        fig_dict = json.loads(fig_json_str)
-        fig_dict = decode_binary_arrays(fig_dict)
-        return json.dumps(fig_dict)
-
-    # Render content and scripts
-    rendered_content = render_template_string(content, text_examples=text_examples)
-    rendered_scripts = render_template_string(scripts,
-        transphobia_chart=fig_to_json(chart)
-    )
+@route('/transphobia.html')
+def transphobia():
+    analyzer = get_analyzer()
+    charts = analyzer.get_charts(PAGE_INPUTS['transphobia']['charts'])
+    text_analysis = analyzer.analyze_text('Q29_10_TEXT')
+
+    # Default values for the template
+    chart = go.Figure()
+    text_examples = []
+
+    if 'transphobia' in charts:
+        chart = charts['transphobia']
+
+    # Demographic breakdown (optional)
+    breakdown_chart = charts.get('transphobia_by_gender')
+
+    if text_analysis:
+        text_examples = text_analysis['sample_responses']
 
-    # Render the main template
-    return render_template_string(
-        HTML_TEMPLATE,
+    # Render the page in one pass
+    return flask.render_template(
+        TRANSPHOBIA_TEMPLATE,
         active_page='transphobia',
         current_date=datetime.now().strftime('%B %d, %Y'),
-        content=Markup(rendered_content),
-        scripts=Markup(rendered_scripts)
+        text_examples=text_examples,
+        has_breakdown=breakdown_chart is not None,
+        transphobia_chart=chart_asset(chart),
+        breakdown_chart=chart_asset(breakdown_chart) if breakdown_chart is not None else None
     )
 
-@app.route('/text-analysis.html')
-def text_analysis():
-    analyzer = SurveyAnalyzer('data/survey_data.csv')
-    
-    # Analyze different text fields
-    text_fields = [
-        {'label': 'Misogyny Experiences (Q11)', 'value': 'Q11_10_TEXT'},
-        {'label': 'Queerphobia Experiences (Q20)', 'value': 'Q20_10_TEXT'},
-        {'label': 'Transphobia Experiences (Q29)', 'value': 'Q29_10_TEXT'},
-        {'label': 'General Comments (Q40)', 'value': 'Q40'}
-    ]
-    
-    field_viz = {}
-    for field in text_fields:
-        analysis = analyzer.analyze_text(field['value'])
-        if analysis:
-            field_viz[field['value']] = {
-                'word_freq_fig': json.dumps(analysis['word_freq_fig'], cls=plotly.utils.PlotlyJSONEncoder) if analysis['word_freq_fig'] else None,
-                'theme_fig': json.dumps(analysis['theme_fig'], cls=plotly.utils.PlotlyJSONEncoder) if analysis['theme_fig'] else None,
-                'sample_responses': analysis['sample_responses']
-            }
-        else:
-            field_viz[field['value']] = {
-                'word_freq_fig': None,
-                'theme_fig': None,
-                'sample_responses': []
-            }
-    
-    # Here we'll create the content for the page
-    content_template = """
+# Text analysis page: word, phrase and theme charts per open-text field, distinctive
+# words and the exported sentiment labels
+TEXT_ANALYSIS_TEMPLATE = page_template('text-analysis.html', content="""
         <h2 class="mb-4">Text Analysis</h2>
         
         <!-- Field selector -->
@@ -896,6 +3258,12 @@ def text_analysis():
                     </div>
                 {% endif %}
                 
+                {% if field_viz[field.value].phrase_fig %}
+                    <div class="chart-container mb-4">
+                        <div id="phrase-{{ field.value|replace('_', '-') }}"></div>
+                    </div>
+                {% endif %}
+                
                 {% if field_viz[field.value].theme_fig %}
                     <div class="chart-container mb-4">
                         <div id="theme-{{ field.value|replace('_', '-') }}"></div>
@@ -915,28 +3283,59 @@ def text_analysis():
                 {% endif %}
             </div>
         {% endfor %}
-    """
-    
-    # And the scripts for visualization
-    scripts_template = """
+        
+        <!-- Distinctive words across every open-text question -->
+        {% if distinctive_terms %}
+            <h4 class="mt-5 mb-3">Distinctive Words by Gender</h4>
+            <p class="text-muted">Words each group uses more than the other groups across all open-text answers (TF-IDF). Groups with fewer than {{ min_group }} respondents are not shown.</p>
+            <table class="table table-sm">
+                <thead>
+                    <tr><th>Gender</th><th>Respondents</th><th>Distinctive Words</th></tr>
+                </thead>
+                <tbody>
+                    {% for group in distinctive_terms %}
+                        <tr><td>{{ group.group }}</td><td>{{ group.respondents }}</td><td>{{ group.terms|join(', ') }}</td></tr>
+                    {% endfor %}
+                </tbody>
+            </table>
+        {% endif %}
+        
+        <!-- Sentiment, emotion and topic labels exported with the answers -->
+        {% for field in enriched_fields %}
+            <h4 class="mt-5 mb-3">{{ field.label }}: Sentiment, Emotion and Effort</h4>
+            <div class="row">
+                {% for chart in enrichment_charts if chart.field == field.value %}
+                    <div class="{{ chart.width }} chart-container mb-4">
+                        <div id="{{ chart.id }}"></div>
+                    </div>
+                {% endfor %}
+            </div>
+        {% endfor %}
+    """, scripts="""
     <script>
-        // Plot the word frequency and theme charts for each field
+        // Plot the word frequency, phrase and theme charts for each field
         {% for field in text_fields %}
             {% if field_viz[field.value].word_freq_fig %}
-                var wordFreqData{{ loop.index }} = {{ field_viz[field.value].word_freq_fig|safe }};
-                Plotly.newPlot('word-freq-{{ field.value|replace('_', '-') }}', 
-                              wordFreqData{{ loop.index }}.data, 
-                              wordFreqData{{ loop.index }}.layout);
+                DashboardCharts.plot('word-freq-{{ field.value|replace('_', '-') }}', 
+                                     '{{ field_viz[field.value].word_freq_fig }}');
+            {% endif %}
+            
+            {% if field_viz[field.value].phrase_fig %}
+                DashboardCharts.plot('phrase-{{ field.value|replace('_', '-') }}', 
+                                     '{{ field_viz[field.value].phrase_fig }}');
             {% endif %}
             
             {% if field_viz[field.value].theme_fig %}
-                var themeData{{ loop.index }} = {{ field_viz[field.value].theme_fig|safe }};
-                Plotly.newPlot('theme-{{ field.value|replace('_', '-') }}', 
-                              themeData{{ loop.index }}.data, 
-                              themeData{{ loop.index }}.layout);
+                DashboardCharts.plot('theme-{{ field.value|replace('_', '-') }}', 
+                                     '{{ field_viz[field.value].theme_fig }}');
             {% endif %}
         {% endfor %}
         
+        // Plot the exported sentiment, emotion, actionability, effort and topic charts
+        {% for chart in enrichment_charts %}
+            DashboardCharts.plot('{{ chart.id }}', '{{ chart.url }}');
+        {% endfor %}
+        
         // Handle field selection
         document.getElementById('text-field-selector').addEventListener('change', function() {
             // Hide all content divs
@@ -951,71 +3350,73 @@ def text_analysis():
             document.getElementById(selectedContentId).style.display = 'block';
         });
     </script>
-    """
+    """)
+
+@route('/text-analysis.html')
+def text_analysis():
+    analyzer = get_analyzer()
     
-    # Convert charts to JSON without binary encoding
-    def fig_to_json_or_none(fig_str):
-        if fig_str is None:
-            return None
-        fig_dict = json.loads(fig_str)
-        def convert_arrays(obj):
-            if isinstance(obj, dict):
-                return {k: convert_arrays(v) for k, v in obj.items()}
-            elif isinstance(obj, list):
-                return [convert_arrays(item) for item in obj]
-            elif hasattr(obj, 'tolist'):
-                return obj.tolist()
-            return obj
-        return json.dumps(convert_arrays(fig_dict))
-
-    # Convert all field visualizations
-    for field_value, viz in field_viz.items():
-        if viz['word_freq_fig']:
-            viz['word_freq_fig'] = fig_to_json_or_none(viz['word_freq_fig'])
-        if viz['theme_fig']:
-            viz['theme_fig'] = fig_to_json_or_none(viz['theme_fig'])
-
-    # Pre-render content and scripts with their context
-    rendered_content = render_template_string(content_template, text_fields=text_fields, field_viz=field_viz)
-    rendered_scripts = render_template_string(scripts_template, text_fields=text_fields, field_viz=field_viz)
+    # Analyze different text fields
+    text_fields = [
+        {'label': 'Misogyny Experiences (Q11)', 'value': 'Q11_10_TEXT'},
+        {'label': 'Queerphobia Experiences (Q20)', 'value': 'Q20_10_TEXT'},
+        {'label': 'Transphobia Experiences (Q29)', 'value': 'Q29_10_TEXT'},
+        {'label': 'General Comments (Q40)', 'value': 'Q40'}
+    ]
+    
+    field_viz = {}
+    for field in text_fields:
+        analysis = analyzer.analyze_text(field['value'])
+        if analysis:
+            field_viz[field['value']] = {
+                'word_freq_fig': chart_asset(analysis['word_freq_fig']) if analysis['word_freq_fig'] else None,
+                'phrase_fig': chart_asset(analysis['phrase_fig']) if analysis['phrase_fig'] else None,
+                'theme_fig': chart_asset(analysis['theme_fig']) if analysis['theme_fig'] else None,
+                'sample_responses': analysis['sample_responses']
+            }
+        else:
+            field_viz[field['value']] = {
+                'word_freq_fig': None,
+                'phrase_fig': None,
+                'theme_fig': None,
+                'sample_responses': []
+            }
+    
+    # Terms that set each gender group apart across all open-text answers
+    distinctive_terms = analyzer.distinctive_terms()
     
-    # Now insert these into the base template with Markup to prevent escaping
-    return render_template_string(
-        HTML_TEMPLATE,
+    # Charts of the sentiment, emotion, topic, actionability and effort labels exported with the answers
+    charts = analyzer.get_charts(PAGE_INPUTS['text-analysis']['charts'])
+    enrichment_charts = []
+    for field in ENRICHED_TEXT_FIELDS:
+        for kind, width in (('sentiment', 'col-md-6'), ('emotion', 'col-md-6'), ('actionability', 'col-md-6'),
+                            ('effort', 'col-md-6'), ('topic_sentiment', 'col-12')):
+            fig = charts.get(f'{field.lower()}_{kind}')
+            if fig is not None:
+                enrichment_charts.append({
+                    'field': field,
+                    'id': f"{field.lower()}-{kind.replace('_', '-')}",
+                    'width': width,
+                    'url': chart_asset(fig)
+                })
+    enriched_fields = [{'value': field, 'label': label} for field, label in ENRICHED_TEXT_FIELDS.items()
+                       if any(chart['field'] == field for chart in enrichment_charts)]
+    
+    # Render the page in one pass
+    return flask.render_template(
+        TEXT_ANALYSIS_TEMPLATE,
         active_page='text-analysis',
         current_date=datetime.now().strftime('%B %d, %Y'),
-        content=Markup(rendered_content),
-        scripts=Markup(rendered_scripts)
+        text_fields=text_fields,
+        field_viz=field_viz,
+        distinctive_terms=distinctive_terms,
+        min_group=MIN_BREAKDOWN_GROUP,
+        enriched_fields=enriched_fields,
+        enrichment_charts=enrichment_charts
     )
 
-@app.route('/comparative.html')
-def comparative():
-    analyzer = SurveyAnalyzer('data/survey_data.csv')
-    charts = analyzer.get_charts_data()
-    
-    # Default values
-    has_comparison_data = False
-    bar_chart = go.Figure()
-    radar_chart = go.Figure()
-    comparison_data = []
-    misogyny_mean = 0
-    queerphobia_mean = 0
-    transphobia_mean = 0
-    highest_mean_type = "N/A"
-
-    # Check if comparison data is available
-    if all(key in charts for key in ['comparison_bar', 'comparison_radar', 'comparison_data']):
-        has_comparison_data = True
-        bar_chart = charts['comparison_bar']
-        radar_chart = charts['comparison_radar']
-        comparison_data = charts['comparison_data']
-        misogyny_mean = charts.get('misogyny_mean', 0)
-        queerphobia_mean = charts.get('queerphobia_mean', 0)
-        transphobia_mean = charts.get('transphobia_mean', 0)
-        highest_mean_type = charts.get('highest_mean_type', "N/A")
-    
-    # Create the comparative analysis content
-    content = """
+# Comparative page: misogyny, queerphobia and transphobia side by side
+COMPARATIVE_TEMPLATE = page_template('comparative.html', content="""
         <h2 class="mb-4">Comparative Analysis</h2>
         
         {% if has_comparison_data %}
@@ -1078,113 +3479,563 @@ def comparative():
                 <p>There isn't enough data to perform a comparative analysis between misogyny, queerphobia, and transphobia observations.</p>
             </div>
         {% endif %}
-    """
-    
-    # Create the scripts for comparative charts
-    scripts = """
+    """, scripts="""
     <script>
         {% if has_comparison_data %}
             // Render bar chart
-            var barData = {{ bar_chart|safe }};
-            Plotly.newPlot('bar-chart', barData.data, barData.layout);
+            DashboardCharts.plot('bar-chart', '{{ bar_chart }}');
             
             // Render radar chart
-            var radarData = {{ radar_chart|safe }};
-            Plotly.newPlot('radar-chart', radarData.data, radarData.layout);
+            DashboardCharts.plot('radar-chart', '{{ radar_chart }}');
         {% endif %}
     </script>
-    """
+    """)
+
+@route('/comparative.html')
+def comparative():
+    analyzer = get_analyzer()
+    charts = analyzer.get_charts(PAGE_INPUTS['comparative']['charts'])
+    
+    # Default values
+    has_comparison_data = False
+    bar_chart = go.Figure()
+    radar_chart = go.Figure()
+    comparison_data = []
+    misogyny_mean = 0
+    queerphobia_mean = 0
+    transphobia_mean = 0
+    highest_mean_type = "N/A"
+
+    # Check if comparison data is available
+    if all(key in charts for key in ['comparison_bar', 'comparison_radar', 'comparison_data']):
+        has_comparison_data = True
+        bar_chart = charts['comparison_bar']
+        radar_chart = charts['comparison_radar']
+        comparison_data = charts['comparison_data']
+        misogyny_mean = charts.get('misogyny_mean', 0)
+        queerphobia_mean = charts.get('queerphobia_mean', 0)
+        transphobia_mean = charts.get('transphobia_mean', 0)
+        highest_mean_type = charts.get('highest_mean_type', "N/A")
     
-    # Convert charts to JSON without binary encoding
-    def fig_to_json(fig):
-        import numpy as np
-        import base64
-        def decode_binary_arrays(obj):
-            if isinstance(obj, dict):
-                if 'dtype' in obj and 'bdata' in obj:
-                    binary_data = base64.b64decode(obj['bdata'])
-                    dtype = np.dtype(obj['dtype'])
-                    array = np.frombuffer(binary_data, dtype=dtype)
-                    return array.tolist()
-                else:
-                    return {k: decode_binary_arrays(v) for k, v in obj.items()}
-            elif isinstance(obj, list):
-                return [decode_binary_arrays(item) for item in obj]
-            return obj
-        fig_json_str = json.dumps(fig, cls=plotly.utils.PlotlyJSONEncoder)
-        fig_dict = json.loads(fig_json_str)
-        fig_dict = decode_binary_arrays(fig_dict)
-        return json.dumps(fig_dict)
-
-    # Render content and scripts
-    rendered_content = render_template_string(content,
+    # Render the page in one pass
+    return flask.render_template(
+        COMPARATIVE_TEMPLATE,
+        active_page='comparative',
+        current_date=datetime.now().strftime('%B %d, %Y'),
         has_comparison_data=has_comparison_data,
         comparison_data=comparison_data,
         misogyny_mean=misogyny_mean,
         queerphobia_mean=queerphobia_mean,
         transphobia_mean=transphobia_mean,
-        highest_mean_type=highest_mean_type
+        highest_mean_type=highest_mean_type,
+        bar_chart=chart_asset(bar_chart),
+        radar_chart=chart_asset(radar_chart)
     )
 
-    rendered_scripts = render_template_string(scripts,
-        has_comparison_data=has_comparison_data,
-        bar_chart=fig_to_json(bar_chart),
-        radar_chart=fig_to_json(radar_chart)
-    )
+@route('/dashboard-data.json')
+def dashboard_data():
+    bundle = get_analyzer().filter_bundle()
+    return flask.Response(json.dumps(bundle, separators=(',', ':')), mimetype='application/json')
+
+@route('/dashboard-filters.js')
+def dashboard_filters():
+    return flask.Response(FILTERS_JS, mimetype=mimetypes.guess_type('dashboard-filters.js')[0])
+
+@route('/dashboard-charts.js')
+def dashboard_charts():
+    return flask.Response(CHARTS_JS, mimetype=mimetypes.guess_type('dashboard-charts.js')[0])
+
+def load_manifest(path=MANIFEST_PATH):
+    """Load the build manifest from the previous run, or an empty one"""
+    try:
+        with open(path) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if manifest.get('version') != MANIFEST_VERSION:
+        return {}
+    return manifest
+
+def save_manifest(manifest, path=MANIFEST_PATH):
+    """Atomically write the build manifest"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+def page_input_key(page_path, inputs):
+    """Hash everything a page's output depends on into one key"""
+    payload = json.dumps({'page': page_path, 'inputs': inputs}, sort_keys=True)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+def page_output_intact(page_path, entry):
+    """Check that a page and the chart files it refers to still match the hashes in its manifest entry"""
+    if not entry:
+        return False
+    output_dir = dataset_output_dir()
+    if file_hash(os.path.join(output_dir, page_path)) != entry.get('output'):
+        return False
+    # A missing or altered chart leaves the page fetching a 404 or the wrong figure
+    return all(file_hash(os.path.join(output_dir, CHART_ASSET_DIR, name)) == digest
+               for name, digest in entry.get('assets', {}).items())
+
+def page_is_current(page_path, input_key, entry):
+    """Check a page's manifest entry against its inputs and the file on disk"""
+    if not entry or entry.get('inputs') != input_key:
+        return False
+    return page_output_intact(page_path, entry)
+
+def render_page(url, datasets=None, current=None):
+    """Render one page of the current (or given) dataset through the Flask app and return its bytes"""
+    if current is not None:
+        use_datasets(datasets, current)
+    client = get_app().test_client()
+    response = client.get(url)
+    if response.status_code != 200:
+        raise ValueError(f'Unexpected status {response.status!r} on URL {url}')
+    content = response.data
+    response.close()
+    return content
+
+def render_page_profiled(url, datasets=None, current=None):
+    """render_page() in a worker process, returning the page's profile record with its bytes"""
+    content = render_page(url, datasets, current)
+    page = posixpath.join(_dataset['output'], get_freezer().urlpath_to_filepath(url))
+    return content, PROFILER.pages.pop(page, None)
+
+def write_atomic(path, content):
+    """Write bytes via a temporary file so readers never see a partial page"""
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(content)
+    os.replace(tmp_path, path)
+
+def write_if_changed(path, content):
+    """Write bytes atomically unless the file already holds them; return whether it was written"""
+    if os.path.isfile(path):
+        with open(path, 'rb') as f:
+            if f.read() == content:
+                return False
+    write_atomic(path, content)
+    return True
+
+def fork_context():
+    """Fork start method when the platform has it, so workers inherit loaded state"""
+    if 'fork' in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context('fork')
+    return None
+
+def freeze_parallel(urls, jobs):
+    """Render pages across a process pool and write the changed ones atomically.
+
+    The CSV is parsed once in this process before the pool starts; forked
+    workers inherit the cached analyzer instead of loading it again. Output
+    is byte-identical to Freezer's serial build.
+    """
+    get_analyzer()
+    freezer = get_freezer()
+    render = functools.partial(render_page_profiled, datasets=_datasets, current=_dataset)
+    with ProcessPoolExecutor(max_workers=jobs, mp_context=fork_context()) as pool:
+        for url, (content, record) in zip(urls, pool.map(render, urls)):
+            page = freezer.urlpath_to_filepath(url)
+            key = posixpath.join(_dataset['output'], page)
+            if record is not None:
+                PROFILER.pages[key] = record
+            started = time.perf_counter()
+            # Only rewrite pages whose bytes changed, like Freezer does
+            write_if_changed(os.path.join(dataset_output_dir(), page), content)
+            PROFILER.page_written(key, record['seconds'] + time.perf_counter() - started if record else 0)
+
+def create_sample_data(data_path):
+    """Write a tiny sample export so a fresh checkout can build"""
+    print(f"Warning: No survey data found at {data_path}")
+    print("Creating a sample CSV file for testing...")
     
-    # Render the main template
-    return render_template_string(
-        HTML_TEMPLATE,
-        active_page='comparative',
-        current_date=datetime.now().strftime('%B %d, %Y'),
-        content=Markup(rendered_content),
-        scripts=Markup(rendered_scripts)
-    )
+    # Create a simple sample dataset
+    sample_data = {
+        'Q1': ['Response 1', 'Response 2', 'Response 3'],
+        'Q2': ['Woman', 'Man', 'Non-binary'],
+        'Q5': ['Arts', 'Science', 'Business'],
+        'Q6': ['Student', 'Faculty', 'Staff'],
+        'Finished': ['True', 'True', 'True'],
+        'Duration (in seconds)': [300, 450, 600],
+        'Q10_1': ['Yes', 'No', 'Unsure'],
+        'Q10_2': ['No', 'Yes', 'No'],
+        'Q10_3': ['Yes', 'Yes', 'No'],
+        'Q10_4': ['Unsure', 'No', 'Yes'],
+        'Q11_10_TEXT': ['I experienced misogyny in my class.', 'N/A', 'Some students made inappropriate comments.'],
+        'Q19_1': ['No', 'Yes', 'Yes'],
+        'Q19_2': ['No', 'No', 'Yes'],
+        'Q19_3': ['Yes', 'No', 'Unsure'],
+        'Q19_4': ['No', 'Yes', 'No'],
+        'Q20_10_TEXT': ['N/A', 'Heard homophobic comments in the hallway.', 'Several instances in group projects.'],
+        'Q40': ['Overall good experience.', 'Need more awareness programs.', 'The survey was well designed.']
+    }
+    pd.DataFrame(sample_data).to_csv(data_path, index=False)
+
+def build_dataset(dataset, force=False, jobs=1, datasets=None):
+    """Build one dataset's dashboard, rewriting only pages whose inputs changed.
+
+    With jobs > 1 the stale pages are rendered in a process pool. Returns
+    (changed, summary): whether any output page changed, and the dataset's
+    trend_summary() for the trend page.
+    """
+    use_datasets(datasets if datasets is not None else _datasets, dataset)
+    app, freezer = get_app(), get_freezer()
+    output_dir = dataset_output_dir(dataset)
+    data_path = dataset['data']
+    manifest_path = dataset_manifest_path(dataset)
 
-# Main function to generate the static site
-def generate_static_site():
     # Configure Freezer
-    app.config['FREEZER_DESTINATION'] = 'docs'#'static_dashboard'
+    # Absolute, since Freezer resolves relative destinations against the app's root path
+    app.config['FREEZER_DESTINATION'] = os.path.abspath(output_dir)#'static_dashboard'
     app.config['FREEZER_RELATIVE_URLS'] = True
+    # Keep the chart files, precompressed siblings, the trend page and the pages
+    # of datasets nested under this one
+    app.config['FREEZER_DESTINATION_IGNORE'] = [CHART_ASSET_DIR + '/'] + [
+        '*' + suffix for suffix in COMPRESSED_SUFFIXES] + [
+        os.path.relpath(dataset_output_dir(other), output_dir).replace(os.sep, '/') + '/'
+        for other in _datasets
+        if dataset_output_dir(other).startswith(output_dir + os.sep)
+    ] + ([TREND_PAGE] if len(_datasets) > 1 and output_dir == os.path.normpath(OUTPUT_DIR) else [])
     
     # Create the output directory
-    os.makedirs('docs', exist_ok=True)
+    os.makedirs(output_dir, exist_ok=True)
     
     # Ensure data directory exists
-    os.makedirs('data', exist_ok=True)
+    os.makedirs(os.path.dirname(data_path) or '.', exist_ok=True)
     
     # Check for survey data
-    if not os.path.exists('data/survey_data.csv'):
-        print("Warning: No survey data found at data/survey_data.csv")
-        print("Creating a sample CSV file for testing...")
-        
-        # Create a simple sample dataset
-        sample_data = {
-            'Q1': ['Response 1', 'Response 2', 'Response 3'],
-            'Q2': ['Woman', 'Man', 'Non-binary'],
-            'Q5': ['Arts', 'Science', 'Business'],
-            'Q6': ['Student', 'Faculty', 'Staff'],
-            'Finished': ['True', 'True', 'True'],
-            'Duration (in seconds)': [300, 450, 600],
-            'Q10_1': ['Yes', 'No', 'Unsure'],
-            'Q10_2': ['No', 'Yes', 'No'],
-            'Q10_3': ['Yes', 'Yes', 'No'],
-            'Q10_4': ['Unsure', 'No', 'Yes'],
-            'Q11_10_TEXT': ['I experienced misogyny in my class.', 'N/A', 'Some students made inappropriate comments.'],
-            'Q19_1': ['No', 'Yes', 'Yes'],
-            'Q19_2': ['No', 'No', 'Yes'],
-            'Q19_3': ['Yes', 'No', 'Unsure'],
-            'Q19_4': ['No', 'Yes', 'No'],
-            'Q20_10_TEXT': ['N/A', 'Heard homophobic comments in the hallway.', 'Several instances in group projects.'],
-            'Q40': ['Overall good experience.', 'Need more awareness programs.', 'The survey was well designed.']
-        }
-        pd.DataFrame(sample_data).to_csv('data/survey_data.csv', index=False)
+    if not os.path.exists(data_path):
+        create_sample_data(data_path)
     
+    # Nothing to do if the CSV, generator and dataset list are unchanged and every page is intact
+    inputs = {
+        'data': file_hash(data_path),
+        'code': code_hash(),
+        'navigation': dataset_links(output_dir, dataset['name']),
+        'stream': dataset.get('stream', False)
+    }
+    urls = {freezer.urlpath_to_filepath(url): url for url in freezer.all_urls()}
+    pages = list(urls)
+    manifest = load_manifest(manifest_path)
+    previous = manifest.get('pages', {})
+    if not force and manifest.get('inputs') == inputs and 'summary' in manifest and all(
+            page_output_intact(page, previous.get(page)) for page in pages):
+        print("Survey data and generator are unchanged; nothing to rebuild.")
+        return False, manifest['summary']
+
+    # Otherwise a page is stale only if the columns it reads (or the code) changed
+    analyzer = get_analyzer()
+    input_keys = {
+        page: page_input_key(page, {
+            'code': inputs['code'],
+            'navigation': inputs['navigation'],
+            'columns': analyzer.page_digest(os.path.splitext(page)[0])
+        })
+        for page in pages
+    }
+    stale = set(page for page in pages
+                if force or not page_is_current(page, input_keys[page], previous.get(page)))
+    damaged = set(page for page in pages if not page_output_intact(page, previous.get(page)))
+    # Charts are only written when their file is missing, so drop altered ones to have them rewritten
+    for page in damaged:
+        for name, digest in previous.get(page, {}).get('assets', {}).items():
+            path = os.path.join(output_dir, CHART_ASSET_DIR, name)
+            if file_hash(path) not in (None, digest):
+                os.remove(path)
+
+    # Fold added, changed and removed responses into the persisted aggregates
+    analyzer.aggregates(rebuild=force)
+    summary = analyzer.trend_summary()
+
+    if not stale:
+        print("No page reads any changed column; nothing to rebuild.")
+        save_manifest(dict(manifest, inputs=inputs, summary=summary), manifest_path)
+        return False, summary
+
     # Generate the static site
-    print("Generating static site...")
-    freezer.freeze()
-    print("Static site generated in the 'static_dashboard' directory!")
-    print("Open 'static_dashboard/index.html' in your browser to view it.")
+    jobs = max(1, min(jobs, len(stale)))
+    print(f"Generating static site ({len(stale)} of {len(pages)} pages, {jobs} jobs)...")
+    if jobs > 1:
+        freeze_parallel([urls[page] for page in pages if page in stale], jobs)
+    else:
+        # Freezer only renders stale pages and only rewrites files whose bytes differ
+        def skip_current_page(url, path):
+            return freezer.urlpath_to_filepath(url) not in stale
+        app.config['FREEZER_SKIP_EXISTING'] = skip_current_page
+        started = time.perf_counter()
+        for page in freezer.freeze_yield():
+            PROFILER.page_written(posixpath.join(dataset['output'], page.path.as_posix()),
+                                  time.perf_counter() - started)
+            started = time.perf_counter()
+    prune_chart_assets(output_dir)
+
+    outputs = {page: {'output': file_hash(os.path.join(output_dir, page)),
+                      'assets': chart_asset_hashes(output_dir, page)} for page in pages}
+    save_manifest({
+        'version': MANIFEST_VERSION,
+        'inputs': inputs,
+        'summary': summary,
+        'pages': {page: dict(outputs[page], inputs=input_keys[page]) for page in pages}
+    }, manifest_path)
+
+    # A page whose charts were restored changed on disk even when its own bytes did not
+    changed = [page for page in pages if page in damaged or any(
+        outputs[page][field] != previous.get(page, {}).get(field) for field in ('output', 'assets'))]
+    if not changed:
+        print("Rebuilt pages are identical to the previous build.")
+        return False, summary
+    print(f"Static site generated in the '{output_dir}' directory ({len(changed)} pages changed)!")
+    # Charts are fetched, which browsers refuse for file:// pages
+    print(f"Serve it over HTTP to view it, e.g. python -m http.server -d {output_dir}")
+    return True, summary
+
+# Trend page: observation rates and responses wave over wave
+TREND_TEMPLATE = page_template('trends.html', content="""
+        <h2 class="mb-4">Trends Across Waves</h2>
+
+        <div class="row mb-4">
+            <div class="col-md-7 chart-container">
+                <div id="rates-chart"></div>
+            </div>
+            <div class="col-md-5 chart-container">
+                <div id="responses-chart"></div>
+            </div>
+        </div>
+
+        <h4 class="mb-3">Wave Summary</h4>
+        <div class="table-responsive">
+            <table class="table table-striped">
+                <thead>
+                    <tr>
+                        <th>Dataset</th>
+                        <th>Responses</th>
+                        <th>Completion Rate</th>
+                        <th>Avg. Duration</th>
+                        {% for topic in topics %}
+                            <th>{{ topic|capitalize }} Observations (%)</th>
+                        {% endfor %}
+                    </tr>
+                </thead>
+                <tbody>
+                    {% for row in rows %}
+                        <tr>
+                            <td>{{ row.label }}</td>
+                            <td>{{ row.total_responses|int }}</td>
+                            <td>{{ "%.1f"|format(row.completion_rate) }}%</td>
+                            <td>{{ "%.1f"|format(row.avg_duration_minutes) }} min</td>
+                            {% for topic in topics %}
+                                <td>{% if topic in row.yes_rates %}{{ "%.1f"|format(row.yes_rates[topic]) }}%{% else %}N/A{% endif %}</td>
+                            {% endfor %}
+                        </tr>
+                    {% endfor %}
+                </tbody>
+            </table>
+        </div>
+    """, scripts="""
+    <script>
+        DashboardCharts.plot('rates-chart', '{{ rates_chart }}');
+
+        DashboardCharts.plot('responses-chart', '{{ responses_chart }}');
+    </script>
+    """)
+
+def render_trend_page(datasets, summaries):
+    """Render the wave-over-wave trend page from each dataset's trend_summary()"""
+    labels = [dataset['label'] for dataset in datasets]
+    rates_fig = go.Figure()
+    for topic, spec in OBSERVATION_TOPICS.items():
+        rates_fig.add_trace(go.Scatter(
+            x=labels,
+            y=[summary['yes_rates'].get(topic) for summary in summaries],
+            mode='lines+markers',
+            name=topic.capitalize(),
+            line_color=spec['colors']['Yes']
+        ))
+    rates_fig.update_layout(
+        title='Observation Rates by Wave (% Yes across all contexts)',
+        yaxis=dict(title='Yes %', range=[0, 100])
+    )
+    responses_fig = px.bar(
+        x=labels,
+        y=[summary['stats']['total_responses'] for summary in summaries],
+        title='Responses by Wave',
+        labels={'x': 'Dataset', 'y': 'Responses'},
+        color_discrete_sequence=['#3498db']
+    )
+    rows = [dict(summary['stats'], label=label, yes_rates=summary['yes_rates'])
+            for label, summary in zip(labels, summaries)]
+
+    with get_app().app_context():
+        # Page links point at the latest wave's dashboard
+        latest = os.path.relpath(dataset_output_dir(datasets[-1]), OUTPUT_DIR).replace(os.sep, '/')
+        return flask.render_template(
+            TREND_TEMPLATE,
+            active_page='trends',
+            page_prefix='' if latest == '.' else latest + '/',
+            dataset_links=dataset_links(os.path.normpath(OUTPUT_DIR), TREND_PAGE),
+            current_date=datetime.now().strftime('%B %d, %Y'),
+            rows=rows,
+            topics=list(OBSERVATION_TOPICS),
+            rates_chart=chart_asset(rates_fig, OUTPUT_DIR),
+            responses_chart=chart_asset(responses_fig, OUTPUT_DIR)
+        )
+
+def build_dataset_process(dataset, force, jobs, datasets):
+    """build_dataset() in a worker process, returning its profile with its result"""
+    PROFILER.reset()
+    changed, summary = build_dataset(dataset, force, jobs, datasets)
+    return changed, summary, PROFILER.snapshot() if PROFILER.enabled else None
+
+def warm_shared_state():
+    """Set up the state every dataset build shares before the build processes fork.
+
+    Forked workers inherit Plotly's validators and default template and the
+    compiled page templates (the stop words and theme patterns are built at
+    import) instead of each loading their own.
+    """
+    fig_to_json(px.bar(x=['a'], y=[1]))
+    jinja_env = get_app().jinja_env
+    for name in TEMPLATES:
+        jinja_env.get_template(name)
+
+def compression_encodings():
+    """The precompressed siblings written for each output, as {suffix: compress function}"""
+    encodings = {'.gz': lambda data: gzip.compress(data, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        encodings['.br'] = lambda data: brotli.compress(data, quality=11)
+    return encodings
+
+def compress_file(path):
+    """Write the precompressed siblings of one output file"""
+    with open(path, 'rb') as f:
+        data = f.read()
+    for suffix, compress in compression_encodings().items():
+        write_atomic(path + suffix, compress(data))
+    return path
+
+def precompress_outputs(output_dir=OUTPUT_DIR, jobs=1):
+    """Bring the .gz (and, with brotli installed, .br) siblings of every HTML, JSON and JS output up to date.
+
+    Outputs whose content hash matches the one recorded when they were last
+    compressed are skipped, and siblings whose output is gone (or whose
+    encoding is no longer available) are deleted. With jobs > 1 the outputs
+    are compressed in a process pool. Returns the number compressed.
+    """
+    suffixes = list(compression_encodings())
+    sources = []
+    for root, _, names in os.walk(output_dir):
+        for name in names:
+            path = os.path.join(root, name)
+            source, suffix = os.path.splitext(path)
+            if name.endswith(PRECOMPRESSED_TYPES):
+                sources.append(path)
+            elif suffix in COMPRESSED_SUFFIXES and (suffix not in suffixes or not os.path.isfile(source)):
+                os.remove(path)
+
+    previous = load_manifest(COMPRESSION_MANIFEST_PATH).get('files', {})
+    hashes = {path: file_hash(path) for path in sources}
+    stale = [path for path in sources
+             if previous.get(path) != hashes[path]
+             or not all(os.path.isfile(path + suffix) for suffix in suffixes)]
+    jobs = max(1, min(jobs, len(stale)))
+    if jobs > 1:
+        with ProcessPoolExecutor(max_workers=jobs, mp_context=fork_context()) as pool:
+            list(pool.map(compress_file, stale))
+    else:
+        for path in stale:
+            compress_file(path)
+    if stale or hashes != previous:
+        save_manifest({'version': MANIFEST_VERSION, 'files': hashes}, COMPRESSION_MANIFEST_PATH)
+    if stale:
+        print(f"Precompressed {len(stale)} of {len(sources)} files ({', '.join(suffixes)}).")
+    return len(stale)
+
+# Main function to generate the static site
+def generate_static_site(force=False, jobs=1, datasets=None, precompress=True):
+    """Build every dataset's dashboard and, when there are several, the trend page.
+
+    datasets defaults to load_datasets(). Several datasets are built
+    concurrently, one process each, with jobs page workers apiece. With
+    precompress the outputs' .gz/.br siblings are then brought up to date,
+    using jobs processes. Returns True if any output changed, False if the
+    build had nothing new to write.
+    """
+    if datasets is None:
+        datasets = load_datasets()
+    use_datasets(datasets)
+    changed = build_site(force, jobs, datasets)
+    if precompress:
+        with PROFILER.stage('compress'):
+            changed = precompress_outputs(OUTPUT_DIR, jobs) > 0 or changed
+    return changed
+
+def build_site(force, jobs, datasets):
+    """Build the datasets' dashboards and the trend page; return whether any output changed"""
+    if len(datasets) == 1:
+        return build_dataset(datasets[0], force=force, jobs=jobs)[0]
+
+    with PROFILER.stage('warm_up'):
+        warm_shared_state()
+    workers = min(len(datasets), os.cpu_count() or 1)
+    print(f"Building {len(datasets)} datasets, {workers} at a time...")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=fork_context()) as pool:
+        builds = [pool.submit(build_dataset_process, dataset, force, jobs, datasets) for dataset in datasets]
+        results = [build.result() for build in builds]
+    for _, _, profile in results:
+        PROFILER.merge(profile)
+    changed = any(dataset_changed for dataset_changed, _, _ in results)
+
+    trend_path = os.path.join(OUTPUT_DIR, TREND_PAGE)
+    with PROFILER.stage('trends'):
+        content = render_trend_page(datasets, [summary for _, summary, _ in results]).encode('utf-8')
+    if write_if_changed(trend_path, content):
+        print(f"Trend page written to '{trend_path}'.")
+        changed = True
+    prune_chart_assets(OUTPUT_DIR)
+    return changed
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Generate the static 3C+ dashboard.')
+    parser.add_argument('--force', action='store_true',
+                        help='rebuild every page even if its inputs are unchanged')
+    parser.add_argument('--jobs', type=int, default=1, metavar='N',
+                        help='render pages in N worker processes (default: 1, serial)')
+    parser.add_argument('--profile', nargs='?', const=PROFILE_PATH, metavar='PATH',
+                        help='time each build stage per page and write a JSON report '
+                             f'(default: {PROFILE_PATH}) plus a summary')
+    parser.add_argument('--datasets', default=DATASETS_PATH, metavar='PATH',
+                        help=f'JSON list of survey datasets to build (default: {DATASETS_PATH}, '
+                             f'if present; otherwise only {DATA_PATH})')
+    parser.add_argument('--no-precompress', dest='precompress', action='store_false',
+                        help='do not write .gz/.br siblings of the HTML, JSON and JS outputs')
+    parser.add_argument('--stream', action='store_true',
+                        help='fold every export chunk by chunk instead of loading it: bounded memory, '
+                             'but no free-text analysis or chart filters')
+    args = parser.parse_args(argv)
+    if args.jobs < 1:
+        parser.error('--jobs must be at least 1')
+    try:
+        datasets = load_datasets(args.datasets)
+    except (OSError, ValueError) as e:
+        parser.error(f'invalid dataset list: {e}')
+    if args.stream:
+        datasets = [dict(dataset, stream=True) for dataset in datasets]
+
+    if args.profile:
+        PROFILER.enabled = True
+        PROFILER.reset()
+    changed = generate_static_site(force=args.force, jobs=args.jobs, datasets=datasets,
+                                   precompress=args.precompress)
+    if args.profile:
+        PROFILER.write_report(args.profile)
+    if not changed:
+        # Distinct status so CI can skip deploying an unchanged site
+        return EXIT_UNCHANGED
+    return 0
 
 if __name__ == '__main__':
-    generate_static_site()
\ No newline at end of file
+    sys.exit(main())